@@ -0,0 +1,212 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import app.config as config
+import app.impl as impl
+from synthetic import SyntheticProject
+
+
+GENERATOR_ARGS: tuple = (
+    config.JINJA_ENV_PACKAGE,
+    config.CLASS_HEADER_TEMPLATE_FILENAME,
+    config.CLASS_SOURCE_TEMPLATE_FILENAME,
+    config.INTERFACE_HEADER_TEMPLATE_FILENAME,
+    config.ENUM_HEADER_TEMPLATE_FILENAME,
+    config.TAB_INDENT
+)
+
+GENERATE_METHODS: dict[impl.ModelClassification, list[str]] = {
+    impl.ModelClassification.CLASS: ["generate_class_header_content", "generate_class_source_content"],
+    impl.ModelClassification.INTERFACE: ["generate_interface_header_content"],
+    impl.ModelClassification.ENUM: ["generate_enum_header_content"]
+}
+
+
+# ==============================================================================
+class PhaseTimer:
+    def __init__(self):
+        self._phases: dict[str, float] = {}
+
+    @property
+    def phases(self) -> dict[str, float]:
+        return self._phases
+
+    def add(self, phase: str, seconds: float) -> None:
+        self._phases[phase] = self._phases.get(phase, 0.0) + seconds
+
+    def measure(self, phase: str, func, *args):
+        start: float = time.perf_counter()
+        result = func(*args)
+        self.add(phase, time.perf_counter() - start)
+        return result
+
+
+def measure_model_memory(entries: dict[str, impl.DiscoveryEntry], parser: impl.Parser, data: dict[str, dict]) -> int:
+    # Bytes retained per built model, YAML data is loaded before tracing starts
+    tracemalloc.start()
+    try:
+        before: int = tracemalloc.get_traced_memory()[0]
+        models: list[impl.Model] = []
+        for key, entry in entries.items():
+            info: impl.ModelInfo = entry.model_info
+            model: impl.Model = impl.Model(info.name, info.namespaces, info.include_guard)
+            parser.parse_data(model, data[key])
+            models.append(model)
+        retained: int = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    return retained // max(len(models), 1)
+
+
+def run_once(project_root: Path, work_dir: Path) -> tuple[dict[str, float], int, int]:
+    timer: PhaseTimer = PhaseTimer()
+
+    # Discovery, cold and warm from the persisted index
+    index_path: Path = work_dir / config.DISCOVERY_INDEX_FILENAME
+    index_path.unlink(missing_ok=True)
+    index: impl.DiscoveryIndex = impl.DiscoveryIndex(project_root, index_path)
+    timer.measure("discovery_cold", index.refresh)
+    index.save()
+
+    warm_index: impl.DiscoveryIndex = impl.DiscoveryIndex(project_root, index_path)
+    timer.measure("discovery_warm", lambda: (warm_index.load(), warm_index.refresh()))
+
+    parser: impl.Parser = impl.Parser(config.STANDARD_INCLUDE_MAP)
+    for entry in index.entries.values():
+        parser.add_project_include(entry.typename, entry.header_path)
+
+    generator: impl.CppGenerator = timer.measure("generator_init", impl.CppGenerator, *GENERATOR_ARGS)
+
+    texts: dict[str, str] = timer.measure("read", lambda: {key: index.path_of(entry).read_text() for key, entry in index.entries.items()})
+
+    # Parser.parse_yaml, split into YAML loading and model building
+    models: dict[str, impl.Model] = {}
+    loaded: dict[str, dict] = {}
+    for key, entry in index.entries.items():
+        info: impl.ModelInfo = entry.model_info
+        model: impl.Model = impl.Model(info.name, info.namespaces, info.include_guard)
+
+        data = timer.measure("parse_yaml.load", impl.Parser.load_yaml, texts[key])
+        timer.measure("parse_yaml.build", parser.parse_data, model, data)
+        models[key] = model
+        loaded[key] = data
+
+    timer.add("parse_yaml", timer.phases["parse_yaml.load"] + timer.phases["parse_yaml.build"])
+
+    # Each CppGenerator.generate_* method separately
+    outputs: dict[Path, str] = {}
+    for key, entry in index.entries.items():
+        for method_name in GENERATE_METHODS[entry.model_info.classification]:
+            content: str = timer.measure(method_name, getattr(generator, method_name), models[key])
+            suffix: str = ".cpp" if method_name.endswith("source_content") else ".h"
+            outputs[work_dir / "out" / entry.relative_dir / f"{entry.model_info.name}{suffix}"] = content
+
+    # Output writing, first into an empty tree, then over identical files
+    for phase in ("write_cold", "write_unchanged"):
+        writer: impl.OutputWriter = impl.OutputWriter()
+        timer.measure(phase, lambda: [writer.write(path, content) for path, content in outputs.items()])
+
+    model_bytes: int = measure_model_memory(index.entries, parser, loaded)
+
+    return timer.phases, sum(len(content) for content in outputs.values()), model_bytes
+
+
+def run_size(size: int, args: argparse.Namespace) -> dict:
+    project: SyntheticProject = SyntheticProject(size, args.members, args.methods, args.params, args.evalues,
+                                                 args.namespace_depth, args.namespace_width, args.cross_refs, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="blueprintcpp-bench-") as tmp:
+        project_root: Path = Path(tmp) / "project"
+        project.write(project_root)
+
+        # Best of N for every phase independently
+        best: dict[str, float] = {}
+        for _ in range(args.repeat):
+            work_dir: Path = Path(tempfile.mkdtemp(dir=tmp))
+            phases, bytes_rendered, model_bytes = run_once(project_root, work_dir)
+            for phase, seconds in phases.items():
+                best[phase] = min(best.get(phase, seconds), seconds)
+
+    return {"settings": project.settings(), "bytes_rendered": bytes_rendered, "model_bytes": model_bytes, "phases": best}
+
+
+def compare(results: list[dict], baseline_path: Path, tolerance: float) -> list[str]:
+    baseline: dict = json.loads(baseline_path.read_text())
+    baseline_runs: dict[int, dict] = {run["settings"]["blueprints"]: run for run in baseline["runs"]}
+    regressions: list[str] = []
+
+    for run in results:
+        size: int = run["settings"]["blueprints"]
+        previous: dict = baseline_runs.get(size)
+        if not previous or previous["settings"] != run["settings"]:
+            continue
+
+        for phase, seconds in run["phases"].items():
+            before: float = previous["phases"].get(phase)
+            if before and seconds > before * (1.0 + tolerance):
+                regressions.append(f"{size} blueprints, {phase}: {before:.4f}s -> {seconds:.4f}s")
+
+    return regressions
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark discovery, parsing, rendering and writing on synthetic projects")
+
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma separated project sizes in blueprints")
+    parser.add_argument("--members", type=int, default=8, help="Members per class")
+    parser.add_argument("--methods", type=int, default=8, help="Methods per class or interface")
+    parser.add_argument("--params", type=int, default=3, help="Parameters per method")
+    parser.add_argument("--evalues", type=int, default=16, help="Values per enum")
+    parser.add_argument("--namespace-depth", type=int, default=2, help="Namespace folders per blueprint")
+    parser.add_argument("--namespace-width", type=int, default=8, help="Distinct namespaces per level")
+    parser.add_argument("--cross-refs", type=int, default=2, help="Approximate references to other blueprints per model")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per size, the best time is kept")
+    parser.add_argument("-o", "--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown against the baseline")
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    runs: list[dict] = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        run: dict = run_size(size, args)
+        runs.append(run)
+
+        phases: dict[str, float] = run["phases"]
+        print(f"{size:>7} blueprints: " + ", ".join(f"{phase} {seconds:.4f}s" for phase, seconds in phases.items())
+              + f", {run['model_bytes']} bytes/model")
+
+    results: dict = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline:
+        regressions: list[str] = compare(runs, Path(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import app.config as config
+import app.impl as impl
+
+
+def build_graph(size: int, shape: str, includes: int, system_headers: int, system_includes: int, seed: int) -> impl.IncludeGraph:
+    # Acyclic graphs only include earlier headers, cyclic ones include any header
+    rng: random.Random = random.Random(seed)
+    graph: impl.IncludeGraph = impl.IncludeGraph(config.SYSTEM_HEADER_ESTIMATED_BYTES)
+    headers: list[str] = [f"ns{i % 16}/Header{i}.h" for i in range(size)]
+    system: list[str] = [f"system{i}" for i in range(system_headers)]
+
+    for i, header in enumerate(headers):
+        candidates: int = i if shape == "acyclic" else size
+        project: set[str] = {headers[rng.randrange(candidates)] for _ in range(includes)} if candidates else set()
+        graph.add_header(header, rng.randint(500, 5000), project - {header}, rng.sample(system, min(system_includes, system_headers)))
+
+    return graph
+
+
+def run_size(size: int, shape: str, args: argparse.Namespace) -> dict:
+    graph: impl.IncludeGraph = build_graph(size, shape, args.includes, args.system_headers, args.system_includes, args.seed)
+
+    # Best of N
+    best: float = None
+    for _ in range(args.repeat):
+        start: float = time.perf_counter()
+        report: dict = graph.analyze()
+        seconds: float = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    return {"headers": size, "shape": shape, "includes": args.includes, "cycles": len(report["cycles"]), "seconds": best}
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the include graph report on synthetic graphs of growing size")
+
+    parser.add_argument("--sizes", default="2500,5000,10000,20000", help="Comma separated graph sizes in headers")
+    parser.add_argument("--shapes", default="acyclic,cyclic", help="Comma separated graph shapes, acyclic or cyclic")
+    parser.add_argument("--includes", type=int, default=2, help="Project includes per header")
+    parser.add_argument("--system-headers", type=int, default=40, help="Distinct system headers")
+    parser.add_argument("--system-includes", type=int, default=2, help="System includes per header")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per size, the best time is kept")
+    parser.add_argument("-o", "--output", default=None, help="Write results as JSON to this file")
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    runs: list[dict] = []
+    for shape in args.shapes.split(","):
+        previous: dict = None
+        for size in (int(s) for s in args.sizes.split(",")):
+            run: dict = run_size(size, shape, args)
+            runs.append(run)
+
+            # Growth against the previous size, 2.0 per doubling is linear
+            growth: str = ""
+            if previous:
+                growth = f", x{run['seconds'] / max(previous['seconds'], 1e-9):.1f} for x{size / previous['headers']:.1f} headers"
+            print(f"{shape:<8} {size:>7} headers: {run['seconds']:.4f}s, {run['cycles']} cycle(s){growth}")
+            previous = run
+
+    results: dict = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import SyntheticProject
+
+
+REPO_ROOT: Path             = Path(__file__).resolve().parents[1]
+DEFAULT_EXECUTABLE: Path    = REPO_ROOT / ".pyinstaller.out" / "dist" / "blueprintcpp" / "blueprintcpp"
+
+# Modules a no-op run must not import
+HEAVY_MODULES: tuple[str, ...] = ("jinja2", "yaml", "multiprocessing", "concurrent.futures")
+
+
+def python_command() -> list[str]:
+    return [sys.executable, "-m", "app"]
+
+
+def python_env() -> dict[str, str]:
+    env: dict[str, str] = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT / "src"), env.get("PYTHONPATH")]))
+    return env
+
+
+def time_command(command: list[str], env: dict[str, str], before=None) -> float:
+    if before:
+        before()
+
+    start: float = time.perf_counter()
+    subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def measure(command: list[str], env: dict[str, str], repeat: int, before=None) -> dict[str, float]:
+    samples: list[float] = [time_command(command, env, before) for _ in range(repeat)]
+    return {"min": min(samples), "median": statistics.median(samples)}
+
+
+def imported_modules(command: list[str], env: dict[str, str]) -> set[str]:
+    # Top level modules listed by -X importtime
+    result = subprocess.run([command[0], "-X", "importtime"] + command[1:], env=env, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    modules: set[str] = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+
+    return modules
+
+
+def run_target(name: str, command: list[str], env: dict[str, str], project_root: Path, blueprint: Path, repeat: int) -> dict:
+    output_root: Path = Path(tempfile.mkdtemp(prefix=f"{name}-", dir=project_root.parent))
+    arguments: list[str] = [str(project_root), "-o", str(output_root)]
+
+    # First run generates everything, the measured runs are incremental
+    subprocess.run(command + arguments, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    edits: list[int] = [0]
+    def touch_blueprint() -> None:
+        edits[0] += 1
+        with blueprint.open("a") as file:
+            file.write(f"# edit {edits[0]}\n")
+
+    return {
+        "noop": measure(command + arguments, env, repeat),
+        "one_blueprint": measure(command + arguments, env, repeat, touch_blueprint)
+    }
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark process startup for up-to-date and single-blueprint runs")
+
+    parser.add_argument("--blueprints", type=int, default=50, help="Blueprints in the synthetic project")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement")
+    parser.add_argument("--executable", default=str(DEFAULT_EXECUTABLE), help="PyInstaller build from run.sh")
+    parser.add_argument("--skip-pyinstaller", action="store_true", help="Only measure python -m app")
+    parser.add_argument("-o", "--output", default=None, help="Write results as JSON to this file")
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    env: dict[str, str] = python_env()
+
+    results: dict = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "blueprints": args.blueprints,
+        "targets": {}
+    }
+
+    with tempfile.TemporaryDirectory(prefix="blueprintcpp-startup-") as tmp:
+        project_root: Path = Path(tmp) / "project"
+        SyntheticProject(args.blueprints).write(project_root)
+        blueprint: Path = sorted(project_root.rglob("*.yaml"))[0]
+
+        # Bare interpreter startup, the floor for python -m app
+        results["interpreter"] = measure([sys.executable, "-c", "pass"], env, args.repeat)
+
+        # A missing or broken build fails the benchmark, frozen builds break in ways python -m app does not
+        targets: dict[str, list[str]] = {"python -m app": python_command()}
+        if not args.skip_pyinstaller:
+            if not Path(args.executable).is_file():
+                print(f"error: {args.executable} not found, build it with run.sh or pass --skip-pyinstaller", file=sys.stderr)
+                return 1
+            targets["pyinstaller"] = [args.executable]
+
+        for name, command in targets.items():
+            results["targets"][name] = run_target(name.split()[0], command, env, project_root, blueprint, args.repeat)
+
+        # Which heavy modules an up-to-date run still pulls in
+        noop_output: Path = Path(tmp) / "noop"
+        subprocess.run(python_command() + [str(project_root), "-o", str(noop_output)], env=env, check=True, stdout=subprocess.DEVNULL)
+        modules: set[str] = imported_modules(python_command() + [str(project_root), "-o", str(noop_output)], env)
+        results["noop_heavy_imports"] = sorted(module for module in HEAVY_MODULES if module in modules)
+
+    print(f"interpreter: min {results['interpreter']['min'] * 1000:.1f} ms")
+    for name, target in results["targets"].items():
+        for case, timing in target.items():
+            print(f"{name:<14} {case:<14} min {timing['min'] * 1000:>7.1f} ms   median {timing['median'] * 1000:>7.1f} ms")
+    print(f"heavy imports on no-op run: {', '.join(results['noop_heavy_imports']) or 'none'}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
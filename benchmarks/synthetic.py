@@ -0,0 +1,190 @@
+import argparse
+import random
+import shutil
+from pathlib import Path
+
+
+STD_TYPES: list[str] = [
+    "int",
+    "bool",
+    "double",
+    "std::string",
+    "std::vector<int>",
+    "std::map<std::string, int>",
+    "std::optional<double>",
+    "std::shared_ptr<std::string>",
+    "std::array<float, 4>",
+    "std::function<void(int)>"
+]
+
+KIND_WEIGHTS: dict[str, int] = {
+    "class": 7,
+    "interface": 2,
+    "enum": 1
+}
+
+
+# ==============================================================================
+class SyntheticProject:
+    def __init__(self,
+                 blueprints: int = 100,
+                 members: int = 8,
+                 methods: int = 8,
+                 params: int = 3,
+                 evalues: int = 16,
+                 namespace_depth: int = 2,
+                 namespace_width: int = 8,
+                 cross_refs: int = 2,
+                 seed: int = 0
+                 ):
+        self._blueprints: int       = blueprints
+        self._members: int          = members
+        self._methods: int          = methods
+        self._params: int           = params
+        self._evalues: int          = evalues
+        self._namespace_depth: int  = namespace_depth
+        self._namespace_width: int  = namespace_width
+        self._cross_refs: int       = cross_refs
+        self._seed: int             = seed
+
+    def settings(self) -> dict[str, int]:
+        return {
+            "blueprints": self._blueprints,
+            "members": self._members,
+            "methods": self._methods,
+            "params": self._params,
+            "evalues": self._evalues,
+            "namespace_depth": self._namespace_depth,
+            "namespace_width": self._namespace_width,
+            "cross_refs": self._cross_refs,
+            "seed": self._seed
+        }
+
+    def write(self, root: Path) -> list[Path]:
+        rng: random.Random = random.Random(self._seed)
+        kinds: list[str] = rng.choices(list(KIND_WEIGHTS), weights=list(KIND_WEIGHTS.values()), k=self._blueprints)
+
+        if root.exists():
+            shutil.rmtree(root)
+
+        paths: list[Path]       = []
+        classes: list[str]      = []
+        interfaces: list[str]   = []
+
+        for i, kind in enumerate(kinds):
+            namespaces: list[str] = [f"ns{rng.randrange(self._namespace_width)}" for _ in range(self._namespace_depth)]
+            name: str = f"{kind.capitalize()}{i}"
+            typename: str = "::".join(namespaces + [name])
+
+            match kind:
+                case "class":
+                    text: str = self._class_yaml(rng, classes, interfaces)
+                    classes.append(typename)
+                case "interface":
+                    text: str = self._interface_yaml(rng, classes)
+                    interfaces.append(typename)
+                case "enum":
+                    text: str = self._enum_yaml()
+
+            path: Path = root.joinpath(*namespaces, f"{name}.{kind}.yaml")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+            paths.append(path)
+
+        return paths
+
+    def _type(self, rng: random.Random, known: list[str]) -> str:
+        # Cross references pick previously generated blueprints, sometimes inside a template
+        if known and rng.random() < self._cross_refs / max(1, self._members + self._methods):
+            typename: str = rng.choice(known)
+            return rng.choice([typename, f"std::unique_ptr<{typename}>", f"std::vector<{typename}>"])
+
+        return rng.choice(STD_TYPES)
+
+    def _class_yaml(self, rng: random.Random, classes: list[str], interfaces: list[str]) -> str:
+        lines: list[str] = ["description: Synthetic class", "inherits:"]
+
+        for base in rng.sample(interfaces, min(len(interfaces), rng.randrange(self._cross_refs + 1))):
+            lines += [f"  - type: {base}", "    visibility: public", "    virtual: true"]
+
+        if lines[-1] == "inherits:":
+            lines[-1] = "inherits: []"
+
+        lines += ["constructors:", "  - description: Default constructor", "    params: []"]
+        lines += ["members:" if self._members else "members: []"]
+
+        for m in range(self._members):
+            lines += [f"  - name: member{m}",
+                      "    description: Synthetic member",
+                      f"    visibility: {rng.choice(['public', 'protected', 'private'])}",
+                      f"    type: \"{self._type(rng, classes)}\""]
+
+        lines += ["methods:"]
+        lines += self._methods_yaml(rng, classes + interfaces)
+
+        return "\n".join(lines) + "\n"
+
+    def _interface_yaml(self, rng: random.Random, classes: list[str]) -> str:
+        lines: list[str] = ["description: Synthetic interface", "methods:"]
+        lines += self._methods_yaml(rng, classes)
+
+        return "\n".join(lines) + "\n"
+
+    def _methods_yaml(self, rng: random.Random, known: list[str]) -> list[str]:
+        lines: list[str] = []
+
+        for m in range(self._methods):
+            lines += [f"  - name: Method{m}",
+                      "    description: Synthetic method",
+                      f"    visibility: {rng.choice(['public', 'protected', 'private'])}",
+                      f"    type: \"{self._type(rng, known)}\"",
+                      f"    noexcept: {str(rng.random() < 0.5).lower()}",
+                      "    params:" if self._params else "    params: []"]
+
+            for p in range(self._params):
+                lines += [f"      - name: param{p}",
+                          "        description: Synthetic parameter",
+                          f"        type: \"{self._type(rng, known)}\"",
+                          f"        const: {str(rng.random() < 0.5).lower()}",
+                          f"        indirection: \"{rng.choice(['', '&', '*'])}\""]
+
+        return lines or ["  []"]
+
+    def _enum_yaml(self) -> str:
+        lines: list[str] = ["description: Synthetic enum", "evalues:"]
+
+        for v in range(self._evalues):
+            lines += [f"  - name: Value{v}", f"    value: \"{v}\""]
+
+        return "\n".join(lines if self._evalues else lines[:1] + ["evalues: []"]) + "\n"
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a synthetic blueprint project")
+
+    parser.add_argument("output", help="Root folder of the generated blueprints")
+    parser.add_argument("-n", "--blueprints", type=int, default=100, help="Number of blueprints")
+    parser.add_argument("--members", type=int, default=8, help="Members per class")
+    parser.add_argument("--methods", type=int, default=8, help="Methods per class or interface")
+    parser.add_argument("--params", type=int, default=3, help="Parameters per method")
+    parser.add_argument("--evalues", type=int, default=16, help="Values per enum")
+    parser.add_argument("--namespace-depth", type=int, default=2, help="Namespace folders per blueprint")
+    parser.add_argument("--namespace-width", type=int, default=8, help="Distinct namespaces per level")
+    parser.add_argument("--cross-refs", type=int, default=2, help="Approximate references to other blueprints per model")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    project = SyntheticProject(args.blueprints, args.members, args.methods, args.params, args.evalues,
+                               args.namespace_depth, args.namespace_width, args.cross_refs, args.seed)
+    paths: list[Path] = project.write(Path(args.output).resolve())
+
+    print(f"Generated {len(paths)} blueprints in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
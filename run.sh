@@ -12,20 +12,30 @@ MAIN_FILE="$PROJECT_ROOT_DIR/src/app/__main__.py"
 
 TEMPLATES_DIR="$PROJECT_ROOT_DIR/src/app/jinja/templates"
 TEMPLATES_PACKAGE_DIR="app/jinja/templates"
+COMPILED_TEMPLATES_DIR="$BUILD_DIR/compiled_templates"
+COMPILED_TEMPLATES_PACKAGE_DIR="app/jinja/compiled"
 
 RELEASE_ZIP_NAME="blueprintcpp-linux-x86_64.zip"
 EXECUTABLE="$RELEASE_DIR/$RELEASE_NAME"
 
 # Build project only if it doesn't already exist
 if [ ! -f "$EXECUTABLE" ]; then
+    echo "Precompiling templates..."
+
+    PYTHONPATH="$PROJECT_ROOT_DIR/src" python3 -m app.jinja.precompile "$COMPILED_TEMPLATES_DIR" || exit 1
+
     echo "Building $RELEASE_NAME..."
 
-    pyinstaller --onedir --noconfirm                                \
-                --name     "$RELEASE_NAME"                          \
-                --add-data "$TEMPLATES_DIR:$TEMPLATES_PACKAGE_DIR"  \
-                --distpath "$DIST_DIR"                              \
-                --workpath "$WORK_DIR"                              \
-                --specpath "$BUILD_DIR"                             \
+    # app.impl resolves its exports lazily, submodules are collected explicitly
+    pyinstaller --onedir --noconfirm                                                 \
+                --name     "$RELEASE_NAME"                                           \
+                --paths    "$PROJECT_ROOT_DIR/src"                                   \
+                --collect-submodules app                                             \
+                --add-data "$TEMPLATES_DIR:$TEMPLATES_PACKAGE_DIR"                   \
+                --add-data "$COMPILED_TEMPLATES_DIR:$COMPILED_TEMPLATES_PACKAGE_DIR" \
+                --distpath "$DIST_DIR"                                               \
+                --workpath "$WORK_DIR"                                               \
+                --specpath "$BUILD_DIR"                                              \
                 "$MAIN_FILE"
 
     echo "Creating release archive..."
@@ -0,0 +1 @@
+from .api import generate, resolve_roots, GenerateOptions, GenerateResult, RootResult
@@ -1,15 +1,22 @@
+from __future__ import annotations
+
+import app.api as api
 import app.impl as impl
 import app.config as config
 
 import argparse
+import os
+import sys
 from pathlib import Path
+from typing import TextIO
 
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate C++ code from YAML")
 
     parser.add_argument("input",
-                        help="Input path to root folder of YAML files"
+                        nargs="*",
+                        help="Input path to root folder of YAML files, several roots each generate into a folder of the output named after them"
                         )
 
     parser.add_argument("-o",
@@ -21,96 +28,522 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument("-b",
                         "--backup",
                         action="store_true",
-                        help="Create a backup of existing files before overwriting"
+                        help=f"Back up files about to be overwritten or removed into {config.BACKUP_DIRNAME} under the output, one snapshot per run"
                         )
 
-    return parser.parse_args()
+    parser.add_argument("--backup-list",
+                        action="store_true",
+                        help="List backup snapshots of the output, or of each input root's output, and exit"
+                        )
 
+    parser.add_argument("--backup-restore",
+                        default=None,
+                        metavar="SNAPSHOT",
+                        help="Restore the files a run changed to their state before it, in whichever output root holds the snapshot, then exit"
+                        )
 
-def main() -> None:
-    # Parse executable arguments
-    args = parse_arguments()
+    parser.add_argument("--backup-prune",
+                        type=int,
+                        default=None,
+                        metavar="KEEP",
+                        help="Delete all but the newest KEEP backup snapshots of each output root and the files only they hold, then exit"
+                        )
+
+    parser.add_argument("-j",
+                        "--jobs",
+                        type=int,
+                        default=1,
+                        help="Number of worker processes for parsing and rendering (0 uses every CPU)"
+                        )
+
+    parser.add_argument("--cache-dir",
+                        default=None,
+                        help="Directory for a cache of parsed blueprints, keyed by content hash"
+                        )
+
+    parser.add_argument("--template-cache-dir",
+                        default=None,
+                        help="Directory for the Jinja template bytecode cache"
+                        )
+
+    parser.add_argument("--stream",
+                        action="store_true",
+                        help="Stream rendered templates straight into the output files"
+                        )
+
+    parser.add_argument("--forward-declarations",
+                        action="store_true",
+                        help="Forward declare project types used through pointers or references and include them in the source file"
+                        )
+
+    parser.add_argument("--unity",
+                        action="store_true",
+                        help=f"Also emit unity_N.cpp files per namespace folder and {config.UNITY_CMAKE_FILENAME} listing them"
+                        )
+
+    parser.add_argument("--unity-batch-size",
+                        type=int,
+                        default=config.UNITY_BATCH_SIZE,
+                        help="Average number of sources per unity file, batches never exceed twice this size"
+                        )
+
+    parser.add_argument("--pch",
+                        action="store_true",
+                        help=f"Also emit {config.PCH_HEADER_FILENAME} with the most used system headers and {config.PCH_REPORT_FILENAME}"
+                        )
+
+    parser.add_argument("--pch-threshold",
+                        type=float,
+                        default=config.PCH_THRESHOLD,
+                        help="Minimum share of models including a system header for it to enter the precompiled header"
+                        )
+
+    parser.add_argument("--full",
+                        action="store_true",
+                        help="Ignore the incremental manifest and regenerate every file"
+                        )
+
+    parser.add_argument("--check",
+                        action="store_true",
+                        help="Write nothing, exit 1 listing outputs that are stale, missing or orphaned according to the manifest"
+                        )
+
+    parser.add_argument("--archive",
+                        default=None,
+                        help="Write every output into this archive instead of the output folder, - streams it to stdout. "
+                             "Entries are in blueprint order with fixed timestamps, equal inputs give identical archives"
+                        )
+
+    parser.add_argument("--archive-format",
+                        choices=["tar", "zip"],
+                        default=None,
+                        help="Format of the --archive output, by default zip for a .zip file and tar otherwise"
+                        )
+
+    parser.add_argument("--graph",
+                        default=None,
+                        help="Write the blueprint dependents graph to this file"
+                        )
+
+    parser.add_argument("--graph-format",
+                        choices=["json", "dot"],
+                        default="json",
+                        help="Format of the --graph output"
+                        )
+
+    parser.add_argument("--include-report",
+                        default=None,
+                        help="Write transitive include fan-in, fan-out, estimated size and cycles per header to this file"
+                        )
+
+    parser.add_argument("--include-report-format",
+                        choices=["json", "text"],
+                        default="text",
+                        help="Format of the --include-report output, headers are ranked by estimated cost"
+                        )
+
+    parser.add_argument("--stats",
+                        action="store_true",
+                        help="Print wall and CPU time per phase and the slowest blueprints"
+                        )
+
+    parser.add_argument("--stats-json",
+                        default=None,
+                        help="Write the full timing and counter report as JSON to this file"
+                        )
+
+    parser.add_argument("--stats-top",
+                        type=int,
+                        default=10,
+                        help="Number of slowest blueprints listed by --stats"
+                        )
+
+    parser.add_argument("--profile",
+                        choices=["startup", "discovery", "hash", "render", "write", "finalize"],
+                        default=None,
+                        help="Run one phase of the main process under cProfile"
+                        )
+
+    parser.add_argument("--profile-output",
+                        default=None,
+                        help="Write cProfile data to this file instead of printing the top entries"
+                        )
+
+    parser.add_argument("-w",
+                        "--watch",
+                        action="store_true",
+                        help="Keep running and regenerate outputs when blueprints change"
+                        )
+
+    parser.add_argument("--poll-interval",
+                        type=float,
+                        default=1.0,
+                        help="Seconds between scans when watching without inotify"
+                        )
+
+    parser.add_argument("--serve",
+                        default=None,
+                        metavar="SOCKET",
+                        help="Run as a server on this Unix socket, keeping warm state for every input root. "
+                             "Generation options come from each --connect request"
+                        )
+
+    parser.add_argument("--connect",
+                        default=None,
+                        metavar="SOCKET",
+                        help="Send the request to a server started with --serve instead of generating locally"
+                        )
+
+    parser.add_argument("--changed",
+                        action="append",
+                        default=None,
+                        metavar="FILE",
+                        help="With --connect, regenerate only these blueprint files (repeatable)"
+                        )
+
+    parser.add_argument("--shutdown-server",
+                        action="store_true",
+                        help="With --connect, stop the server"
+                        )
+
+    args = parser.parse_args()
+
+    managing_backups: bool = args.backup_list or args.backup_restore is not None or args.backup_prune is not None
+
+    if not args.input and not args.serve and not args.shutdown_server and not managing_backups:
+        parser.error("the input argument is required")
 
-    input_path: Path    = Path(args.input).resolve()
-    output_path: Path   = Path(args.output).resolve()
-    create_backup: bool = args.backup
-
-    # Create generator
-    GENERATOR = impl.CppGenerator(
-        config.JINJA_ENV_PACKAGE,
-        config.CLASS_HEADER_TEMPLATE_FILENAME,
-        config.CLASS_SOURCE_TEMPLATE_FILENAME,
-        config.INTERFACE_HEADER_TEMPLATE_FILENAME,
-        config.ENUM_HEADER_TEMPLATE_FILENAME,
-        config.TAB_INDENT
+    if len(args.input) > 1 and (args.watch or args.changed or args.graph or args.include_report or args.stats or args.stats_json or args.profile):
+        parser.error("several input roots cannot be combined with --watch, --changed, --graph, --include-report, --stats or --profile")
+
+    if args.connect and (args.watch or args.stats or args.stats_json or args.profile or args.graph or args.include_report or args.serve):
+        parser.error("--connect cannot be combined with --serve, --watch, --graph, --include-report, --stats or --profile")
+
+    if args.check and (args.watch or args.serve or args.changed or args.include_report):
+        parser.error("--check cannot be combined with --watch, --serve, --changed or --include-report")
+
+    if args.archive and (len(args.input) > 1 or args.check or args.watch or args.serve or args.connect or args.include_report):
+        parser.error("--archive cannot be combined with several input roots, --check, --watch, --serve, --connect or --include-report")
+
+    if args.archive == "-" and (args.stats or args.profile):
+        parser.error("--archive - cannot be combined with --stats or --profile, stdout carries the archive")
+
+    if (args.changed or args.shutdown_server) and not args.connect:
+        parser.error("--changed and --shutdown-server require --connect")
+
+    return args
+
+
+def create_options(args: argparse.Namespace) -> api.GenerateOptions:
+    return api.GenerateOptions(
+        jobs=args.jobs,
+        cache_dir=args.cache_dir,
+        template_cache_dir=args.template_cache_dir,
+        create_backup=args.backup,
+        stream=args.stream,
+        full_rebuild=args.full,
+        forward_declarations=args.forward_declarations,
+        unity_batch_size=args.unity_batch_size if args.unity else None,
+        pch_threshold=args.pch_threshold if args.pch else None,
+        check=args.check
     )
 
-    # Create Parser
-    PARSER = impl.Parser(
-        config.STANDARD_INCLUDE_MAP
+
+def create_session(args: argparse.Namespace, input_path: Path, output_path: Path) -> impl.Session:
+    return api.create_session(
+        input_path,
+        output_path,
+        create_options(args),
+        keep_parsed=bool(args.watch or args.serve),
+        stats=impl.Stats(per_file=bool(args.stats or args.stats_json), profile_phase=args.profile)
     )
 
-    # Instrument files
-    file_models_info: dict[str, impl.ModelInfo] = {}
-    for yaml_path in input_path.rglob("*.yaml"):
-        relative_dir = yaml_path.parent.relative_to(input_path)
-        base_name, model_type = yaml_path.stem.rsplit(".", 1)
 
-        namespaces = list(relative_dir.parts)
-        h_path = relative_dir / f"{base_name}.h"
+def print_report(summary: str, errors: list[str], file: TextIO = None) -> int:
+    print(f"{config.GENERATOR_APP_NAME}: {summary}", file=file)
+
+    # Errors are reported in blueprint order regardless of worker scheduling
+    for error in errors:
+        print(f"error: {error}", file=sys.stderr)
+
+    return 1 if errors else 0
+
+
+def report(run_report: impl.RunReport) -> int:
+    return print_report(run_report.summary(), run_report.errors)
+
+
+def report_check(check: impl.CheckReport) -> int:
+    print(f"{config.GENERATOR_APP_NAME}: {check.summary()}")
+
+    for kind, outputs in (("stale", check.stale), ("missing", check.missing), ("orphaned", check.orphaned)):
+        for output in outputs:
+            print(f"{kind}: {output}", file=sys.stderr)
+
+    for error in check.errors:
+        print(f"error: {error}", file=sys.stderr)
+
+    return 0 if check.passed else 1
+
+
+def write_archive(session: impl.Session, archive: str, archive_format: str) -> int:
+    # Archive entries are relative to the output root, files are replaced once complete
+    archive_format = archive_format or ("zip" if archive.endswith(".zip") else "tar")
+    writer_class: type = impl.ZipWriter if archive_format == "zip" else impl.TarWriter
+
+    if archive == "-":
+        writer: impl.ArchiveWriter = writer_class(session.output_path, sys.stdout.buffer)
+        run_report: impl.RunReport = session.export(writer)
+        writer.close()
+        sys.stdout.buffer.flush()
+        return print_report(run_report.summary(), run_report.errors, sys.stderr)
+
+    archive_path: Path = Path(archive).resolve()
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path: Path = archive_path.with_name(f".{archive_path.name}.tmp")
+
+    try:
+        with tmp_path.open("wb") as file:
+            writer: impl.ArchiveWriter = writer_class(session.output_path, file)
+            run_report: impl.RunReport = session.export(writer)
+            writer.close()
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return print_report(run_report.summary(), run_report.errors)
+
+
+def write_stats(stats: impl.Stats, args: argparse.Namespace) -> None:
+    if args.stats:
+        print(stats.format_table(args.stats_top), end="")
+
+    if args.stats_json:
+        Path(args.stats_json).write_text(stats.to_json())
+
+    if args.profile:
+        print(stats.dump_profile(Path(args.profile_output) if args.profile_output else None), end="")
+
+
+def write_graph(session: impl.Session, graph_path: Path, graph_format: str) -> None:
+    blueprints: dict[str, str] = session.blueprints()
+
+    match graph_format:
+        case "json":
+            content: str = session.graph.to_json(blueprints)
+        case "dot":
+            content: str = session.graph.to_dot(blueprints)
+
+    graph_path.parent.mkdir(parents=True, exist_ok=True)
+    graph_path.write_text(content)
+
+
+def write_include_report(session: impl.Session, report_path: Path, report_format: str) -> None:
+    report: dict = session.include_report(config.SYSTEM_HEADER_ESTIMATED_BYTES)
+
+    match report_format:
+        case "json":
+            content: str = impl.IncludeGraph.to_json(report)
+        case "text":
+            content: str = impl.IncludeGraph.to_text(report)
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(content)
+
+
+def generate_roots(args: argparse.Namespace, roots: list[tuple[Path, Path]]) -> int:
+    # Several roots run in this process and share one generator
+    result: api.GenerateResult = api.generate(roots, args.output, create_options(args))
 
-        typename_parts = namespaces + [base_name]
-        typename = "::".join(typename_parts)
+    for root in result.roots:
+        print(f"{config.GENERATOR_APP_NAME}: {root.input_path}: {root.summary}")
+
+        for kind in ("stale", "missing", "orphaned"):
+            for output in root.files.get(kind, []):
+                print(f"{kind}: {root.output_path / output}", file=sys.stderr)
+
+        for error in root.errors:
+            print(f"error: {error}", file=sys.stderr)
+
+    return 0 if result.passed else 1
+
+
+def manage_backups(args: argparse.Namespace, output_paths: list[Path]) -> int:
+    # Every output root has its own store, with several roots each line names its root
+    stores: dict[Path, impl.BackupStore] = {output_path: impl.BackupStore(output_path, output_path / config.BACKUP_DIRNAME)
+                                            for output_path in output_paths}
+    prefixes: dict[Path, str] = {output_path: f"{output_path}: " if len(stores) > 1 else "" for output_path in stores}
+
+    if args.backup_list:
+        for output_path, store in stores.items():
+            for snapshot in store.snapshots():
+                print(f"{prefixes[output_path]}{snapshot['id']}  {len(snapshot['files']):>6} files  {snapshot['bytes']:>12} bytes")
+
+    if args.backup_restore is not None:
+        # Snapshot ids are unique per run, only the root holding it is restored
+        try:
+            restoring: list[Path] = [output_path for output_path, store in stores.items() if store.has_snapshot(args.backup_restore)]
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+
+        if not restoring:
+            print(f"error: no backup snapshot {args.backup_restore!r} in {', '.join(str(store.store_path) for store in stores.values())}", file=sys.stderr)
+            return 1
+
+        for output_path in restoring:
+            restored, removed = stores[output_path].restore(args.backup_restore)
+            print(f"{config.GENERATOR_APP_NAME}: {prefixes[output_path]}{len(restored)} restored and {len(removed)} removed from {args.backup_restore}")
+
+            # The next run regenerates whatever the restore put back or removed
+            manifest = impl.Manifest(output_path / config.MANIFEST_FILENAME)
+            manifest.load()
+            manifest.invalidate_outputs(set(restored) | set(removed))
+            manifest.save()
+
+    if args.backup_prune is not None:
+        for output_path, store in stores.items():
+            snapshots, objects = store.prune(args.backup_prune)
+            print(f"{config.GENERATOR_APP_NAME}: {prefixes[output_path]}{snapshots} snapshots and {objects} backed up files removed")
+
+    return 0
+
+
+def watch(session: impl.Session, poll_interval: float) -> int:
+    watcher = impl.create_watcher(session.input_path, poll_interval)
+    print(f"{config.GENERATOR_APP_NAME}: watching {session.input_path}")
+
+    try:
+        while True:
+            changed: set[str] = watcher.wait()
+            report(session.run(changed=changed))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
+
+def create_server_session(input_path: Path, output_path: Path, options: dict) -> impl.Session:
+    # Unknown options fail the request instead of being ignored
+    return api.create_session(input_path, output_path, api.GenerateOptions(**options), keep_parsed=True)
+
+
+def request_options(args: argparse.Namespace) -> dict:
+    # Generation options of this client, the server builds its sessions with them. Full rebuilds
+    # and checks are per request. Paths are resolved here, the server runs in another folder.
+    options: api.GenerateOptions = create_options(args)
+    request: dict = {name: getattr(options, name) for name in api.GenerateOptions.__slots__
+                     if name not in ("full_rebuild", "check", "in_memory")}
+
+    for name in ("cache_dir", "template_cache_dir"):
+        if request[name]:
+            request[name] = str(Path(request[name]).resolve())
+
+    return request
+
+
+def serve(args: argparse.Namespace) -> int:
+    # Every input root gets its own session, created with the options of the requesting client
+    server = impl.CodegenServer(Path(args.serve).resolve(), create_server_session)
+    print(f"{config.GENERATOR_APP_NAME}: serving on {server.socket_path}")
+
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def connect(args: argparse.Namespace, roots: list[tuple[Path, Path]]) -> int:
+    # Thin client, imports nothing beyond the socket protocol
+    if args.shutdown_server:
+        request: dict = {"command": "shutdown"}
+    else:
+        requested: list[dict] = [{"input": str(input_path), "output": str(output_path)} for input_path, output_path in roots]
+
+        if args.changed:
+            request: dict = {"command": "regenerate", **requested[0], "files": [str(Path(file).resolve()) for file in args.changed],
+                             "options": request_options(args), "full": args.full}
+        else:
+            request: dict = {"command": "generate", "roots": requested, "options": request_options(args), "full": args.full,
+                             "check": args.check}
+
+    try:
+        response: dict = impl.send_request(Path(args.connect), request)
+    except (OSError, ValueError) as e:
+        print(f"error: cannot reach server on {args.connect}: {e}", file=sys.stderr)
+        return 1
+
+    if "error" in response:
+        print(f"error: {response['error']}", file=sys.stderr)
+
+    for run_report in response.get("reports", []):
+        for kind, outputs in run_report.get("files", {}).items():
+            for output in outputs:
+                print(f"{kind}: {output}", file=sys.stderr)
+
+        print_report(run_report["summary"], run_report["errors"])
+
+    return response["exit_code"]
+
+
+def main() -> int:
+    # Parse executable arguments
+    args = parse_arguments()
 
-        include_guard_parts = typename_parts + ["H"]
-        include_guard = "_".join(s.upper() for s in include_guard_parts)
+    try:
+        roots: list[tuple[Path, Path]] = api.resolve_roots(args.input, args.output)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
 
-        PARSER.add_project_include(typename, str(h_path))
-        file_models_info[yaml_path] = impl.ModelInfo(base_name, model_type, namespaces, include_guard)
+    if args.backup_list or args.backup_restore is not None or args.backup_prune is not None:
+        # Input roots select their output roots, without any the output itself holds the backups
+        return manage_backups(args, [output_path for _, output_path in roots] or [Path(args.output).resolve()])
 
-    # Parse yamls and generate files
-    for yaml_path in input_path.rglob("*.yaml"):
-        model_info: impl.ModelInfo = file_models_info[yaml_path]
+    if args.connect:
+        return connect(args, roots)
 
-        # Create general model
-        model: impl.Model = impl.Model(model_info.name, model_info.namespaces, model_info.include_guard)
+    if args.serve:
+        return serve(args)
 
-        # Preserve directory structure
-        relative_dir: Path = yaml_path.parent.relative_to(input_path)
-        destination_dir: Path = output_path / relative_dir
-        destination_dir.mkdir(parents=True, exist_ok=True)
+    if len(roots) > 1:
+        return generate_roots(args, roots)
 
-        # Output filenames
-        header_file: Path = destination_dir / f"{model_info.name}.h"
-        source_file: Path = destination_dir / f"{model_info.name}.cpp"
+    session: impl.Session = create_session(args, *roots[0])
+    try:
+        if args.check:
+            exit_code: int = report_check(session.check(full_rebuild=args.full))
+        elif args.archive:
+            exit_code: int = write_archive(session, args.archive, args.archive_format)
+        else:
+            exit_code: int = report(session.run(full_rebuild=args.full))
 
-        # Parse yaml and append info to model
-        PARSER.parse_yaml(model, yaml_path.read_text())
+        if args.graph:
+            write_graph(session, Path(args.graph).resolve(), args.graph_format)
 
-        match model_info.classification:
-            case impl.ModelClassification.CLASS:
-                # Generate text for header and cpp
-                header_content: str = GENERATOR.generate_class_header_content(model)
-                source_content: str = GENERATOR.generate_class_source_content(model)
-            case impl.ModelClassification.INTERFACE:
-                header_content: str = GENERATOR.generate_interface_header_content(model)
-                source_content: str = None
-            case impl.ModelClassification.ENUM:
-                header_content: str = GENERATOR.generate_enum_header_content(model)
-                source_content: str = None
+        if args.include_report:
+            write_include_report(session, Path(args.include_report).resolve(), args.include_report_format)
 
-        # Backup if requested
-        if create_backup:
-            for file in (header_file, source_file):
-                if file.exists():
-                    file.rename(file.with_name(file.name + ".bak"))
+        write_stats(session.stats, args)
 
-        if header_content:
-            header_file.write_text(header_content)
+        # Every change reuses the session, and with it the render workers
+        if args.watch:
+            return watch(session, args.poll_interval)
 
-        if source_content:
-            source_file.write_text(source_content)
+        return exit_code
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
-    main()
+    # Only frozen builds need worker bootstrapping, plain runs skip importing multiprocessing
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+    sys.exit(main())
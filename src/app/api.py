@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import app.config as config
+import app.impl as impl
+
+import functools
+import os
+from pathlib import Path
+from typing import Callable, Iterable
+
+
+# ==============================================================================
+class GenerateOptions:
+    __slots__ = ("jobs", "cache_dir", "template_cache_dir", "create_backup", "stream", "full_rebuild", "forward_declarations",
+                 "unity_batch_size", "pch_threshold", "check", "in_memory")
+
+    def __init__(self,
+                 jobs: int = 1,
+                 cache_dir: str | os.PathLike = None,
+                 template_cache_dir: str | os.PathLike = None,
+                 create_backup: bool = False,
+                 stream: bool = False,
+                 full_rebuild: bool = False,
+                 forward_declarations: bool = False,
+                 unity_batch_size: int = None,
+                 pch_threshold: float = None,
+                 check: bool = False,
+                 in_memory: bool = False
+                 ):
+        # Mirrors the command line, jobs=0 uses every CPU and None disables unity and PCH outputs
+        self.jobs: int                                  = jobs
+        self.cache_dir: str | os.PathLike               = cache_dir
+        self.template_cache_dir: str | os.PathLike      = template_cache_dir
+        self.create_backup: bool                        = create_backup
+        self.stream: bool                               = stream
+        self.full_rebuild: bool                         = full_rebuild
+        self.forward_declarations: bool                 = forward_declarations
+        self.unity_batch_size: int                      = unity_batch_size
+        self.pch_threshold: float                       = pch_threshold
+        self.check: bool                                = check
+        # Outputs are returned as RootResult.contents and the output folder is left untouched
+        self.in_memory: bool                            = in_memory
+
+
+# ==============================================================================
+class RootResult:
+    def __init__(self,
+                 input_path: Path,
+                 output_path: Path,
+                 passed: bool,
+                 summary: str,
+                 errors: list[str],
+                 files: dict[str, list[str]],
+                 timings: dict[str, float],
+                 contents: dict[str, bytes] = None
+                 ):
+        self._input_path: Path              = input_path
+        self._output_path: Path             = output_path
+        self._passed: bool                  = passed
+        self._summary: str                  = summary
+        self._errors: list[str]             = errors
+        self._files: dict[str, list[str]]   = files
+        self._timings: dict[str, float]     = timings
+        self._contents: dict[str, bytes]    = contents
+
+    @property
+    def input_path(self) -> Path:
+        return self._input_path
+
+    @property
+    def output_path(self) -> Path:
+        return self._output_path
+
+    @property
+    def passed(self) -> bool:
+        # No failed blueprints, and for checks no stale, missing or orphaned outputs
+        return self._passed
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @property
+    def errors(self) -> list[str]:
+        return self._errors
+
+    @property
+    def files(self) -> dict[str, list[str]]:
+        # Outcome -> outputs relative to the output root. Runs report "written", "unchanged"
+        # and "removed", checks report "stale", "missing" and "orphaned".
+        return self._files
+
+    @property
+    def timings(self) -> dict[str, float]:
+        # Phase -> wall seconds
+        return self._timings
+
+    @property
+    def contents(self) -> dict[str, bytes]:
+        # Output relative to the output root -> content, None unless generated in memory
+        return self._contents
+
+
+# ==============================================================================
+class GenerateResult:
+    def __init__(self, roots: list[RootResult]):
+        self._roots: list[RootResult] = roots
+
+    @property
+    def roots(self) -> list[RootResult]:
+        return self._roots
+
+    @property
+    def passed(self) -> bool:
+        return all(root.passed for root in self._roots)
+
+    @property
+    def errors(self) -> list[str]:
+        return [error for root in self._roots for error in root.errors]
+
+    def files(self, outcome: str) -> list[Path]:
+        # Absolute paths of every root's outputs with this outcome
+        return [root.output_path / output for root in self._roots for output in root.files.get(outcome, [])]
+
+
+def resolve_roots(roots: Iterable[str | os.PathLike | tuple[str | os.PathLike, str | os.PathLike]],
+                  output: str | os.PathLike
+                  ) -> list[tuple[Path, Path]]:
+    # (input, output) pairs are taken as given. A single input root generates into output,
+    # several generate into a folder of output named after each root.
+    pairs: list[tuple[Path, Path]] = []
+    inputs: list[Path] = []
+
+    for root in roots:
+        if isinstance(root, tuple):
+            pairs.append((Path(root[0]).resolve(), Path(root[1]).resolve()))
+        else:
+            inputs.append(Path(root).resolve())
+
+    output_path: Path = Path(output).resolve()
+    if len(inputs) == 1 and not pairs:
+        return [(inputs[0], output_path)]
+
+    names: set[str] = set()
+    for input_path in inputs:
+        if input_path.name in names:
+            raise ValueError(f"input roots share the folder name {input_path.name!r}, give their outputs explicitly")
+        names.add(input_path.name)
+        pairs.append((input_path, output_path / input_path.name))
+
+    return pairs
+
+
+def generator_arguments(options: GenerateOptions) -> tuple:
+    # Also used to build one generator per worker process
+    template_cache_dir: str = str(Path(options.template_cache_dir).resolve()) if options.template_cache_dir else None
+
+    return (
+        config.JINJA_ENV_PACKAGE,
+        config.CLASS_HEADER_TEMPLATE_FILENAME,
+        config.CLASS_SOURCE_TEMPLATE_FILENAME,
+        config.INTERFACE_HEADER_TEMPLATE_FILENAME,
+        config.ENUM_HEADER_TEMPLATE_FILENAME,
+        config.TAB_INDENT,
+        template_cache_dir
+    )
+
+
+def create_render_pool(options: GenerateOptions) -> impl.RenderPool:
+    # Workers start on first parallel render, sessions given the pool share them
+    return impl.RenderPool(worker_count(options), generator_arguments(options), blueprint_cache_dir(options))
+
+
+def worker_count(options: GenerateOptions) -> int:
+    return options.jobs or os.cpu_count() or 1
+
+
+def blueprint_cache_dir(options: GenerateOptions) -> Path:
+    return Path(options.cache_dir).resolve() if options.cache_dir else None
+
+
+def create_session(input_path: Path,
+                   output_path: Path,
+                   options: GenerateOptions,
+                   generator_factory: Callable[[], impl.CppGenerator] = None,
+                   keep_parsed: bool = False,
+                   stats: impl.Stats = None,
+                   track_files: bool = False,
+                   render_pool: impl.RenderPool = None
+                   ) -> impl.Session:
+    unity: impl.UnityBuilder = None
+    if options.unity_batch_size is not None:
+        unity = impl.UnityBuilder(options.unity_batch_size, config.UNITY_CMAKE_FILENAME)
+
+    pch: impl.PchBuilder = None
+    if options.pch_threshold is not None:
+        pch = impl.PchBuilder(options.pch_threshold, config.PCH_HEADER_FILENAME, config.PCH_REPORT_FILENAME)
+
+    return impl.Session(
+        input_path,
+        output_path,
+        generator_arguments(options),
+        config.STANDARD_INCLUDE_MAP,
+        config.MANIFEST_FILENAME,
+        config.DISCOVERY_INDEX_FILENAME,
+        jobs=worker_count(options),
+        cache_dir=blueprint_cache_dir(options),
+        create_backup=options.create_backup,
+        keep_parsed=keep_parsed,
+        stream=options.stream,
+        stats=stats,
+        unity=unity,
+        pch=pch,
+        forward_declarations=options.forward_declarations,
+        buffer_bytes=config.PIPELINE_BUFFER_BYTES,
+        generator_factory=generator_factory,
+        track_files=track_files,
+        backup_dirname=config.BACKUP_DIRNAME,
+        render_pool=render_pool
+    )
+
+
+def generate(roots: Iterable[str | os.PathLike | tuple[str | os.PathLike, str | os.PathLike]],
+             output: str | os.PathLike,
+             options: GenerateOptions = None
+             ) -> GenerateResult:
+    options = options or GenerateOptions()
+
+    # Roots run one after another and share one generator and one render pool, built when the
+    # first root needs them. Parsers depend on each root's own types and are built per root.
+    generator_factory: Callable[[], impl.CppGenerator] = functools.cache(functools.partial(impl.CppGenerator, *generator_arguments(options)))
+    render_pool: impl.RenderPool = create_render_pool(options)
+    results: list[RootResult] = []
+
+    try:
+        for input_path, output_path in resolve_roots(roots, output):
+            results.append(generate_root(input_path, output_path, options, generator_factory, render_pool))
+    finally:
+        render_pool.close()
+
+    return GenerateResult(results)
+
+
+def generate_root(input_path: Path,
+                  output_path: Path,
+                  options: GenerateOptions,
+                  generator_factory: Callable[[], impl.CppGenerator],
+                  render_pool: impl.RenderPool
+                  ) -> RootResult:
+    session: impl.Session = create_session(input_path, output_path, options, generator_factory, track_files=True, render_pool=render_pool)
+    contents: dict[str, bytes] = None
+
+    if options.check:
+        check: impl.CheckReport = session.check(options.full_rebuild)
+        files: dict[str, list[str]] = {"stale": check.stale, "missing": check.missing, "orphaned": check.orphaned}
+        passed, summary, errors = check.passed, check.summary(), check.errors
+    elif options.in_memory:
+        writer: impl.MemoryWriter = impl.MemoryWriter(output_path, track_paths=True)
+        run: impl.RunReport = session.export(writer)
+        files: dict[str, list[str]] = run.files
+        passed, summary, errors, contents = not run.errors, run.summary(), run.errors, writer.files
+    else:
+        run: impl.RunReport = session.run(full_rebuild=options.full_rebuild)
+        files: dict[str, list[str]] = run.files
+        passed, summary, errors = not run.errors, run.summary(), run.errors
+
+    timings: dict[str, float] = {name: wall for name, (wall, cpu) in session.stats.phases.items()}
+    return RootResult(input_path, output_path, passed, summary, errors, files, timings, contents)
@@ -7,6 +7,18 @@ CLASS_SOURCE_TEMPLATE_FILENAME: str     = "class.cpp.j2"
 INTERFACE_HEADER_TEMPLATE_FILENAME: str = "interface.h.j2"
 ENUM_HEADER_TEMPLATE_FILENAME: str      = "enum.h.j2"
 TAB_INDENT: str                         = "    "
+MANIFEST_FILENAME: str                  = ".blueprintcpp.manifest.json"
+DISCOVERY_INDEX_FILENAME: str           = ".blueprintcpp.index.json"
+BACKUP_DIRNAME: str                     = ".blueprintcpp.backups"
+UNITY_BATCH_SIZE: int                   = 8
+UNITY_CMAKE_FILENAME: str               = "unity_sources.cmake"
+PCH_THRESHOLD: float                    = 0.25
+PCH_HEADER_FILENAME: str                = "pch.h"
+PCH_REPORT_FILENAME: str                = "pch_report.json"
+# Blueprint text kept between hashing and rendering, larger changes are read twice
+PIPELINE_BUFFER_BYTES: int              = 16 * 1024 * 1024
+# Rough preprocessed size of one standard header, used to estimate include costs
+SYSTEM_HEADER_ESTIMATED_BYTES: int      = 150_000
 
 
 STANDARD_INCLUDE_MAP: dict[str, str] = {
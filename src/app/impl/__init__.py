@@ -1,4 +1,83 @@
-from .generator import CppGenerator, Model
-from .model_info import ModelInfo, ModelClassification
-from .model import Model
-from .parser import Parser
+import importlib
+from typing import TYPE_CHECKING
+
+# Exports are resolved on first access so that importing app.impl stays cheap,
+# each name pulls in only its own module and what that module needs
+_EXPORTS: dict[str, str] = {
+    "ArchiveWriter":            "archive",
+    "MemoryWriter":             "archive",
+    "TarWriter":                "archive",
+    "ZipWriter":                "archive",
+    "BackupStore":              "backup",
+    "BlueprintCache":           "cache",
+    "BlueprintMemoryCache":     "cache",
+    "send_request":             "client",
+    "DiscoveryIndex":           "discovery",
+    "DiscoveryEntry":           "discovery",
+    "CppGenerator":             "generator",
+    "DependencyGraph":          "graph",
+    "IncludeGraph":             "include_graph",
+    "ModelInfo":                "model_info",
+    "ModelClassification":      "model_info",
+    "Model":                    "model",
+    "Manifest":                 "manifest",
+    "hash_bytes":               "manifest",
+    "hash_object":              "manifest",
+    "Parser":                   "parser",
+    "PchBuilder":               "pch",
+    "RenderTask":               "render",
+    "RenderResult":             "render",
+    "Renderer":                 "render",
+    "RenderPool":               "render",
+    "CodegenServer":            "server",
+    "Session":                  "session",
+    "RunReport":                "session",
+    "CheckReport":              "session",
+    "Stats":                    "stats",
+    "measure":                  "stats",
+    "UnityBuilder":             "unity",
+    "InotifyWatcher":           "watch",
+    "PollingWatcher":           "watch",
+    "create_watcher":           "watch",
+    "OutputWriter":             "writer",
+    "OutputChecker":            "writer"
+}
+
+__all__: list[str] = list(_EXPORTS)
+
+# Static imports for type checkers and PyInstaller, neither can follow __getattr__
+if TYPE_CHECKING:
+    from app.impl.archive import ArchiveWriter, MemoryWriter, TarWriter, ZipWriter
+    from app.impl.backup import BackupStore
+    from app.impl.cache import BlueprintCache, BlueprintMemoryCache
+    from app.impl.client import send_request
+    from app.impl.discovery import DiscoveryIndex, DiscoveryEntry
+    from app.impl.generator import CppGenerator
+    from app.impl.graph import DependencyGraph
+    from app.impl.include_graph import IncludeGraph
+    from app.impl.model_info import ModelInfo, ModelClassification
+    from app.impl.model import Model
+    from app.impl.manifest import Manifest, hash_bytes, hash_object
+    from app.impl.parser import Parser
+    from app.impl.pch import PchBuilder
+    from app.impl.render import RenderTask, RenderResult, Renderer, RenderPool
+    from app.impl.server import CodegenServer
+    from app.impl.session import Session, RunReport, CheckReport
+    from app.impl.stats import Stats, measure
+    from app.impl.unity import UnityBuilder
+    from app.impl.watch import InotifyWatcher, PollingWatcher, create_watcher
+    from app.impl.writer import OutputWriter, OutputChecker
+
+
+def __getattr__(name: str):
+    module_name: str = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,128 @@
+from app.impl.writer import OutputWriter
+
+import hashlib
+import io
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+
+# ==============================================================================
+class ArchiveWriter(OutputWriter, ABC):
+    # Collects every output outside of the output folder. Entries come in blueprint order,
+    # with fixed metadata, so that equal inputs give byte-identical archives.
+    FIXED_TIMESTAMP: int    = 315532800     # 1980-01-01 UTC, the earliest time zip can store
+    FILE_MODE: int          = 0o644
+
+    def __init__(self, output_root: Path, track_paths: bool = False):
+        super().__init__(track_paths=track_paths)
+        self._output_root: Path = output_root
+
+    @property
+    def persistent(self) -> bool:
+        return False
+
+    def write(self, path: Path, content: str) -> bool:
+        data: bytes = content.encode("utf-8")
+        self._last_digest = hashlib.sha256(data).hexdigest()
+
+        self._add(path.relative_to(self._output_root).as_posix(), data)
+        self._track("written", path)
+        self._written += 1
+        self._bytes_written += len(data)
+        return True
+
+    def write_stream(self, path: Path, chunks: Iterable[str]) -> bool:
+        return self.write(path, "".join(chunks))
+
+    def account(self, path: Path, changed: bool, size: int) -> None:
+        raise RuntimeError("archives are written by this process, outputs cannot be streamed by workers")
+
+    def remove(self, path: Path) -> bool:
+        # Archives only ever hold current outputs
+        return False
+
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def _add(self, name: str, data: bytes) -> None:
+        # Stores one complete entry, name is relative to the output root
+        pass
+
+
+# ==============================================================================
+class MemoryWriter(ArchiveWriter):
+    def __init__(self, output_root: Path, track_paths: bool = False):
+        super().__init__(output_root, track_paths)
+        self._files: dict[str, bytes] = {}
+
+    @property
+    def files(self) -> dict[str, bytes]:
+        # Output relative to the output root -> content
+        return self._files
+
+    def _add(self, name: str, data: bytes) -> None:
+        self._files[name] = data
+
+
+# ==============================================================================
+class TarWriter(ArchiveWriter):
+    def __init__(self, output_root: Path, stream: BinaryIO, track_paths: bool = False):
+        # Stream mode writes strictly sequentially, stdout and pipes work as targets
+        import tarfile
+
+        super().__init__(output_root, track_paths)
+        self._tarfile = tarfile
+        self._archive: tarfile.TarFile = tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def close(self) -> None:
+        # The stream itself belongs to the caller
+        self._archive.close()
+
+    def _add(self, name: str, data: bytes) -> None:
+        info = self._tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = ArchiveWriter.FIXED_TIMESTAMP
+        info.mode = ArchiveWriter.FILE_MODE
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+
+        self._archive.addfile(info, io.BytesIO(data))
+
+
+# ==============================================================================
+class _SequentialStream:
+    # Write-only view of a stream, zipfile then never seeks back to patch local headers
+    def __init__(self, stream: BinaryIO):
+        self._stream: BinaryIO = stream
+
+    def write(self, data: bytes) -> int:
+        return self._stream.write(data)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+# ==============================================================================
+class ZipWriter(ArchiveWriter):
+    def __init__(self, output_root: Path, stream: BinaryIO, track_paths: bool = False):
+        import zipfile
+
+        super().__init__(output_root, track_paths)
+        self._zipfile = zipfile
+        # Pipes get entries with data descriptors, files are written the same way so both are byte-identical
+        self._archive: zipfile.ZipFile = zipfile.ZipFile(_SequentialStream(stream), "w", compression=zipfile.ZIP_DEFLATED)
+
+    def close(self) -> None:
+        self._archive.close()
+
+    def _add(self, name: str, data: bytes) -> None:
+        info = self._zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+        info.compress_type = self._zipfile.ZIP_DEFLATED
+        info.external_attr = (0o100000 | ArchiveWriter.FILE_MODE) << 16
+        # Otherwise the creating platform is recorded
+        info.create_system = 3
+
+        self._archive.writestr(info, data)
+
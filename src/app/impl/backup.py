@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+
+# ==============================================================================
+class BackupStore:
+    CHUNK_SIZE: int = 1 << 16
+
+    # Objects are named by content digest and shared by every snapshot that holds them,
+    # a snapshot lists the files one run was about to overwrite, remove or create
+    OBJECTS_DIRNAME: str = "objects"
+    SNAPSHOTS_DIRNAME: str = "snapshots"
+    SNAPSHOT_SUFFIX: str = ".jsonl"
+    SNAPSHOT_ID_PATTERN: str = r"\d{8}-\d{6}-\d{9}"
+
+    def __init__(self, output_root: Path, store_path: Path, snapshot_id: str = None):
+        self._output_root: Path     = output_root
+        self._store_path: Path      = store_path
+        self._snapshot_id: str      = snapshot_id or BackupStore.new_snapshot_id()
+
+    @property
+    def store_path(self) -> Path:
+        return self._store_path
+
+    @property
+    def snapshot_id(self) -> str:
+        return self._snapshot_id
+
+    @staticmethod
+    def new_snapshot_id() -> str:
+        # Sortable by time, unique enough for runs of one output root
+        now: int = time.time_ns()
+        return time.strftime("%Y%m%d-%H%M%S", time.localtime(now // 1_000_000_000)) + f"-{now % 1_000_000_000:09d}"
+
+    def save(self, path: Path) -> str:
+        # Called right before path is created, replaced or removed. Linking keeps the old inode
+        # alive without copying it, the output itself is then replaced by a new file. Files that
+        # do not exist yet are recorded without a digest, restoring removes them.
+        try:
+            digest: str = self._file_digest(path)
+        except FileNotFoundError:
+            digest: str = None
+
+        if digest is not None:
+            object_path: Path = self._object_path(digest)
+            if not object_path.exists():
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                self._store_object(path, object_path)
+
+        # Workers of one run append to the same snapshot, one short write per record
+        snapshots_dir: Path = self._store_path / BackupStore.SNAPSHOTS_DIRNAME
+        snapshots_dir.mkdir(parents=True, exist_ok=True)
+        record: str = json.dumps({"path": path.relative_to(self._output_root).as_posix(), "digest": digest}) + "\n"
+        with self._snapshot_path(self._snapshot_id).open("a") as file:
+            file.write(record)
+
+        return digest
+
+    def snapshots(self) -> list[dict[str, Any]]:
+        # Oldest first, with the first record of each file, None for files the run created
+        snapshots_dir: Path = self._store_path / BackupStore.SNAPSHOTS_DIRNAME
+
+        try:
+            names: list[str] = sorted(name for name in os.listdir(snapshots_dir)
+                                      if re.fullmatch(BackupStore.SNAPSHOT_ID_PATTERN + re.escape(BackupStore.SNAPSHOT_SUFFIX), name))
+        except FileNotFoundError:
+            return []
+
+        snapshots: list[dict[str, Any]] = []
+        for name in names:
+            files: dict[str, str] = self._read_snapshot(snapshots_dir / name)
+            snapshots.append({
+                "id": name[:-len(BackupStore.SNAPSHOT_SUFFIX)],
+                "files": files,
+                "bytes": sum(self._object_size(digest) for digest in set(files.values()) if digest)
+            })
+
+        return snapshots
+
+    def has_snapshot(self, snapshot_id: str) -> bool:
+        return self._snapshot_path(snapshot_id).exists()
+
+    def restore(self, snapshot_id: str) -> tuple[list[str], list[str]]:
+        # Puts back the files as they were before that run changed them and removes the files
+        # it created, returns both. Restored files are copies, later in-place edits must not
+        # reach the store.
+        if not self.has_snapshot(snapshot_id):
+            raise ValueError(f"no backup snapshot {snapshot_id!r} in {self._store_path}")
+        snapshot_path: Path = self._snapshot_path(snapshot_id)
+
+        files: dict[str, str] = self._read_snapshot(snapshot_path)
+        restored: list[str] = []
+        removed: list[str] = []
+
+        for relative_path, digest in sorted(files.items()):
+            target: Path = self._output_root / relative_path
+
+            if digest is None:
+                target.unlink(missing_ok=True)
+                self._remove_empty_parents(target)
+                removed.append(relative_path)
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path: Path = target.with_name(f".{target.name}.restore.tmp")
+            tmp_path.write_bytes(self._object_path(digest).read_bytes())
+            os.replace(tmp_path, target)
+            restored.append(relative_path)
+
+        return restored, removed
+
+    def prune(self, keep: int) -> tuple[int, int]:
+        # Keeps the newest snapshots and the objects they use, returns what was removed
+        snapshots: list[dict[str, Any]] = self.snapshots()
+        removed: list[dict[str, Any]] = snapshots[:max(len(snapshots) - keep, 0)]
+        used: set[str] = {digest for snapshot in snapshots[len(removed):] for digest in snapshot["files"].values() if digest}
+
+        for snapshot in removed:
+            self._snapshot_path(snapshot["id"]).unlink()
+
+        removed_objects: int = 0
+        objects_dir: Path = self._store_path / BackupStore.OBJECTS_DIRNAME
+        for prefix_dir in (objects_dir.iterdir() if objects_dir.exists() else ()):
+            for object_path in prefix_dir.iterdir():
+                if object_path.name not in used:
+                    object_path.unlink()
+                    removed_objects += 1
+
+            if not any(prefix_dir.iterdir()):
+                prefix_dir.rmdir()
+
+        return len(removed), removed_objects
+
+    def _remove_empty_parents(self, path: Path) -> None:
+        # Folders the run created for its new files, never the output root itself
+        for parent in path.parents:
+            if parent == self._output_root or not parent.is_relative_to(self._output_root):
+                return
+            try:
+                parent.rmdir()
+            except OSError:
+                return
+
+    def _snapshot_path(self, snapshot_id: str) -> Path:
+        # Ids given on the command line must not name a path outside the store
+        if not re.fullmatch(BackupStore.SNAPSHOT_ID_PATTERN, snapshot_id):
+            raise ValueError(f"invalid backup snapshot id {snapshot_id!r}")
+
+        return self._store_path / BackupStore.SNAPSHOTS_DIRNAME / f"{snapshot_id}{BackupStore.SNAPSHOT_SUFFIX}"
+
+    def _object_path(self, digest: str) -> Path:
+        return self._store_path / BackupStore.OBJECTS_DIRNAME / digest[:2] / digest
+
+    def _object_size(self, digest: str) -> int:
+        try:
+            return self._object_path(digest).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _store_object(self, path: Path, object_path: Path) -> None:
+        try:
+            os.link(path, object_path)
+            return
+        except FileExistsError:
+            # Stored meanwhile by another worker
+            return
+        except OSError:
+            # No hard links across devices or on this file system, fall back to a copy
+            pass
+
+        tmp_path: Path = object_path.with_name(f".{object_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(path.read_bytes())
+        os.replace(tmp_path, object_path)
+
+    def _read_snapshot(self, snapshot_path: Path) -> dict[str, str]:
+        # A file backed up twice in one run keeps its first, oldest content
+        files: dict[str, str] = {}
+
+        with snapshot_path.open() as file:
+            for line in file:
+                record: dict[str, str] = json.loads(line)
+                files.setdefault(record["path"], record["digest"])
+
+        return files
+
+    def _file_digest(self, path: Path) -> str:
+        digest = hashlib.sha256()
+        with path.open("rb") as file:
+            while chunk := file.read(BackupStore.CHUNK_SIZE):
+                digest.update(chunk)
+
+        return digest.hexdigest()
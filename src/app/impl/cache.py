@@ -0,0 +1,105 @@
+import marshal
+import os
+from pathlib import Path
+from typing import Any
+
+
+# ==============================================================================
+class BlueprintCache:
+    VERSION: int = 1
+
+    def __init__(self, directory: Path):
+        self._directory: Path   = directory / f"v{BlueprintCache.VERSION}"
+        self._hits: int         = 0
+        self._misses: int       = 0
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def get(self, content_hash: str) -> Any:
+        try:
+            data: bytes = self._path_of(content_hash).read_bytes()
+            value: Any = marshal.loads(data)
+        except (OSError, ValueError, EOFError, TypeError):
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return value
+
+    def put(self, content_hash: str, value: Any) -> None:
+        # Values marshal cannot represent (e.g. YAML timestamps) are simply not cached
+        try:
+            data: bytes = marshal.dumps(value)
+        except ValueError:
+            return
+
+        path: Path = self._path_of(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        import tempfile
+
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_name, path)
+        except OSError:
+            os.unlink(tmp_name)
+
+    def _path_of(self, content_hash: str) -> Path:
+        return self._directory / content_hash[:2] / content_hash[2:]
+
+
+# ==============================================================================
+class BlueprintMemoryCache:
+    def __init__(self, backing: BlueprintCache = None):
+        self._backing: BlueprintCache   = backing
+        self._values: dict[str, Any]    = {}
+        self._hits: int                 = 0
+        self._misses: int               = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self._values
+
+    def get(self, content_hash: str) -> Any:
+        value: Any = self._values.get(content_hash)
+
+        if value is None and self._backing:
+            value = self._backing.get(content_hash)
+            if value is not None:
+                self._values[content_hash] = value
+
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+
+        return value
+
+    def put(self, content_hash: str, value: Any) -> None:
+        self._values[content_hash] = value
+
+        if self._backing:
+            self._backing.put(content_hash, value)
+
+    def retain(self, content_hashes: set[str]) -> None:
+        for content_hash in [h for h in self._values if h not in content_hashes]:
+            del self._values[content_hash]
@@ -0,0 +1,21 @@
+import json
+import socket
+from pathlib import Path
+from typing import Any
+
+
+# Kept free of app.impl imports so that the client starts as fast as possible
+def send_request(socket_path: Path, request: dict[str, Any]) -> dict[str, Any]:
+    # One JSON line each way per connection
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        client.shutdown(socket.SHUT_WR)
+
+        with client.makefile("rb") as stream:
+            line: bytes = stream.readline()
+
+    if not line:
+        raise ConnectionError(f"no response from {socket_path}")
+
+    return json.loads(line)
@@ -0,0 +1,320 @@
+from app.impl.manifest import hash_bytes, hash_object
+from app.impl.model_info import ModelInfo, ModelClassification
+from app.impl.parser import Parser
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+
+# ==============================================================================
+class DiscoveryEntry:
+    # One per blueprint and alive for the whole run. Only the typename -> header table and what is needed
+    # to rebuild the rest is kept, the model info is built when a blueprint is rendered.
+    __slots__ = ("_key", "_typename", "_header_path", "_namespaces", "_classification", "_source", "_document_hash")
+
+    def __init__(self,
+                 key: str,
+                 typename: str,
+                 header_path: str,
+                 namespaces: tuple[str, ...],
+                 classification: ModelClassification,
+                 source: str = None,
+                 document_hash: str = None
+                 ):
+        self._key: str                              = key
+        self._typename: str                         = typename
+        self._header_path: str                      = header_path
+        self._namespaces: tuple[str, ...]           = namespaces
+        self._classification: ModelClassification  = classification
+        self._source: str                           = source or key
+        self._document_hash: str                    = document_hash
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    @property
+    def model_info(self) -> ModelInfo:
+        namespaces: list[str] = list(self._namespaces)
+        name: str = self._typename[len("::".join(namespaces)) + 2:] if namespaces else self._typename
+
+        include_guard: str = "_".join(s.upper() for s in namespaces + [name, "H"])
+        return ModelInfo(name, self._classification.value, namespaces, include_guard)
+
+    @property
+    def typename(self) -> str:
+        return self._typename
+
+    @property
+    def header_path(self) -> str:
+        return self._header_path
+
+    @property
+    def classification(self) -> ModelClassification:
+        return self._classification
+
+    @property
+    def source(self) -> str:
+        # Blueprint file holding the model, a bundle for bundled models
+        return self._source
+
+    @property
+    def document_hash(self) -> str:
+        # Content hash of the bundle document, None for single-model files
+        return self._document_hash
+
+    @property
+    def relative_dir(self) -> str:
+        return "/".join(self._namespaces)
+
+    @staticmethod
+    def from_key(key: str) -> "DiscoveryEntry":
+        relative_dir, _, filename = key.rpartition("/")
+        base_name, _, model_type = filename[:-len(".yaml")].rpartition(".")
+
+        if not base_name:
+            raise ValueError("missing kind, expected <name>.<kind>.yaml")
+        if model_type not in {classification.value for classification in ModelClassification}:
+            raise ValueError(f"invalid kind {model_type!r}, expected <name>.<kind>.yaml")
+
+        namespaces = relative_dir.split("/") if relative_dir else []
+        return DiscoveryEntry.create(key, base_name, model_type, namespaces)
+
+    @staticmethod
+    def create(key: str,
+               base_name: str,
+               model_type: str,
+               namespaces: list[str],
+               source: str = None,
+               document_hash: str = None
+               ) -> "DiscoveryEntry":
+        # Bundled and single-file models share this, both must yield identical names and guards.
+        # Namespace parts repeat across a folder and keys are shared with the manifest, interning
+        # stores each one once.
+        namespaces = [sys.intern(namespace) for namespace in namespaces]
+        h_path = "/".join(namespaces + [f"{base_name}.h"])
+        typename = "::".join(namespaces + [base_name])
+
+        return DiscoveryEntry(sys.intern(key), typename, h_path, tuple(namespaces), ModelClassification(model_type), source, document_hash)
+
+
+# ==============================================================================
+class DiscoveryIndex:
+    VERSION: int = 2
+
+    # Multi-document files holding many models, each naming its own kind and namespace
+    BUNDLE_SUFFIX: str = ".bundle.yaml"
+
+    # Directories modified this recently may change again within the same mtime tick
+    RACY_INTERVAL_NS: int = 2_000_000_000
+
+    def __init__(self, root: Path, index_path: Path):
+        self._root: Path                            = root
+        self._index_path: Path                      = index_path
+        self._dirs: dict[str, dict[str, Any]]       = {}
+        self._entries: dict[str, DiscoveryEntry]    = {}
+        self._rescanned: int                        = 0
+        self._bundles: dict[str, dict[str, Any]]    = {}
+        self._documents: dict[str, dict[str, Any]]  = {}
+        self._errors: list[str]                     = []
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def entries(self) -> dict[str, DiscoveryEntry]:
+        return self._entries
+
+    @property
+    def rescanned(self) -> int:
+        return self._rescanned
+
+    @property
+    def errors(self) -> list[str]:
+        return self._errors
+
+    def path_of(self, entry: DiscoveryEntry) -> Path:
+        return self._root / entry.source
+
+    def document(self, entry: DiscoveryEntry) -> dict[str, Any]:
+        # Bundles loaded during discovery are kept until the next refresh, others are loaded on demand
+        documents: dict[str, Any] = self._documents.get(entry.source)
+
+        if documents is None:
+            self._load_bundle(entry.source, self.path_of(entry).read_bytes())
+            documents = self._documents[entry.source]
+
+        return documents[entry.typename]
+
+    def load(self) -> None:
+        try:
+            data: dict[str, Any] = json.loads(self._index_path.read_text())
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(data, dict) or data.get("version") != DiscoveryIndex.VERSION or data.get("root") != str(self._root):
+            return
+
+        self._dirs = data.get("dirs", {})
+        self._bundles = data.get("bundles", {})
+
+    def save(self) -> None:
+        data: dict[str, Any] =  {
+                                    "version": DiscoveryIndex.VERSION,
+                                    "root": str(self._root),
+                                    "dirs": self._dirs,
+                                    "bundles": self._bundles
+                                }
+
+        self._index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = self._index_path.with_name(self._index_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, separators=(",", ":"), sort_keys=True))
+        os.replace(tmp_path, self._index_path)
+
+    def refresh(self) -> None:
+        # Unchanged directories reuse their cached listing, only their mtime is checked
+        dirs: dict[str, dict[str, Any]] = {}
+        keys: list[str]                 = []
+        now: int                        = time.time_ns()
+        self._rescanned                 = 0
+
+        pending: list[str] = [""]
+        while pending:
+            relative_dir: str = pending.pop()
+            absolute_dir: Path = self._root / relative_dir if relative_dir else self._root
+
+            try:
+                mtime: int = os.stat(absolute_dir).st_mtime_ns
+            except FileNotFoundError:
+                continue
+
+            cached: dict[str, Any] = self._dirs.get(relative_dir)
+            if cached is None or cached.get("mtime") != mtime:
+                cached = self._scan_dir(absolute_dir)
+                cached["mtime"] = mtime if now - mtime > DiscoveryIndex.RACY_INTERVAL_NS else None
+                self._rescanned += 1
+
+            dirs[relative_dir] = cached
+            prefix: str = f"{relative_dir}/" if relative_dir else ""
+            keys.extend(prefix + filename for filename in cached["files"])
+            pending.extend(prefix + subdir for subdir in cached["subdirs"])
+
+        self._dirs = dirs
+        self._documents = {}
+        self._errors = []
+
+        entries: dict[str, DiscoveryEntry]  = {}
+        bundles: dict[str, dict[str, Any]]  = {}
+        typenames: dict[str, str]           = {}
+
+        for key in sorted(keys):
+            if key.endswith(DiscoveryIndex.BUNDLE_SUFFIX):
+                bundles[key] = self._refresh_bundle(key)
+                self._errors.extend(f"{self._root / key}: {error}" for error in bundles[key]["errors"])
+                found: list[DiscoveryEntry] = [self._bundle_entry(key, model) for model in bundles[key]["models"]]
+            else:
+                # A stray yaml file is reported, the rest of the tree still renders
+                try:
+                    found: list[DiscoveryEntry] = [self._entries.get(key) or DiscoveryEntry.from_key(key)]
+                except ValueError as e:
+                    self._errors.append(f"{self._root / key}: {e}")
+                    continue
+
+            # The first blueprint of a typename in key order wins, both would write the same outputs
+            for entry in found:
+                if entry.typename in typenames:
+                    self._errors.append(f"{self._root / entry.source}: {entry.typename} is already defined in {self._root / typenames[entry.typename]}")
+                    continue
+
+                typenames[entry.typename] = entry.source
+                entries[entry.key] = entry
+
+        self._bundles = bundles
+        self._entries = entries
+
+    def _refresh_bundle(self, key: str) -> dict[str, Any]:
+        # Bundles are always hashed, but only loaded again when their content changed
+        data: bytes = (self._root / key).read_bytes()
+
+        cached: dict[str, Any] = self._bundles.get(key)
+        if cached and cached["hash"] == hash_bytes(data):
+            return cached
+
+        return self._load_bundle(key, data)
+
+    def _load_bundle(self, key: str, data: bytes) -> dict[str, Any]:
+        relative_dir: str               = key.rpartition("/")[0]
+        documents: dict[str, Any]       = {}
+        record: dict[str, Any]          = {"hash": hash_bytes(data), "models": [], "errors": []}
+
+        try:
+            loaded: list[Any] = Parser.load_yaml_all(data.decode("utf-8"))
+        except Exception as e:
+            record["errors"].append(f"{type(e).__name__}: {e}")
+            loaded: list[Any] = []
+
+        for position, document in enumerate(loaded, 1):
+            # Empty documents, e.g. after a trailing separator, hold no model
+            if document is None:
+                continue
+
+            try:
+                name, kind, namespaces = self._document_header(document, relative_dir)
+            except ValueError as e:
+                record["errors"].append(f"document {position}: {e}")
+                continue
+
+            model: dict[str, Any] = {"name": name, "kind": kind, "namespaces": namespaces, "hash": hash_object(document)}
+            record["models"].append(model)
+            documents.setdefault("::".join(namespaces + [name]), document)
+
+        self._documents[key] = documents
+        return record
+
+    def _document_header(self, document: Any, relative_dir: str) -> tuple[str, str, list[str]]:
+        if not isinstance(document, dict):
+            raise ValueError("expected a mapping")
+
+        name: Any = document.get("name")
+        if not isinstance(name, str) or not name.isidentifier():
+            raise ValueError(f"invalid or missing name {name!r}")
+
+        kind: Any = document.get("kind")
+        if kind not in {classification.value for classification in ModelClassification}:
+            raise ValueError(f"{name}: invalid or missing kind {kind!r}")
+
+        # Without a namespace the model sits where a single-model file in the bundle's folder would
+        namespace: Any = document.get("namespace")
+        if namespace is None:
+            namespaces: list[str] = relative_dir.split("/") if relative_dir else []
+        elif isinstance(namespace, str):
+            namespaces: list[str] = [part.strip() for part in namespace.split("::") if part.strip()]
+        elif isinstance(namespace, list) and all(isinstance(part, str) for part in namespace):
+            namespaces: list[str] = list(namespace)
+        else:
+            raise ValueError(f"{name}: invalid namespace {namespace!r}")
+
+        return name, kind, namespaces
+
+    def _bundle_entry(self, key: str, model: dict[str, Any]) -> DiscoveryEntry:
+        typename: str = "::".join(model["namespaces"] + [model["name"]])
+        return DiscoveryEntry.create(f"{key}#{typename}", model["name"], model["kind"], model["namespaces"], key, model["hash"])
+
+    def _scan_dir(self, absolute_dir: Path) -> dict[str, Any]:
+        files: list[str]    = []
+        subdirs: list[str]  = []
+
+        with os.scandir(absolute_dir) as it:
+            for dir_entry in it:
+                if dir_entry.is_dir():
+                    if not dir_entry.is_symlink():
+                        subdirs.append(dir_entry.name)
+                elif dir_entry.name.endswith(".yaml"):
+                    files.append(dir_entry.name)
+
+        return {"files": sorted(files), "subdirs": sorted(subdirs)}
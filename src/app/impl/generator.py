@@ -1,5 +1,27 @@
 from app.impl.model import Model
-from jinja2 import Environment, PackageLoader, Template
+from app.impl.templates import find_precompiled_templates, generator_fingerprint
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+# Jinja is imported when a generator is built, up-to-date runs never need one
+if TYPE_CHECKING:
+    from jinja2 import BaseLoader, Environment, Template
+
+
+def create_environment(loader: "BaseLoader", bytecode_cache_dir: str = None) -> "Environment":
+    from jinja2 import Environment, FileSystemBytecodeCache
+
+    bytecode_cache: FileSystemBytecodeCache = None
+    if bytecode_cache_dir:
+        Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
+
+    return Environment(loader=loader,
+                       bytecode_cache=bytecode_cache,
+                       trim_blocks=True,
+                       lstrip_blocks=True
+                       )
 
 
 class CppGenerator:
@@ -10,32 +32,66 @@ class CppGenerator:
                  class_source_template_filename: str,
                  interface_header_template_filename: str,
                  enum_header_template_filename: str,
-                 tab_indent: str
+                 tab_indent: str,
+                 bytecode_cache_dir: str = None
                  ):
 
-        env: Environment = Environment(loader=PackageLoader(jinja_env_package),
-                                       trim_blocks=True,
-                                       lstrip_blocks=True
-                                       )
+        from jinja2 import ModuleLoader, PackageLoader
+
+        precompiled_dir: Path = find_precompiled_templates(jinja_env_package)
+
+        if precompiled_dir:
+            env: Environment = create_environment(ModuleLoader(str(precompiled_dir)))
+        else:
+            env: Environment = create_environment(PackageLoader(jinja_env_package), bytecode_cache_dir)
 
         self._class_template_h: Template        = env.get_template(class_header_template_filename)
         self._class_template_cpp: Template      = env.get_template(class_source_template_filename)
         self._interface_template_h: Template    = env.get_template(interface_header_template_filename)
         self._enum_template_h: Template         = env.get_template(enum_header_template_filename)
         self._tab_indent: str                   = tab_indent
+        self._fingerprint: str                  = generator_fingerprint(jinja_env_package, tab_indent)
+
+    @property
+    def fingerprint(self) -> str:
+        return self._fingerprint
+
+    @staticmethod
+    def compute_fingerprint(jinja_env_package: str,
+                            class_header_template_filename: str,
+                            class_source_template_filename: str,
+                            interface_header_template_filename: str,
+                            enum_header_template_filename: str,
+                            tab_indent: str,
+                            bytecode_cache_dir: str = None
+                            ) -> str:
+        # Same value as CppGenerator(...).fingerprint without loading any template
+        return generator_fingerprint(jinja_env_package, tab_indent)
 
     def generate_class_header_content(self, model: Model) -> str:
         if model:
-            return self._class_template_h.render(model=model.value, tab=self._tab_indent)
+            return self._class_template_h.render(model=model, tab=self._tab_indent)
 
     def generate_class_source_content(self, model: Model) -> str:
         if model:
-            return self._class_template_cpp.render(model=model.value, tab=self._tab_indent)
+            return self._class_template_cpp.render(model=model, tab=self._tab_indent)
 
     def generate_interface_header_content(self, model: Model) -> str:
         if model:
-            return self._interface_template_h.render(model=model.value, tab=self._tab_indent)
+            return self._interface_template_h.render(model=model, tab=self._tab_indent)
 
     def generate_enum_header_content(self,model: Model) -> str:
         if model:
-            return self._enum_template_h.render(model=model.value, tab=self._tab_indent)
+            return self._enum_template_h.render(model=model, tab=self._tab_indent)
+
+    def stream_class_header_content(self, model: Model) -> Iterator[str]:
+        return self._class_template_h.generate(model=model, tab=self._tab_indent)
+
+    def stream_class_source_content(self, model: Model) -> Iterator[str]:
+        return self._class_template_cpp.generate(model=model, tab=self._tab_indent)
+
+    def stream_interface_header_content(self, model: Model) -> Iterator[str]:
+        return self._interface_template_h.generate(model=model, tab=self._tab_indent)
+
+    def stream_enum_header_content(self, model: Model) -> Iterator[str]:
+        return self._enum_template_h.generate(model=model, tab=self._tab_indent)
@@ -0,0 +1,73 @@
+import json
+import sys
+from typing import Any, Iterable
+
+
+# ==============================================================================
+class DependencyGraph:
+    def __init__(self):
+        self._references: dict[str, tuple[str, ...]]   = {}
+        self._dependents: dict[str, set[str]]           = {}
+
+    def set_references(self, key: str, typenames: Iterable[str]) -> None:
+        self.remove(key)
+
+        # Stored as tuples of interned names, most typenames are referenced by many models
+        self._references[key] = tuple({sys.intern(typename) for typename in typenames})
+        for typename in self._references[key]:
+            self._dependents.setdefault(typename, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        for typename in self._references.pop(key, ()):
+            dependents: set[str] = self._dependents[typename]
+            dependents.discard(key)
+            if not dependents:
+                del self._dependents[typename]
+
+    def keys(self) -> set[str]:
+        return set(self._references)
+
+    def references(self, key: str) -> set[str]:
+        return set(self._references.get(key, ()))
+
+    def dependents(self, typename: str) -> set[str]:
+        return self._dependents.get(typename, set())
+
+    def dependents_of(self, typenames: Iterable[str]) -> set[str]:
+        # Direct dependents only: a model's text depends on the headers it names, not on their contents
+        keys: set[str] = set()
+
+        for typename in typenames:
+            keys.update(self._dependents.get(typename, ()))
+
+        return keys
+
+    def project_edges(self, blueprints: dict[str, str]) -> dict[str, list[str]]:
+        # typename -> dependent typenames, restricted to blueprints of the project
+        keys: dict[str, str] = {key: typename for typename, key in blueprints.items()}
+        edges: dict[str, list[str]] = {}
+
+        for typename in sorted(blueprints):
+            dependents: list[str] = sorted(keys[key] for key in self._dependents.get(typename, ()) if key in keys)
+            edges[typename] = dependents
+
+        return edges
+
+    def to_json(self, blueprints: dict[str, str]) -> str:
+        data: dict[str, Any] =  {
+                                    "blueprints": {typename: blueprints[typename] for typename in sorted(blueprints)},
+                                    "dependents": self.project_edges(blueprints)
+                                }
+
+        return json.dumps(data, indent=2) + "\n"
+
+    def to_dot(self, blueprints: dict[str, str]) -> str:
+        lines: list[str] = ["digraph dependents {"]
+
+        for typename, dependents in self.project_edges(blueprints).items():
+            lines.append(f"    \"{typename}\";")
+            for dependent in dependents:
+                lines.append(f"    \"{typename}\" -> \"{dependent}\";")
+
+        lines.append("}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,222 @@
+import json
+from typing import Any, Iterable
+
+
+# ==============================================================================
+class IncludeGraph:
+    # Bumped whenever the analysis changes, so that cached reports are recomputed
+    VERSION: int = 1
+
+    def __init__(self, system_header_bytes: int):
+        self._system_header_bytes: int          = system_header_bytes
+        self._includes: dict[str, list[str]]    = {}
+        self._system: dict[str, list[str]]      = {}
+        self._sizes: dict[str, int]             = {}
+
+    @property
+    def system_header_bytes(self) -> int:
+        return self._system_header_bytes
+
+    def add_header(self, header: str, size: int, project_includes: Iterable[str], system_includes: Iterable[str]) -> None:
+        self._includes[header]  = sorted(project_includes)
+        self._system[header]    = sorted(system_includes)
+        self._sizes[header]     = size
+
+    def inputs(self) -> list[Any]:
+        # Everything the analysis depends on, hashed to key the cached report
+        return [IncludeGraph.VERSION, self._system_header_bytes,
+                [[header, self._sizes[header], self._includes[header], self._system[header]] for header in sorted(self._includes)]]
+
+    def analyze(self) -> dict[str, Any]:
+        headers: list[str] = sorted(self._includes)
+        index: dict[str, int] = {header: i for i, header in enumerate(headers)}
+
+        # Includes of headers that are not generated by this project are left out of the graph
+        edges: list[list[int]] = [[index[include] for include in self._includes[header] if include in index and include != header]
+                                  for header in headers]
+
+        components: list[list[int]] = self._strongly_connected(edges)
+        component_of: list[int] = [0] * len(headers)
+        for c, members in enumerate(components):
+            for node in members:
+                component_of[node] = c
+
+        # Condensation of the graph, one node per component
+        successors: list[set[int]] = [set() for _ in components]
+        predecessors: list[list[int]] = [[] for _ in components]
+        for c, members in enumerate(components):
+            for node in members:
+                successors[c].update(component_of[target] for target in edges[node] if component_of[target] != c)
+            for target in successors[c]:
+                predecessors[target].append(c)
+
+        cycles: list[list[str]] = sorted(sorted(headers[node] for node in members) for members in components if len(members) > 1)
+        cycle_of: dict[str, int] = {header: i for i, cycle in enumerate(cycles) for header in cycle}
+
+        # Closures are bitsets over headers and every total is taken with bit_count, never bit by bit.
+        # Sizes are summed per binary digit, plane k holds the headers whose size has bit k set.
+        planes: list[int] = [0] * max(self._sizes.values(), default=0).bit_length()
+        for node, header in enumerate(headers):
+            size: int = self._sizes[header]
+            for k in range(size.bit_length()):
+                if size >> k & 1:
+                    planes[k] |= 1 << node
+
+        system_index: dict[str, int] = {}
+        system_bits: list[int] = [0] * len(headers)
+        for node, header in enumerate(headers):
+            for include in self._system[header]:
+                system_bits[node] |= 1 << system_index.setdefault(include, len(system_index))
+
+        # Components come out of Tarjan in reverse topological order, so each one only
+        # needs the closures of components already visited. A closure is dropped once
+        # every component including it has used it.
+        rows: list[dict[str, Any]] = [{} for _ in headers]
+        closures: list[int] = [0] * len(components)
+        system_closures: list[int] = [0] * len(components)
+        pending: list[int] = [len(sources) for sources in predecessors]
+
+        for c, members in enumerate(components):
+            closure: int = 0
+            system: int = 0
+            for node in members:
+                closure |= 1 << node
+                system |= system_bits[node]
+            for target in successors[c]:
+                closure |= closures[target]
+                system |= system_closures[target]
+                pending[target] -= 1
+                if not pending[target]:
+                    closures[target] = 0
+
+            if pending[c]:
+                closures[c] = closure
+                system_closures[c] = system
+
+            # Members of a component reach the same headers, so totals are computed once per component
+            reached: int = closure.bit_count()
+            size: int = sum((closure & plane).bit_count() << k for k, plane in enumerate(planes))
+            system_count: int = system.bit_count()
+
+            for node in members:
+                rows[node] = {
+                    "header": headers[node],
+                    "fan_out": reached - 1,
+                    "system_includes": system_count,
+                    "bytes": self._sizes[headers[node]],
+                    "estimated_bytes": size + system_count * self._system_header_bytes,
+                    "cycle": cycle_of.get(headers[node])
+                }
+
+        # Fan-in is the size of the reverse closure, built from the other end of the order.
+        # A header does not count itself, headers of its own cycle do.
+        reverse_closures: list[int] = [0] * len(components)
+        pending = [len(targets) for targets in successors]
+
+        for c in reversed(range(len(components))):
+            reverse: int = 0
+            for node in components[c]:
+                reverse |= 1 << node
+            for source in predecessors[c]:
+                reverse |= reverse_closures[source]
+                pending[source] -= 1
+                if not pending[source]:
+                    reverse_closures[source] = 0
+
+            if pending[c]:
+                reverse_closures[c] = reverse
+
+            # Every header that reaches this one, plus its own source, pays its estimated size
+            fan_in: int = reverse.bit_count() - 1
+            for node in components[c]:
+                rows[node]["fan_in"] = fan_in
+                rows[node]["impact_bytes"] = rows[node]["estimated_bytes"] * (fan_in + 1)
+
+        rows.sort(key=lambda row: (-row["impact_bytes"], row["header"]))
+
+        return {
+            "headers": rows,
+            "cycles": cycles,
+            "system_header_bytes": self._system_header_bytes
+        }
+
+    @staticmethod
+    def to_json(report: dict[str, Any]) -> str:
+        # Keys are sorted so that fresh and cached reports print the same
+        return json.dumps(report, indent=2, sort_keys=True) + "\n"
+
+    @staticmethod
+    def to_text(report: dict[str, Any]) -> str:
+        rows: list[dict[str, Any]] = report["headers"]
+        width: int = max((len(row["header"]) for row in rows), default=6)
+
+        lines: list[str] = [f"{'header':<{width}}  {'fan-in':>6}  {'fan-out':>7}  {'system':>6}  {'est. KiB':>9}  {'impact KiB':>11}  cycle"]
+        for row in rows:
+            cycle: str = "" if row["cycle"] is None else str(row["cycle"])
+            lines.append(f"{row['header']:<{width}}  {row['fan_in']:>6}  {row['fan_out']:>7}  {row['system_includes']:>6}  "
+                         f"{row['estimated_bytes'] / 1024:>9.1f}  {row['impact_bytes'] / 1024:>11.1f}  {cycle}")
+
+        lines.append("")
+        lines.append(f"{len(report['cycles'])} include cycle(s)")
+        for i, cycle in enumerate(report["cycles"]):
+            lines.append(f"  {i}: {' -> '.join(cycle)}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _strongly_connected(edges: list[list[int]]) -> list[list[int]]:
+        # Iterative Tarjan, large projects would exceed the recursion limit
+        count: int = len(edges)
+        order: list[int] = [-1] * count
+        low: list[int] = [0] * count
+        on_stack: list[bool] = [False] * count
+        stack: list[int] = []
+        components: list[list[int]] = []
+        counter: int = 0
+
+        for root in range(count):
+            if order[root] != -1:
+                continue
+
+            work: list[tuple[int, int]] = [(root, 0)]
+            while work:
+                node, position = work.pop()
+
+                if position == 0:
+                    order[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+
+                descended: bool = False
+                while position < len(edges[node]):
+                    target: int = edges[node][position]
+                    position += 1
+
+                    if order[target] == -1:
+                        work.append((node, position))
+                        work.append((target, 0))
+                        descended = True
+                        break
+
+                    if on_stack[target]:
+                        low[node] = min(low[node], order[target])
+
+                if descended:
+                    continue
+
+                if low[node] == order[node]:
+                    members: list[int] = []
+                    while True:
+                        member: int = stack.pop()
+                        on_stack[member] = False
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(members))
+
+                if work:
+                    parent: int = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+        return components
@@ -0,0 +1,371 @@
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, BinaryIO, KeysView
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_object(obj: Any) -> str:
+    # YAML scalars JSON cannot represent, like timestamps, hash by their string form
+    return hash_bytes(json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+_DECODER: json.JSONDecoder = json.JSONDecoder()
+
+
+# ==============================================================================
+class Manifest:
+    # One JSON line per entry and per report after a header line with everything else. Only the
+    # hash and line offset of each entry are held in memory, the rest is read back when needed,
+    # and updates go to a journal until saved, so very large trees do not grow the process.
+    VERSION: int = 6
+
+    def __init__(self, path: Path):
+        self._path: Path                            = path
+        self._fingerprints: dict[str, str]          = {}
+        self._project_include_map: dict[str, Any]   = {}
+        self._aggregates: dict[str, dict[str, Any]] = {}
+        self._dirty: bool                           = True
+
+        # Key -> (hash, offset), offsets below zero point into the journal
+        self._entries: dict[str, tuple[str, int]]   = {}
+        self._reports: dict[str, tuple[str, int]]   = {}
+        self._file: BinaryIO                        = None
+        self._journal: BinaryIO                     = None
+        self._last_line: tuple[int, list[Any]]      = (None, None)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def fingerprints(self) -> dict[str, str]:
+        return self._fingerprints
+
+    def keys(self) -> KeysView[str]:
+        return self._entries.keys()
+
+    def load(self) -> None:
+        self.close()
+
+        try:
+            file: BinaryIO = self._path.open("rb")
+        except OSError:
+            return
+
+        try:
+            header: Any = json.loads(file.readline())
+            if not isinstance(header, dict) or header.get("version") != Manifest.VERSION:
+                raise ValueError("unknown manifest version")
+
+            entries: dict[str, tuple[str, int]] = {}
+            reports: dict[str, tuple[str, int]] = {}
+            offset: int = file.tell()
+
+            # Only the start of each line is decoded. Keys and hashes are interned, the discovery entries
+            # and the session hold the same strings.
+            for line in file:
+                section, key, input_hash = Manifest._prefix(line)
+                records: dict[str, tuple[str, int]] = entries if section == "entry" else reports
+                records[sys.intern(key)] = (sys.intern(input_hash) if input_hash else None, offset)
+                offset += len(line)
+        except ValueError:
+            file.close()
+            return
+
+        self._fingerprints          = header.get("fingerprints", {})
+        self._project_include_map   = header.get("project_include_map", {})
+        self._aggregates            = header.get("aggregates", {})
+        self._entries               = entries
+        self._reports               = reports
+        self._file                  = file
+        self._dirty                 = False
+
+    def save(self) -> None:
+        # Unchanged manifests are not written again
+        if not self._dirty:
+            return
+
+        header: dict[str, Any] =    {
+                                        "version": Manifest.VERSION,
+                                        "fingerprints": self._fingerprints,
+                                        "project_include_map": self._project_include_map,
+                                        "aggregates": self._aggregates
+                                    }
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = self._path.with_name(self._path.name + ".tmp")
+        moved: dict[str, dict[str, tuple[str, int]]] = {"entry": {}, "report": {}}
+
+        # Lines are copied one at a time from the previous file or the journal
+        with tmp_path.open("wb") as stream:
+            stream.write(json.dumps(header, sort_keys=True).encode("utf-8") + b"\n")
+
+            for section, records in (("entry", self._entries), ("report", self._reports)):
+                for key in sorted(records):
+                    input_hash, offset = records[key]
+                    try:
+                        raw: bytes = self._read(offset)
+                        line_section, line_key, line_hash = Manifest._prefix(raw)
+                        if (line_section, line_key) != (section, key):
+                            continue
+                        # Only invalidated entries are encoded again
+                        if line_hash != input_hash:
+                            raw = Manifest._encode(section, key, input_hash, json.loads(raw)[3])
+                    except (OSError, ValueError):
+                        continue
+
+                    moved[section][key] = (input_hash, stream.tell())
+                    stream.write(raw)
+
+        self.close()
+        os.replace(tmp_path, self._path)
+
+        self._entries   = moved["entry"]
+        self._reports   = moved["report"]
+        self._dirty     = False
+
+    def close(self) -> None:
+        # The journal is an anonymous temporary file, it goes away with its handle
+        for file in (self._file, self._journal):
+            if file:
+                file.close()
+
+        self._file      = None
+        self._journal   = None
+        self._last_line = (None, None)
+
+    def update_fingerprints(self, fingerprints: dict[str, str]) -> bool:
+        # Any change in templates or include maps invalidates every entry
+        if fingerprints == self._fingerprints:
+            return False
+
+        self._fingerprints = dict(fingerprints)
+        self.invalidate()
+        return True
+
+    def update_project_include_map(self, project_include_map: dict[str, Any]) -> set[str]:
+        # Returns the typenames that were added, removed or moved to another header
+        changed: set[str] = {typename for typename in project_include_map.keys() | self._project_include_map.keys()
+                             if project_include_map.get(typename) != self._project_include_map.get(typename)}
+
+        # The caller's table is kept even when equal, its strings are shared with the discovery entries
+        self._project_include_map = project_include_map
+        self._dirty = self._dirty or bool(changed)
+        return changed
+
+    def invalidate(self) -> None:
+        # Outputs are kept so stale files can still be cleaned up
+        self._entries = {key: (None, offset) for key, (_, offset) in self._entries.items()}
+
+        for aggregate in self._aggregates.values():
+            aggregate["hash"] = None
+
+        self._dirty = True
+
+    def invalidate_entry(self, key: str) -> None:
+        if key in self._entries:
+            self._entries[key] = (None, self._entries[key][1])
+            self._dirty = True
+
+    def invalidate_dependents(self, typenames: set[str]) -> None:
+        # Entries naming any of the typenames. Entries are read one by one instead of keeping
+        # a dependency graph of the whole tree, and not at all when no typename changed.
+        if not typenames:
+            return
+
+        for key in self._entries:
+            if not typenames.isdisjoint(self.references(key)):
+                self.invalidate_entry(key)
+
+    def invalidate_outputs(self, outputs: set[str]) -> None:
+        # Files changed behind the generator's back, e.g. restored from a backup
+        for key in self._entries:
+            if not outputs.isdisjoint(self.outputs(key)):
+                self.invalidate_entry(key)
+
+        for aggregate in self._aggregates.values():
+            if not outputs.isdisjoint(aggregate.get("outputs", ())):
+                aggregate["hash"] = None
+                self._dirty = True
+
+    def references(self, key: str) -> list[str]:
+        return self._entry(key).get("references", [])
+
+    def project_includes(self, key: str) -> list[str]:
+        return self._entry(key).get("project_includes", [])
+
+    def system_includes(self, key: str) -> list[str]:
+        return self._entry(key).get("system_includes", [])
+
+    def digests(self, key: str) -> dict[str, str]:
+        # Output -> content digest when written, lets checks verify files without rendering
+        return self._entry(key).get("digests", {})
+
+    def outputs(self, key: str) -> list[str]:
+        return self._entry(key).get("outputs", [])
+
+    def is_up_to_date(self, key: str, input_hash: str, output_root: Path) -> bool:
+        record: tuple[str, int] = self._entries.get(key)
+
+        # The hash is in memory, the entry is only read for hashes that match
+        if record is None or record[0] != input_hash:
+            return False
+
+        return Manifest._outputs_intact(self._entry(key), output_root)
+
+    def update(self,
+               key: str,
+               input_hash: str,
+               outputs: list[str],
+               references: list[str] = (),
+               system_includes: list[str] = (),
+               project_includes: list[str] = (),
+               digests: dict[str, str] = None,
+               stats: dict[str, list[int]] = None
+               ) -> None:
+        entry: dict[str, Any] = {
+                                    "outputs": sorted(outputs),
+                                    "references": sorted(references),
+                                    "system_includes": sorted(system_includes),
+                                    "project_includes": sorted(project_includes),
+                                    "digests": dict(sorted((digests or {}).items())),
+                                    "stats": dict(sorted((stats or {}).items()))
+                                }
+
+        self._entries[sys.intern(key)] = (input_hash, self._append("entry", key, input_hash, entry))
+
+    def retain(self, keys: set[str]) -> list[str]:
+        removed: list[str] = [key for key in self._entries if key not in keys]
+        orphans: set[str] = set()
+
+        for key in removed:
+            orphans.update(self.outputs(key))
+            del self._entries[key]
+            self._dirty = True
+
+        # A model that moved to another blueprint file now owns the same outputs under a new key
+        if orphans:
+            for key in self._entries:
+                orphans.difference_update(self.outputs(key))
+
+        return sorted(orphans)
+
+    # Aggregates are outputs built from many entries, like unity sources, tracked by name
+    def aggregate_outputs(self, name: str) -> list[str]:
+        aggregate: dict[str, Any] = self._aggregates.get(name)
+        return aggregate.get("outputs", []) if aggregate else []
+
+    def is_aggregate_up_to_date(self, name: str, input_hash: str, output_root: Path) -> bool:
+        aggregate: dict[str, Any] = self._aggregates.get(name)
+
+        if aggregate is None or aggregate.get("hash") != input_hash:
+            return False
+
+        return Manifest._outputs_intact(aggregate, output_root)
+
+    def update_aggregate(self, name: str, input_hash: str, outputs: list[str], stats: dict[str, list[int]] = None) -> None:
+        self._aggregates[name] = {"hash": input_hash, "outputs": sorted(outputs), "stats": dict(sorted((stats or {}).items()))}
+        self._dirty = True
+
+    def remove_aggregate(self, name: str) -> list[str]:
+        if name not in self._aggregates:
+            return []
+
+        self._dirty = True
+        return self._aggregates.pop(name).get("outputs", [])
+
+    # Reports are derived data kept only while their input hash matches
+    def cached_report(self, name: str, input_hash: str) -> Any:
+        record: tuple[str, int] = self._reports.get(name)
+        if record is None or record[0] != input_hash:
+            return None
+
+        line: list[Any] = self._line("report", name, record[1])
+        return line[3] if line else None
+
+    def cache_report(self, name: str, input_hash: str, data: Any) -> None:
+        self._reports[name] = (input_hash, self._append("report", name, input_hash, data))
+
+    @staticmethod
+    def output_stat(path: Path) -> list[int]:
+        stat: os.stat_result = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    @staticmethod
+    def _outputs_intact(entry: dict[str, Any], output_root: Path) -> bool:
+        # Outputs must still have the size and modification time recorded when they were written,
+        # so hand edits are caught with one stat per output and without reading any file
+        stats: dict[str, list[int]] = entry.get("stats", {})
+
+        for output in entry.get("outputs", []):
+            try:
+                if Manifest.output_stat(output_root / output) != stats.get(output):
+                    return False
+            except OSError:
+                return False
+
+        return True
+
+    @staticmethod
+    def _encode(section: str, key: str, input_hash: str, data: Any) -> bytes:
+        return json.dumps([section, key, input_hash, data], sort_keys=True, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    @staticmethod
+    def _prefix(line: bytes) -> tuple[str, str, str]:
+        # Section, key and hash from the start of a line, without decoding the rest
+        text: str = line.decode("utf-8")
+        section, end = _DECODER.raw_decode(text, 1)
+        key, end = _DECODER.raw_decode(text, end + 1)
+        input_hash, _ = _DECODER.raw_decode(text, end + 1)
+        return section, key, input_hash
+
+    def _entry(self, key: str) -> dict[str, Any]:
+        record: tuple[str, int] = self._entries.get(key)
+        line: list[Any] = self._line("entry", key, record[1]) if record else None
+        return line[3] if line else {}
+
+    def _line(self, section: str, key: str, offset: int) -> list[Any]:
+        # The last line read is kept, callers tend to ask for several fields of one entry in a row
+        if self._last_line[0] != offset:
+            try:
+                self._last_line = (offset, json.loads(self._read(offset)))
+            except (OSError, ValueError):
+                self._last_line = (offset, None)
+
+        # A manifest replaced by another process reads as missing entries, which are then regenerated
+        line: list[Any] = self._last_line[1]
+        if not isinstance(line, list) or len(line) != 4 or line[0] != section or line[1] != key:
+            return None
+
+        return line
+
+    def _read(self, offset: int) -> bytes:
+        if offset < 0:
+            stream: BinaryIO = self._journal
+            stream.seek(-1 - offset)
+        else:
+            if self._file is None:
+                self._file = self._path.open("rb")
+            stream: BinaryIO = self._file
+            stream.seek(offset)
+
+        return stream.readline()
+
+    def _append(self, section: str, key: str, input_hash: str, data: Any) -> int:
+        # Imported on the first update, up-to-date runs never journal anything
+        if self._journal is None:
+            import tempfile
+            self._journal = tempfile.TemporaryFile()
+
+        self._journal.seek(0, os.SEEK_END)
+        position: int = self._journal.tell()
+        self._journal.write(Manifest._encode(section, key, input_hash, data))
+        self._dirty = True
+
+        return -1 - position
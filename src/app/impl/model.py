@@ -1,4 +1,3 @@
-from typing import Any
 from enum import Enum
 
 
@@ -11,6 +10,8 @@ class Visibility(Enum):
 
 # ==============================================================================
 class Parameter:
+    __slots__ = ("name", "description", "type", "indirection", "const", "volatile", "default")
+
     def __init__(self,
                  name: str = "_defaultMember",
                  description: str = "Parameter description",
@@ -20,24 +21,19 @@ class Parameter:
                  volatile: bool = False,
                  default: str = ""
                  ):
-
-        self._param: dict[str, Any] =   {
-                                            "name": name,
-                                            "description": description,
-                                            "type": type,
-                                            "indirection": indirection,
-                                            "const": const,
-                                            "volatile": volatile,
-                                            "default": default
-                                        }
-
-    @property
-    def value(self) -> dict[str, Any]:
-        return self._param
+        self.name: str          = name
+        self.description: str   = description
+        self.type: str          = type
+        self.indirection: str   = indirection
+        self.const: bool        = const
+        self.volatile: bool     = volatile
+        self.default: str       = default
 
 
 # ==============================================================================
 class Method:
+    __slots__ = ("name", "description", "type", "indirection", "const", "volatile", "immutable", "noexcept", "override", "params")
+
     def __init__(self,
                  name: str = "_DefaultMethod",
                  description: str = "Method description",
@@ -47,124 +43,135 @@ class Method:
                  volatile: bool = False,
                  immutable: bool = False,
                  noexcept: bool = False,
-                 override: bool = False,
+                 override: bool = False
                  ):
-
-        self._method: dict[str, Any] = {
-                                            "name": name,
-                                            "description": description,
-                                            "type": type,
-                                            "indirection": indirection,
-                                            "const": const,
-                                            "volatile": volatile,
-                                            "immutable": immutable,
-                                            "noexcept": noexcept,
-                                            "override": override,
-                                            "params": []
-                                        }
-
-    @property
-    def value(self) -> dict[str, Any]:
-        return self._method
+        self.name: str                  = name
+        self.description: str           = description
+        self.type: str                  = type
+        self.indirection: str           = indirection
+        self.const: bool                = const
+        self.volatile: bool             = volatile
+        self.immutable: bool            = immutable
+        self.noexcept: bool             = noexcept
+        self.override: bool             = override
+        self.params: list[Parameter]    = []
 
     def add_parameter(self, param: Parameter) -> None:
-        self._method["params"].append(param.value)
+        self.params.append(param)
 
 
 # ==============================================================================
 class Inheritance:
-    def __init__(self,
-                 name: str,
-                 visibility: Visibility,
-                 virtual: bool
-                 ):
-        
-        self._inheritance: dict[str, Any] = {
-                                                "name": name,
-                                                "visibility": visibility.value,
-                                                "virtual": virtual
-                                            }
-        
-    @property
-    def value(self) -> dict[str, Any]:
-        return self._inheritance
+    __slots__ = ("name", "visibility", "virtual")
+
+    def __init__(self, name: str, visibility: Visibility, virtual: bool):
+        self.name: str                  = name
+        self.visibility: Visibility     = visibility
+        self.virtual: bool              = virtual
 
 
 # ==============================================================================
 class EnumValue:
-    def __init__(self,
-                 name: str,
-                 value: str
-                 ):
-        self._evalue: dict[str, Any] =  {
-                                            "name": name,
-                                            "value": value
-                                        }
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str, value: str):
+        self.name: str      = name
+        self.value: str     = value
+
+
+# ==============================================================================
+class ForwardDeclaration:
+    __slots__ = ("typename", "namespaces", "name", "keyword")
+
+    def __init__(self, typename: str, keyword: str):
+        *namespaces, name = typename.split("::")
 
-    @property
-    def value(self) -> dict[str, Any]:
-        return self._evalue
+        self.typename: str          = typename
+        self.namespaces: list[str]  = namespaces
+        self.name: str              = name
+        self.keyword: str           = keyword
+
+
+# ==============================================================================
+class Includes:
+    __slots__ = ("system", "project")
+
+    def __init__(self):
+        self.system: set[str]   = set()
+        self.project: set[str]  = set()
+
+
+# ==============================================================================
+class VisibilityGroups:
+    __slots__ = ("public", "protected", "private")
+
+    def __init__(self):
+        self.public: list       = []
+        self.protected: list    = []
+        self.private: list      = []
+
+    def of(self, visibility: Visibility) -> list:
+        return getattr(self, visibility.value)
+
+    def all(self) -> list:
+        return self.public + self.protected + self.private
 
 
 # ==============================================================================
 class Model:
-    def __init__(self, name: str, namespaces: list[str], include_guard: str):
+    __slots__ = ("name", "namespaces", "include_guard", "description", "includes_h", "includes_cpp", "forward_declarations",
+                 "references", "inherits", "constructors", "members", "methods", "evalues")
 
-        self._model: dict[str, Any] =   {
-                                            "name": name,
-                                            "namespaces": namespaces,
-                                            "include_guard": include_guard,
-                                            "description": "",
-                                            "includes_h":   {
-                                                                "system": set(),
-                                                                "project": set(),
-                                                            },
-                                            "includes_cpp": set(),
-                                            "inherits": [],
-                                            "constructors": [],
-                                            "members": {
-                                                            Visibility.PUBLIC.value: [],
-                                                            Visibility.PROTECTED.value: [],
-                                                            Visibility.PRIVATE.value: []
-                                                        },
-                                            "methods": {
-                                                            Visibility.PUBLIC.value: [],
-                                                            Visibility.PROTECTED.value: [],
-                                                            Visibility.PRIVATE.value: []
-                                                        },
-                                            "evalues": []
-                                        }
-
-    @property
-    def value(self) -> dict[str, Any]:
-        return self._model
+    def __init__(self, name: str, namespaces: list[str], include_guard: str):
+        self.name: str                                            = name
+        self.namespaces: list[str]                                = namespaces
+        self.include_guard: str                                   = include_guard
+        self.description: str                                     = ""
+        self.includes_h: Includes                                 = Includes()
+        self.includes_cpp: set[str]                               = set()
+        self.forward_declarations: dict[str, ForwardDeclaration]  = {}
+        self.references: set[str]                                 = set()
+        self.inherits: list[Inheritance]                          = []
+        self.constructors: list[Method]                           = []
+        self.members: VisibilityGroups                            = VisibilityGroups()
+        self.methods: VisibilityGroups                            = VisibilityGroups()
+        self.evalues: list[EnumValue]                             = []
 
     def set_description(self, description: str) -> None:
-        self._model["description"] = description
+        self.description = description
 
     def add_inheritance(self, inheritance: Inheritance) -> None:
-        self._model["inherits"].append(inheritance.value)
+        self.inherits.append(inheritance)
 
     def add_system_include_h(self, include_h: str) -> None:
-        self._model["includes_h"]["system"].add(include_h)
+        self.includes_h.system.add(include_h)
 
     def add_project_include_h(self, include_h: str) -> None:
-        self._model["includes_h"]["project"].add(include_h)
+        self.includes_h.project.add(include_h)
+
+    def add_include_cpp(self, include_cpp: str) -> None:
+        self.includes_cpp.add(include_cpp)
+
+    def add_forward_declaration(self, declaration: ForwardDeclaration) -> None:
+        self.forward_declarations[declaration.typename] = declaration
+
+    def add_reference(self, typename: str) -> None:
+        self.references.add(typename)
 
     def add_member(self,
                    visibility: Visibility,
                    member: Parameter) -> None:
-        self._model["members"][visibility.value].append(member.value)
+        self.members.of(visibility).append(member)
 
     def add_method(self,
                    visibility: Visibility,
                    method: Method) -> None:
-        self._model["methods"][visibility.value].append(method.value)
+        self.methods.of(visibility).append(method)
 
     def add_enum_value(self,
                        evalue: EnumValue) -> None:
-        self._model["evalues"].append(evalue.value)
+        self.evalues.append(evalue)
 
     def add_constructor(self,
                         method: Method) -> None:
-        self._model["constructors"].append(method.value)
+        self.constructors.append(method)
@@ -10,6 +10,8 @@ class ModelClassification(Enum):
 
 # ==============================================================================
 class ModelInfo:
+    __slots__ = ("_name", "_classification", "_namespaces", "_include_guard")
+
     def __init__(self,
                  model_name: str,
                  model_type: str,
@@ -36,3 +38,7 @@ class ModelInfo:
     @property
     def include_guard(self) -> str:
         return self._include_guard
+
+    def output_path(self, extension: str) -> str:
+        # Relative to the output root, mirroring the blueprint directory structure
+        return "/".join(self._namespaces + [f"{self._name}{extension}"])
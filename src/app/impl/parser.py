@@ -1,22 +1,95 @@
-from app.impl.model import Visibility, Inheritance, Parameter, Method, EnumValue, Model
-import yaml
+from app.impl.model import Visibility, Inheritance, Parameter, Method, EnumValue, ForwardDeclaration, Model
+import functools
+import re
 from typing import Any
 
 
+@functools.cache
+def _yaml_loader() -> type:
+    # Imported on first load, discovery and up-to-date checks never parse YAML
+    import yaml
+
+    # LibYAML bindings are optional, fall back to the pure-Python loader
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+_QUALIFIED_NAME = re.compile(r"(?:::\s*)?[A-Za-z_]\w*(?:\s*::\s*[A-Za-z_]\w*)*")
+_WHITESPACE     = re.compile(r"\s+")
+
+# Fundamental types and specifiers are never blueprints
+_BUILTIN_TYPES: frozenset[str] = frozenset({
+    "void", "bool", "char", "wchar_t", "char8_t", "char16_t", "char32_t",
+    "short", "int", "long", "signed", "unsigned", "float", "double",
+    "auto", "const", "volatile", "typename", "struct", "class", "enum"
+})
+
+
+# Declaration keyword per model kind, interfaces are classes as well
+_FORWARD_KEYWORDS: dict[str, str] = {
+    "class": "class",
+    "interface": "class",
+    "enum": "enum class"
+}
+
+
+# Model kinds rendered with a source file, the only place includes_cpp goes
+_SOURCE_KINDS: frozenset[str] = frozenset({"class"})
+
+
 class Parser:
     def __init__(self,
-                 standard_include_map: dict[str, str]
+                 standard_include_map: dict[str, str],
+                 forward_declarations: bool = False
                  ):
 
         self._standard_include_map: dict[str, str]  = standard_include_map
+        self._forward_declarations: bool            = forward_declarations
         self._project_include_map: dict[str, str]   = {}
+        self._project_kinds: dict[str, str]         = {}
+        self._resolved_types: dict[str, tuple]      = {}
+
+    @property
+    def project_include_map(self) -> dict[str, str]:
+        return self._project_include_map
 
-    def add_project_include(self, typename: str, include: str) -> None:
+    @property
+    def project_kinds(self) -> dict[str, str]:
+        return self._project_kinds
+
+    def add_project_include(self, typename: str, include: str, kind: str = "class") -> None:
         self._project_include_map[typename] = include
+        self._project_kinds[typename] = kind
+        self._resolved_types.clear()
+
+    def set_project_includes(self, project_types: dict[str, tuple[str, str]]) -> bool:
+        # Typename -> (include, kind). Resolved types stay memoized while the project types
+        # do not change, long-lived sessions reuse them from one run to the next.
+        include_map: dict[str, str] = {typename: include for typename, (include, kind) in project_types.items()}
+        kinds: dict[str, str] = {typename: kind for typename, (include, kind) in project_types.items()}
+
+        if include_map == self._project_include_map and kinds == self._project_kinds:
+            return False
+
+        self._project_include_map = include_map
+        self._project_kinds = kinds
+        self._resolved_types.clear()
+        return True
+
+    @staticmethod
+    def load_yaml(yaml_text: str) -> dict[str, Any]:
+        import yaml
+        return yaml.load(yaml_text, Loader=_yaml_loader()) or {}
+
+    @staticmethod
+    def load_yaml_all(yaml_text: str) -> list[dict[str, Any]]:
+        # Every document of a multi-document stream, in a single pass
+        import yaml
+        return list(yaml.load_all(yaml_text, Loader=_yaml_loader()))
 
     def parse_yaml(self, model: Model, yaml_text: str) -> None:
-        data = yaml.safe_load(yaml_text) or {}
+        self.parse_data(model, Parser.load_yaml(yaml_text))
 
+    def parse_data(self, model: Model, data: dict[str, Any]) -> None:
         self._parse_description(model, data.get("description", "Model description"))
         self._parse_inheritances(model, data.get("inherits", []))
         self._parse_members(model, data.get("members", []))
@@ -24,6 +97,9 @@ class Parser:
         self._parse_constructors(model, data.get("constructors", []))
         self._parse_evalues(model, data.get("evalues", []))
 
+        if self._forward_declarations:
+            self._prune_forward_declarations(model)
+
     def _parse_description(self, model: Model, description: str) -> None:
         model.set_description(description)
 
@@ -45,7 +121,7 @@ class Parser:
                                m.get("default", ""),
                                )
 
-            self._add_includes(model, m.get("type", "void"))
+            self._add_includes(model, m.get("type", "void"), m.get("indirection", ""))
             model.add_member(visibility, member)
 
     def _parse_methods(self, model: Model, methods_data: list[dict[str, Any]]) -> None:
@@ -62,7 +138,7 @@ class Parser:
                             m.get("override", False)
                             )
 
-            self._add_includes(model, m.get("type", "void"))
+            self._add_includes(model, m.get("type", "void"), m.get("indirection", ""))
 
             # parameters
             for p in m.get("params", []):
@@ -75,7 +151,7 @@ class Parser:
                                   p.get("default", ""),
                                   )
 
-                self._add_includes(model, p.get("type", "void"))
+                self._add_includes(model, p.get("type", "void"), p.get("indirection", ""))
                 method.add_parameter(param)
 
             model.add_method(visibility, method)
@@ -95,7 +171,7 @@ class Parser:
                                   p.get("default", ""),
                                   )
 
-                self._add_includes(model, p.get("type", "void"))
+                self._add_includes(model, p.get("type", "void"), p.get("indirection", ""))
                 method.add_parameter(param)
 
             model.add_constructor(method)
@@ -106,32 +182,93 @@ class Parser:
 
             model.add_enum_value(evalue)
 
-    def _add_includes(self, model: Model, typedef: str) -> None:
-        std_types: list[str] = self._extract_std_types(typedef)
+    def _add_includes(self, model: Model, typedef: str, indirection: str = "") -> None:
+        system_includes, project_includes, references = self._resolve_type(typedef)
+
+        # Pointers and references to a project type only need it declared, the header goes to the source file.
+        # Interfaces and enums are header only and keep the include, there is no source file to move it to.
+        own_typename: str = "::".join(model.namespaces + [model.name])
+        if (self._forward_declarations and indirection and not indirection.strip(" *&")
+                and self._project_kinds.get(own_typename, "class") in _SOURCE_KINDS):
+            typename: str = self._forward_declarable(typedef)
+            if typename:
+                if typename != own_typename:
+                    model.add_forward_declaration(ForwardDeclaration(typename, _FORWARD_KEYWORDS[self._project_kinds[typename]]))
+                    model.add_include_cpp(self._project_include_map[typename])
+                system_includes, project_includes = (), ()
+
+        for include in system_includes:
+            model.add_system_include_h(include)
+
+        for include in project_includes:
+            model.add_project_include_h(include)
+
+        # Recorded even when unresolved, a blueprint added later must re-render this model
+        for typename in references:
+            model.add_reference(typename)
+
+    def _forward_declarable(self, typedef: str) -> str:
+        # Only a plain project typename, nested names and template arguments keep their include
+        names: list[str] = self._extract_qualified_names(typedef)
+
+        if len(names) == 1 and names[0] == _WHITESPACE.sub("", typedef).removeprefix("::") and names[0] in self._project_include_map:
+            return names[0]
+
+        return None
+
+    def _prune_forward_declarations(self, model: Model) -> None:
+        # A type also used by value or as a base is fully included by the header already
+        included: set[str] = model.includes_h.project
+
+        for typename in list(model.forward_declarations):
+            if self._project_include_map[typename] in included:
+                del model.forward_declarations[typename]
+
+        model.includes_cpp.difference_update(included)
+
+    def _resolve_type(self, typedef: str) -> tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...]]:
+        # The same few hundred type strings repeat across every member and parameter
+        resolved = self._resolved_types.get(typedef)
+
+        if resolved is None:
+            system_includes: list[str]  = []
+            project_includes: list[str] = []
+            references: list[str]       = []
+
+            for name in self._extract_qualified_names(typedef):
+                if name.startswith("std::"):
+                    include: str = self._lookup(self._standard_include_map, name)
+                    if include:
+                        system_includes.append(include)
+                    continue
+
+                if name in _BUILTIN_TYPES:
+                    continue
+
+                # Every enclosing prefix may become a blueprint later
+                parts: list[str] = name.split("::")
+                references.extend("::".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+                include: str = self._lookup(self._project_include_map, name)
+                if include:
+                    project_includes.append(include)
 
-        for t in std_types:
-            if (t in self._standard_include_map):
-                model.add_system_include_h(self._standard_include_map[t])
+            resolved = (tuple(system_includes), tuple(project_includes), tuple(references))
+            self._resolved_types[typedef] = resolved
 
-        if (typedef in self._project_include_map):
-            model.add_project_include_h(self._project_include_map[typedef])
-    
-    def _extract_std_types(self, typedef: str) -> list[str]:
-        results = []
-        i = 0
-        n = len(typedef)
+        return resolved
 
-        while i < n:
-            if typedef.startswith("std::", i):
-                start = i
-                i += 5  # skip "std::"
+    def _lookup(self, include_map: dict[str, str], name: str) -> str:
+        # Longest qualified prefix wins, so nested names resolve to their enclosing type
+        while name:
+            include: str = include_map.get(name)
+            if include:
+                return include
 
-                # Read full identifier (including nested namespaces)
-                while i < n and (typedef[i].isalnum() or typedef[i] in "_:"):
-                    i += 1
+            name = name.rpartition("::")[0]
 
-                results.append(typedef[start:i])
-            else:
-                i += 1
+        return None
 
-        return results
+    def _extract_qualified_names(self, typedef: str) -> list[str]:
+        # Qualified names anywhere in the expression, including template arguments
+        return [_WHITESPACE.sub("", match).removeprefix("::") for match in _QUALIFIED_NAME.findall(typedef)]
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Iterable
+
+
+# ==============================================================================
+class PchBuilder:
+    VERSION: int = 1
+
+    def __init__(self, threshold: float, header_filename: str, report_filename: str):
+        self._threshold: float      = threshold
+        self._header_filename: str  = header_filename
+        self._report_filename: str  = report_filename
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def header_filename(self) -> str:
+        return self._header_filename
+
+    @property
+    def report_filename(self) -> str:
+        return self._report_filename
+
+    def usage(self, models: Iterable[tuple[str, list[str]]]) -> tuple[int, dict[str, dict[str, int]]]:
+        # (namespace, system includes) per model -> model count and header -> namespace -> models including it
+        count: int = 0
+        usage: dict[str, dict[str, int]] = {}
+
+        for namespace, includes in models:
+            count += 1
+            for include in includes:
+                namespaces: dict[str, int] = usage.setdefault(include, {})
+                namespaces[namespace] = namespaces.get(namespace, 0) + 1
+
+        return count, usage
+
+    def select(self, model_count: int, usage: dict[str, dict[str, int]]) -> list[str]:
+        # Headers used by at least threshold of all models, most used first
+        totals: dict[str, int] = {include: sum(namespaces.values()) for include, namespaces in usage.items()}
+        minimum: float = max(self._threshold * model_count, 1)
+
+        return sorted((include for include, total in totals.items() if total >= minimum), key=lambda include: (-totals[include], include))
+
+    def outputs(self, models: Iterable[tuple[str, list[str]]]) -> dict[str, str]:
+        model_count, usage = self.usage(models)
+        selected: list[str] = self.select(model_count, usage)
+
+        return {
+            self._header_filename: self.header_content(selected),
+            self._report_filename: self.report_content(model_count, usage, selected)
+        }
+
+    def header_content(self, selected: list[str]) -> str:
+        lines: list[str] = ["// Precompiled header candidate for generated sources, do not edit", "#pragma once", ""]
+        lines.extend(f"#include <{include}>" for include in selected)
+        return "\n".join(lines) + "\n"
+
+    def report_content(self, model_count: int, usage: dict[str, dict[str, int]], selected: list[str]) -> str:
+        headers: dict[str, dict[str, Any]] = {}
+
+        for include in sorted(usage, key=lambda include: (-sum(usage[include].values()), include)):
+            total: int = sum(usage[include].values())
+            headers[include] =  {
+                                    "models": total,
+                                    "share": round(total / model_count, 4),
+                                    "namespaces": dict(sorted(usage[include].items()))
+                                }
+
+        data: dict[str, Any] =  {
+                                    "models": model_count,
+                                    "threshold": self._threshold,
+                                    "selected": selected,
+                                    "headers": headers
+                                }
+
+        return json.dumps(data, indent=2) + "\n"
@@ -0,0 +1,349 @@
+from app.impl.backup import BackupStore
+from app.impl.cache import BlueprintCache
+from app.impl.generator import CppGenerator
+from app.impl.model import Method, Model
+from app.impl.model_info import ModelInfo, ModelClassification
+from app.impl.parser import Parser
+from app.impl.stats import measure
+from app.impl.writer import OutputWriter
+
+import itertools
+import os
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+# ==============================================================================
+class RenderTask:
+    # Queued for every blueprint that needs rendering, kept small for full rebuilds of very large trees
+    __slots__ = ("_key", "_model_info", "_yaml_text", "_yaml_hash", "_data")
+
+    def __init__(self,
+                 key: str,
+                 model_info: ModelInfo,
+                 yaml_text: str,
+                 yaml_hash: str,
+                 data: dict[str, Any] = None
+                 ):
+        self._key: str                  = key
+        self._model_info: ModelInfo     = model_info
+        self._yaml_text: str            = yaml_text
+        self._yaml_hash: str            = yaml_hash
+        self._data: dict[str, Any]      = data
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._model_info
+
+    @property
+    def yaml_text(self) -> str:
+        return self._yaml_text
+
+    @property
+    def yaml_hash(self) -> str:
+        return self._yaml_hash
+
+    @property
+    def data(self) -> dict[str, Any]:
+        # Documents of bundles arrive already loaded by discovery
+        return self._data
+
+
+# ==============================================================================
+class RenderResult:
+    def __init__(self,
+                 key: str,
+                 header_content: str = None,
+                 source_content: str = None,
+                 references: list[str] = None,
+                 error: str = None,
+                 timings: dict[str, list[float]] = None,
+                 counts: dict[str, int] = None,
+                 streamed: dict[str, tuple[bool, int, str]] = None,
+                 system_includes: list[str] = None,
+                 project_includes: list[str] = None
+                 ):
+        self._key: str                                  = key
+        self._header_content: str                       = header_content
+        self._source_content: str                       = source_content
+        self._references: list[str]                     = references or []
+        self._error: str                                = error
+        self._timings: dict[str, list[float]]           = timings or {}
+        self._counts: dict[str, int]                    = counts or {}
+        self._streamed: dict[str, tuple[bool, int, str]] = streamed
+        self._system_includes: list[str]                = system_includes or []
+        self._project_includes: list[str]               = project_includes or []
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    @property
+    def header_content(self) -> str:
+        return self._header_content
+
+    @property
+    def source_content(self) -> str:
+        return self._source_content
+
+    @property
+    def references(self) -> list[str]:
+        return self._references
+
+    @property
+    def error(self) -> str:
+        return self._error
+
+    @property
+    def timings(self) -> dict[str, list[float]]:
+        return self._timings
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return self._counts
+
+    @property
+    def streamed(self) -> dict[str, tuple[bool, int, str]]:
+        # Output path -> (changed, bytes, digest) when the renderer wrote the files itself
+        return self._streamed
+
+    @property
+    def system_includes(self) -> list[str]:
+        return self._system_includes
+
+    @property
+    def project_includes(self) -> list[str]:
+        # Project headers included by the generated header
+        return self._project_includes
+
+
+# ==============================================================================
+class Renderer:
+    def __init__(self,
+                 generator: CppGenerator,
+                 parser: Parser,
+                 cache: BlueprintCache = None,
+                 stream_root: Path = None,
+                 backup: BackupStore = None
+                 ):
+        self._generator: CppGenerator   = generator
+        self._parser: Parser            = parser
+        self._cache: BlueprintCache     = cache
+
+        # Streaming renders chunks straight into files under stream_root
+        self._stream_root: Path         = stream_root
+        self._writer: OutputWriter      = OutputWriter(backup) if stream_root else None
+
+    def render(self, task: RenderTask) -> RenderResult:
+        timings: dict[str, list[float]] = {}
+        counts: dict[str, int]          = {}
+
+        try:
+            with measure(timings, "yaml_load"):
+                data: dict[str, Any] = self._load_data(task, counts)
+
+            with measure(timings, "model_build"):
+                model: Model = self._parse_model(task.model_info, data)
+
+            with measure(timings, "template_render"):
+                if self._stream_root:
+                    streamed: dict[str, tuple[bool, int, str]] = self._stream_model(task.model_info, model)
+                    header_content, source_content = None, None
+                else:
+                    streamed: dict[str, tuple[bool, int, str]] = None
+                    header_content, source_content = self._render_model(task.model_info, model)
+        except Exception as e:
+            return RenderResult(task.key, error=f"{type(e).__name__}: {e}", timings=timings)
+
+        counts.update(self._count_model(model))
+        return RenderResult(task.key, header_content, source_content, sorted(model.references), None, timings, counts, streamed,
+                            sorted(model.includes_h.system), sorted(model.includes_h.project))
+
+    def _load_data(self, task: RenderTask, counts: dict[str, int]) -> dict[str, Any]:
+        if task.data is not None:
+            return task.data
+
+        # Previously parsed blueprints skip YAML loading entirely
+        if self._cache is None:
+            return Parser.load_yaml(task.yaml_text)
+
+        data: dict[str, Any] = self._cache.get(task.yaml_hash)
+        if data is None:
+            data = Parser.load_yaml(task.yaml_text)
+            self._cache.put(task.yaml_hash, data)
+        else:
+            counts["cache_hits"] = 1
+
+        return data
+
+    def _count_model(self, model: Model) -> dict[str, int]:
+        methods: list[Method] = model.methods.all() + model.constructors
+
+        return {
+            "members": len(model.members.all()),
+            "methods": len(methods),
+            "params": sum(len(m.params) for m in methods),
+            "evalues": len(model.evalues)
+        }
+
+    def _parse_model(self, model_info: ModelInfo, data: dict[str, Any]) -> Model:
+        # Create general model
+        model: Model = Model(model_info.name, model_info.namespaces, model_info.include_guard)
+
+        # Append parsed info to model
+        self._parser.parse_data(model, data)
+        return model
+
+    def _render_model(self, model_info: ModelInfo, model: Model) -> tuple[str, str]:
+        match model_info.classification:
+            case ModelClassification.CLASS:
+                # Generate text for header and cpp
+                return (self._generator.generate_class_header_content(model),
+                        self._generator.generate_class_source_content(model))
+            case ModelClassification.INTERFACE:
+                return self._generator.generate_interface_header_content(model), None
+            case ModelClassification.ENUM:
+                return self._generator.generate_enum_header_content(model), None
+
+
+    def _stream_model(self, model_info: ModelInfo, model: Model) -> dict[str, tuple[bool, int, str]]:
+        match model_info.classification:
+            case ModelClassification.CLASS:
+                streams = {".h": self._generator.stream_class_header_content,
+                           ".cpp": self._generator.stream_class_source_content}
+            case ModelClassification.INTERFACE:
+                streams = {".h": self._generator.stream_interface_header_content}
+            case ModelClassification.ENUM:
+                streams = {".h": self._generator.stream_enum_header_content}
+
+        streamed: dict[str, tuple[bool, int, str]] = {}
+        for extension, stream in streams.items():
+            output: str = model_info.output_path(extension)
+            bytes_before: int = self._writer.bytes_written
+            changed: bool = self._writer.write_stream(self._stream_root / output, stream(model))
+            streamed[output] = (changed, self._writer.bytes_written - bytes_before, self._writer.last_digest)
+
+        return streamed
+
+
+# Per-process generator and cache, built once by the pool initializer. The renderer is rebuilt
+# whenever a chunk of another run arrives, runs differ in parser state, stream root and backup.
+_worker_generator: CppGenerator = None
+_worker_cache: BlueprintCache   = None
+_worker_renderer: Renderer      = None
+_worker_run: int                = None
+
+
+def _init_worker(generator_args: tuple[Any, ...], cache_dir: Path) -> None:
+    global _worker_generator, _worker_cache
+
+    _worker_generator = CppGenerator(*generator_args)
+    _worker_cache = BlueprintCache(cache_dir) if cache_dir else None
+
+
+def _render_chunk_in_worker(run: int, context_path: str, tasks: list[RenderTask]) -> list[RenderResult]:
+    global _worker_renderer, _worker_run
+
+    if run != _worker_run:
+        import pickle
+        with open(context_path, "rb") as file:
+            parser, stream_root, backup = pickle.load(file)
+
+        _worker_renderer = Renderer(_worker_generator, parser, _worker_cache, stream_root, backup)
+        _worker_run = run
+
+    return [_worker_renderer.render(task) for task in tasks]
+
+
+# ==============================================================================
+class RenderPool:
+    CHUNK_SIZE: int = 16
+
+    # Chunks submitted ahead of the consumer, per worker
+    CHUNKS_IN_FLIGHT: int = 4
+
+    # Workers are started on first use and kept for the life of the pool, long-lived sessions
+    # compile their templates once. Each run hands its own parser, stream root and backup to
+    # the workers through a file, read once per worker and run.
+    def __init__(self,
+                 jobs: int,
+                 generator_args: tuple[Any, ...],
+                 cache_dir: Path = None
+                 ):
+        self._jobs: int                         = jobs
+        self._generator_args: tuple[Any, ...]   = generator_args
+        self._cache_dir: Path                   = cache_dir
+        self._executor: Any                     = None
+        self._workers: int                      = 0
+        self._runs: int                         = 0
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def reserve(self, tasks: int) -> None:
+        # Small runs start few workers, a warm pool only grows
+        workers: int = min(self._jobs, tasks)
+        if workers <= self._workers:
+            return
+
+        # Only parallel runs pay for importing multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.close()
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self._generator_args, self._cache_dir))
+        self._workers = workers
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._workers = 0
+
+    def render_all(self,
+                   tasks: Iterable[RenderTask],
+                   parser: Parser,
+                   stream_root: Path = None,
+                   backup: BackupStore = None
+                   ) -> Iterator[RenderResult]:
+        # Results are yielded in submission order, independent of worker scheduling. Unlike
+        # Executor.map, tasks are pulled only as results are consumed, so memory is bounded
+        # by the window instead of by the number of tasks.
+        import pickle
+        import tempfile
+
+        self.reserve(1)
+        self._runs += 1
+
+        fd, context_path = tempfile.mkstemp(prefix="blueprintcpp-run-", suffix=".pickle")
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump((parser, stream_root, backup), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        window: int = self._workers * RenderPool.CHUNKS_IN_FLIGHT
+        pending: deque["Future"] = deque()
+        iterator: Iterator[RenderTask] = iter(tasks)
+
+        try:
+            while chunk := list(itertools.islice(iterator, RenderPool.CHUNK_SIZE)):
+                pending.append(self._executor.submit(_render_chunk_in_worker, self._runs, context_path, chunk))
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # Chunks of an abandoned run may still be queued, they are cancelled or finish first
+            for future in pending:
+                future.cancel()
+            for future in pending:
+                if not future.cancelled():
+                    future.exception()
+            os.unlink(context_path)
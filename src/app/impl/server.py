@@ -0,0 +1,147 @@
+from app.impl.client import send_request
+from app.impl.session import Session, RunReport, CheckReport
+
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Any, Callable
+
+
+PROTOCOL_VERSION: int = 2
+
+
+# ==============================================================================
+class CodegenServer:
+    # Sessions are keyed by (input root, output root) and stay warm between requests. They are built
+    # with the generation options of the client, a request with other options starts a new session.
+    def __init__(self,
+                 socket_path: Path,
+                 session_factory: Callable[[Path, Path, dict[str, Any]], Session]
+                 ):
+        self._socket_path: Path                                                 = socket_path
+        self._session_factory: Callable[[Path, Path, dict[str, Any]], Session]  = session_factory
+        self._sessions: dict[tuple[Path, Path], tuple[str, Session]]            = {}
+        self._running: bool                                                     = False
+
+    @property
+    def socket_path(self) -> Path:
+        return self._socket_path
+
+    def serve(self) -> None:
+        self._remove_stale_socket()
+
+        # Requests are handled one at a time, sessions are not shared between threads
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(str(self._socket_path))
+            try:
+                listener.listen()
+                self._running = True
+
+                while self._running:
+                    connection, _ = listener.accept()
+                    with connection:
+                        self._serve_connection(connection)
+            finally:
+                self._socket_path.unlink(missing_ok=True)
+                for _, session in self._sessions.values():
+                    session.close()
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        match request.get("command"):
+            case "ping":
+                return {"exit_code": 0, "version": PROTOCOL_VERSION, "pid": os.getpid()}
+            case "shutdown":
+                self._running = False
+                return {"exit_code": 0}
+            case "generate":
+                roots: list[dict[str, str]] = request.get("roots") or [request]
+                return self._generate(roots, request.get("options", {}), bool(request.get("full", False)), bool(request.get("check", False)))
+            case "regenerate":
+                return self._regenerate(request, request.get("files", []), request.get("options", {}), bool(request.get("full", False)))
+            case command:
+                raise ValueError(f"unknown command {command!r}")
+
+    def _serve_connection(self, connection: socket.socket) -> None:
+        with connection.makefile("rb") as stream:
+            line: bytes = stream.readline()
+
+        try:
+            response: dict[str, Any] = self.handle(json.loads(line))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            response: dict[str, Any] = {"exit_code": 2, "reports": [], "error": str(e)}
+
+        try:
+            connection.sendall(json.dumps(response).encode("utf-8") + b"\n")
+        except OSError:
+            # The client went away, the outputs are written regardless
+            pass
+
+    def _generate(self, roots: list[dict[str, str]], options: dict[str, Any], full_rebuild: bool, check: bool) -> dict[str, Any]:
+        reports: list[dict[str, Any]] = [self._run(root, options, full_rebuild, None, check) for root in roots]
+        return {"exit_code": max((report["exit_code"] for report in reports), default=0), "reports": reports}
+
+    def _regenerate(self, root: dict[str, str], files: list[str], options: dict[str, Any], full_rebuild: bool) -> dict[str, Any]:
+        input_path: Path = Path(root["input"]).resolve()
+        changed: set[str] = set()
+
+        for file in files:
+            path: Path = Path(file).resolve()
+            if not path.is_relative_to(input_path):
+                raise ValueError(f"{file} is not inside {input_path}")
+            changed.add(path.relative_to(input_path).as_posix())
+
+        report: dict[str, Any] = self._run(root, options, full_rebuild, changed, False)
+        return {"exit_code": report["exit_code"], "reports": [report]}
+
+    def _run(self, root: dict[str, str], options: dict[str, Any], full_rebuild: bool, changed: set[str], check: bool) -> dict[str, Any]:
+        key: tuple[Path, Path] = (Path(root["input"]).resolve(), Path(root["output"]).resolve())
+        options_key: str = json.dumps(options, sort_keys=True)
+
+        try:
+            known: tuple[str, Session] = self._sessions.get(key)
+            if known is None or known[0] != options_key:
+                self._drop_session(key)
+                known = self._sessions[key] = (options_key, self._session_factory(*key, options))
+            session: Session = known[1]
+
+            if check:
+                check_report: CheckReport = session.check(full_rebuild)
+                return {
+                    "input": str(key[0]),
+                    "exit_code": 0 if check_report.passed else 1,
+                    "summary": check_report.summary(),
+                    "errors": check_report.errors,
+                    "files": {"stale": check_report.stale, "missing": check_report.missing, "orphaned": check_report.orphaned}
+                }
+
+            run_report: RunReport = session.run(full_rebuild, changed)
+        except Exception as e:
+            # State of a failed session is unknown, the next request starts over
+            self._drop_session(key)
+            return {"input": str(key[0]), "exit_code": 1, "summary": "failed", "errors": [f"{type(e).__name__}: {e}"]}
+
+        return {
+            "input": str(key[0]),
+            "exit_code": 1 if run_report.errors else 0,
+            "summary": run_report.summary(),
+            "errors": run_report.errors
+        }
+
+    def _drop_session(self, key: tuple[Path, Path]) -> None:
+        known: tuple[str, Session] = self._sessions.pop(key, None)
+        if known is not None:
+            known[1].close()
+
+    def _remove_stale_socket(self) -> None:
+        if not self._socket_path.exists():
+            return
+
+        # A socket that still accepts connections belongs to a running server
+        try:
+            send_request(self._socket_path, {"command": "ping"})
+        except (OSError, ValueError):
+            self._socket_path.unlink()
+            return
+
+        raise RuntimeError(f"a server is already listening on {self._socket_path}")
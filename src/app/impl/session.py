@@ -0,0 +1,578 @@
+from app.impl.backup import BackupStore
+from app.impl.cache import BlueprintCache, BlueprintMemoryCache
+from app.impl.discovery import DiscoveryIndex, DiscoveryEntry
+from app.impl.generator import CppGenerator
+from app.impl.graph import DependencyGraph
+from app.impl.include_graph import IncludeGraph
+from app.impl.manifest import Manifest, hash_bytes, hash_object
+from app.impl.parser import Parser
+from app.impl.pch import PchBuilder
+from app.impl.render import RenderTask, RenderResult, Renderer, RenderPool
+from app.impl.stats import Stats, measure, peak_rss
+from app.impl.unity import UnityBuilder
+from app.impl.writer import OutputWriter, OutputChecker
+
+import functools
+import os
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+
+# ==============================================================================
+class RunReport:
+    def __init__(self,
+                 written: int,
+                 unchanged: int,
+                 removed: int,
+                 rendered: int,
+                 errors: list[str],
+                 files: dict[str, list[str]] = None
+                 ):
+        self._written: int                  = written
+        self._unchanged: int                = unchanged
+        self._removed: int                  = removed
+        self._rendered: int                 = rendered
+        self._errors: list[str]             = errors
+        self._files: dict[str, list[str]]   = files
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def unchanged(self) -> int:
+        return self._unchanged
+
+    @property
+    def removed(self) -> int:
+        return self._removed
+
+    @property
+    def rendered(self) -> int:
+        return self._rendered
+
+    @property
+    def errors(self) -> list[str]:
+        return self._errors
+
+    @property
+    def files(self) -> dict[str, list[str]]:
+        # "written", "unchanged" and "removed" -> outputs relative to the output root, None unless tracked
+        return self._files
+
+    def summary(self) -> str:
+        return f"{self._written} written, {self._unchanged} unchanged, {self._removed} removed"
+
+
+# ==============================================================================
+class CheckReport:
+    def __init__(self,
+                 stale: list[str],
+                 missing: list[str],
+                 orphaned: list[str],
+                 unchanged: int,
+                 rendered: int,
+                 errors: list[str]
+                 ):
+        self._stale: list[str]      = stale
+        self._missing: list[str]    = missing
+        self._orphaned: list[str]   = orphaned
+        self._unchanged: int        = unchanged
+        self._rendered: int         = rendered
+        self._errors: list[str]     = errors
+
+    @property
+    def stale(self) -> list[str]:
+        # Outputs that exist with different content, relative to the output root
+        return self._stale
+
+    @property
+    def missing(self) -> list[str]:
+        return self._missing
+
+    @property
+    def orphaned(self) -> list[str]:
+        # Outputs of blueprints that no longer exist
+        return self._orphaned
+
+    @property
+    def unchanged(self) -> int:
+        return self._unchanged
+
+    @property
+    def rendered(self) -> int:
+        return self._rendered
+
+    @property
+    def errors(self) -> list[str]:
+        return self._errors
+
+    @property
+    def passed(self) -> bool:
+        return not (self._stale or self._missing or self._orphaned or self._errors)
+
+    def summary(self) -> str:
+        return f"{len(self._stale)} stale, {len(self._missing)} missing, {len(self._orphaned)} orphaned, {self._unchanged} up to date"
+
+
+# ==============================================================================
+class Session:
+    def __init__(self,
+                 input_path: Path,
+                 output_path: Path,
+                 generator_args: tuple[Any, ...],
+                 standard_include_map: dict[str, str],
+                 manifest_filename: str,
+                 discovery_index_filename: str,
+                 jobs: int = 1,
+                 cache_dir: Path = None,
+                 create_backup: bool = False,
+                 keep_parsed: bool = False,
+                 stream: bool = False,
+                 stats: Stats = None,
+                 unity: UnityBuilder = None,
+                 pch: PchBuilder = None,
+                 forward_declarations: bool = False,
+                 buffer_bytes: int = None,
+                 generator_factory: Callable[[], CppGenerator] = None,
+                 track_files: bool = False,
+                 backup_dirname: str = None,
+                 render_pool: RenderPool = None
+                 ):
+        self._input_path: Path                      = input_path
+        self._output_path: Path                     = output_path
+        self._generator_args: tuple[Any, ...]       = generator_args
+        self._standard_include_map: dict[str, str]  = standard_include_map
+        self._jobs: int                             = jobs
+        self._cache_dir: Path                       = cache_dir
+        self._create_backup: bool                   = create_backup
+        self._backup_dirname: str                   = backup_dirname
+        self._stream: bool                          = stream
+        self._stats: Stats                          = stats or Stats()
+        self._unity: UnityBuilder                   = unity
+        self._pch: PchBuilder                       = pch
+        self._forward_declarations: bool            = forward_declarations
+        self._buffer_bytes: int                     = buffer_bytes
+        self._track_files: bool                     = track_files
+
+        # Sessions of one batch can share a generator, and with it the compiled templates
+        self._generator_factory: Callable[[], CppGenerator] = generator_factory or functools.partial(CppGenerator, *generator_args)
+
+        # Sessions of one batch can share a render pool, a session closes only a pool it started itself
+        self._pool: RenderPool                      = render_pool
+        self._owns_pool: bool                       = render_pool is None
+
+        # The generator, and with it Jinja, is only built once something needs rendering
+        self._generator: CppGenerator               = None
+        self._index: DiscoveryIndex                 = DiscoveryIndex(input_path, output_path / discovery_index_filename)
+        self._manifest: Manifest                    = Manifest(output_path / manifest_filename)
+        self._parser: Parser                        = None
+
+        # Long-lived sessions keep parsed blueprints and input hashes in memory
+        disk_cache: BlueprintCache                  = BlueprintCache(cache_dir) if cache_dir else None
+        self._cache: Any                            = BlueprintMemoryCache(disk_cache) if keep_parsed else disk_cache
+        self._input_hashes: dict[str, str]          = {}
+
+        with self._stats.phase("startup"):
+            self._generator_fingerprint: str        = CppGenerator.compute_fingerprint(*generator_args)
+            self._index.load()
+            self._manifest.load()
+
+    @property
+    def input_path(self) -> Path:
+        return self._input_path
+
+    @property
+    def output_path(self) -> Path:
+        return self._output_path
+
+    @property
+    def generator(self) -> CppGenerator:
+        if self._generator is None:
+            self._generator = self._generator_factory()
+
+        return self._generator
+
+    @property
+    def parser(self) -> Parser:
+        return self._parser
+
+    @property
+    def index(self) -> DiscoveryIndex:
+        return self._index
+
+    @property
+    def manifest(self) -> Manifest:
+        return self._manifest
+
+    @property
+    def graph(self) -> DependencyGraph:
+        # Built from the manifest on request, runs only keep it on disk
+        graph: DependencyGraph = DependencyGraph()
+        for key in self._manifest.keys():
+            graph.set_references(key, self._manifest.references(key))
+
+        return graph
+
+    @property
+    def stats(self) -> Stats:
+        return self._stats
+
+    def blueprints(self) -> dict[str, str]:
+        return {entry.typename: entry.key for entry in self._index.entries.values()}
+
+    def include_report(self, system_header_bytes: int) -> dict[str, Any]:
+        # Built from what the manifest recorded for each header, the analysis itself is cached there too
+        with self._stats.phase("include_report"):
+            graph: IncludeGraph = IncludeGraph(system_header_bytes)
+
+            for key, entry in self._index.entries.items():
+                if key not in self._manifest.keys():
+                    continue
+
+                try:
+                    size: int = (self._output_path / entry.header_path).stat().st_size
+                except OSError:
+                    continue
+
+                graph.add_header(entry.header_path, size, self._manifest.project_includes(key), self._manifest.system_includes(key))
+
+            input_hash: str = hash_object(graph.inputs())
+            report: dict[str, Any] = self._manifest.cached_report("include_graph", input_hash)
+
+            if report is None:
+                report = graph.analyze()
+                self._manifest.cache_report("include_graph", input_hash, report)
+                self._manifest.save()
+
+        return report
+
+    def run(self, full_rebuild: bool = False, changed: set[str] = None) -> RunReport:
+        # Every run backs up into a snapshot of its own
+        backup: BackupStore = self.backup_store() if self._create_backup else None
+        writer: OutputWriter = OutputWriter(backup, self._track_files)
+        rendered, errors = self._run(writer, full_rebuild, changed, backup)
+
+        files: dict[str, list[str]] = None
+        if writer.paths is not None:
+            files = {outcome: self._relative(paths) for outcome, paths in writer.paths.items()}
+
+        return RunReport(writer.written, writer.unchanged, writer.removed, rendered, errors, files)
+
+    def check(self, full_rebuild: bool = False) -> CheckReport:
+        # Same pipeline as run, outputs are compared instead of written and no state is saved
+        checker: OutputChecker = OutputChecker()
+        rendered, errors = self._run(checker, full_rebuild, None, None)
+        self._reload_manifest()
+
+        return CheckReport(self._relative(checker.stale), self._relative(checker.missing), self._relative(checker.orphaned),
+                           checker.unchanged, rendered, errors)
+
+    def export(self, writer: OutputWriter) -> RunReport:
+        # Renders every output into a writer that is not the output folder, e.g. an archive.
+        # Neither the output folder nor its manifest and index are touched.
+        rendered, errors = self._run(writer, True, None, None)
+        self._reload_manifest()
+
+        files: dict[str, list[str]] = None
+        if writer.paths is not None:
+            files = {outcome: self._relative(paths) for outcome, paths in writer.paths.items()}
+
+        return RunReport(writer.written, writer.unchanged, writer.removed, rendered, errors, files)
+
+    def close(self) -> None:
+        # Stops the render workers, the session can still run and starts them again when needed
+        if self._owns_pool and self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def backup_store(self, snapshot_id: str = None) -> BackupStore:
+        return BackupStore(self._output_path, self._output_path / self._backup_dirname, snapshot_id)
+
+    def _run(self, writer: OutputWriter, full_rebuild: bool, changed: set[str], backup: BackupStore) -> tuple[int, list[str]]:
+        checker: OutputChecker = writer if isinstance(writer, OutputChecker) else None
+
+        with self._stats.phase("discovery"):
+            self._discover(full_rebuild)
+
+        with self._stats.phase("hash"):
+            tasks: deque[RenderTask] = self._collect_tasks(changed, checker)
+            rendered: int = len(tasks)
+
+        errors: list[str] = list(self._index.errors)
+
+        # Rendering and writing interleave, write time is measured per file and moved to its own phase
+        write_total: list[float] = [0.0, 0.0]
+        with self._stats.phase("render"):
+            # Checks and archives are handled in this process, workers never write
+            for result in self._render(tasks, self._stream and writer.persistent, backup):
+                entry: DiscoveryEntry = self._index.entries[result.key]
+                self._record(result)
+
+                if result.error:
+                    errors.append(f"{self._index.root / entry.key}: {result.error}")
+                    continue
+
+                file_timings: dict[str, list[float]] = {}
+                with measure(file_timings, "write"):
+                    written_bytes: int = self._write_result(writer, entry, result)
+
+                self._stats.add_file(result.key, file_timings, bytes=written_bytes)
+                write_total[0] += file_timings["write"][0]
+                write_total[1] += file_timings["write"][1]
+
+        render_phase: list[float] = self._stats.phases["render"]
+        write_phase: list[float] = self._stats.phases.setdefault("write", [0.0, 0.0])
+        for i in range(2):
+            render_phase[i] -= write_total[i]
+            write_phase[i] += write_total[i]
+
+        with self._stats.phase("finalize"):
+            # Remove outputs of blueprints that no longer exist and persist state
+            for orphan in self._manifest.retain(set(self._index.entries)):
+                writer.remove(self._output_path / orphan)
+
+            self._write_unity(writer)
+            self._write_pch(writer)
+
+            self._input_hashes = {key: self._input_hashes[key] for key in self._index.entries if key in self._input_hashes}
+            if isinstance(self._cache, BlueprintMemoryCache):
+                self._cache.retain(set(self._input_hashes.values()))
+
+            if writer.persistent:
+                self._manifest.save()
+                self._index.save()
+
+        self._stats.count("blueprints", len(self._index.entries))
+        self._stats.count("rendered", rendered)
+        self._stats.count("files_written", writer.written)
+        self._stats.count("files_unchanged", writer.unchanged)
+        self._stats.count("files_removed", writer.removed)
+        self._stats.count("bytes_written", writer.bytes_written)
+        self._stats.maximum("peak_rss_bytes", peak_rss())
+        self._stats.maximum("peak_rss_children_bytes", peak_rss(children=True))
+
+        return rendered, errors
+
+    def _output_stats(self, writer: OutputWriter, outputs: Iterable[str]) -> dict[str, list[int]]:
+        # Recorded only for outputs that are on disk, including unchanged ones that were not rewritten
+        if not writer.persistent:
+            return {}
+
+        return {output: Manifest.output_stat(self._output_path / output) for output in outputs}
+
+    def _reload_manifest(self) -> None:
+        # The manifest was updated in memory for outputs that never reached the output folder
+        self._manifest.close()
+        self._manifest = Manifest(self._manifest.path)
+        self._manifest.load()
+
+    def _relative(self, paths: list[Path]) -> list[str]:
+        return sorted(path.relative_to(self._output_path).as_posix() for path in paths)
+
+    def _discover(self, full_rebuild: bool) -> None:
+        # Discover blueprints, rescanning only directories that changed since the last run
+        self._index.refresh()
+
+        # The parser lives as long as the session, long-lived sessions keep its memoized types
+        if self._parser is None:
+            self._parser = Parser(self._standard_include_map, self._forward_declarations)
+        self._parser.set_project_includes({entry.typename: (entry.header_path, entry.classification.value)
+                                           for entry in self._index.entries.values()})
+
+        # Incremental manifest, invalidated by any change in templates or the standard include map
+        if full_rebuild:
+            self._manifest.invalidate()
+
+        self._manifest.update_fingerprints({
+            # Relative, moving or cloning input and output together keeps the manifest valid
+            "input": Path(os.path.relpath(self._input_path, self._output_path)).as_posix(),
+            "templates": self._generator_fingerprint,
+            "standard_include_map": hash_object(self._standard_include_map),
+            "forward_declarations": str(self._forward_declarations)
+        })
+
+        # Project typenames that appeared, vanished, moved or changed kind only invalidate the models naming them
+        project_types: dict[str, list[str]] = {typename: [include, self._parser.project_kinds[typename]]
+                                               for typename, include in self._parser.project_include_map.items()}
+        self._manifest.invalidate_dependents(self._manifest.update_project_include_map(project_types))
+
+    def _write_unity(self, writer: OutputWriter) -> None:
+        if self._unity is None:
+            self._write_aggregate(writer, "unity", None, None)
+            return
+
+        # Unity files only depend on the set of generated sources
+        sources: list[str] = sorted(output for key in self._manifest.keys() for output in self._manifest.outputs(key) if output.endswith(".cpp"))
+        inputs: list[Any] = [UnityBuilder.VERSION, self._unity.batch_size, self._unity.cmake_filename, sources]
+
+        self._write_aggregate(writer, "unity", hash_object(inputs), lambda: self._unity.outputs(sources))
+
+    def _write_pch(self, writer: OutputWriter) -> None:
+        if self._pch is None:
+            self._write_aggregate(writer, "pch", None, None)
+            return
+
+        models: list[tuple[str, list[str]]] = [("::".join(entry.model_info.namespaces), self._manifest.system_includes(key))
+                                               for key, entry in self._index.entries.items() if key in self._manifest.keys()]
+        inputs: list[Any] = [PchBuilder.VERSION, self._pch.threshold, self._pch.header_filename, self._pch.report_filename, models]
+
+        self._write_aggregate(writer, "pch", hash_object(inputs), lambda: self._pch.outputs(models))
+
+    def _write_aggregate(self, writer: OutputWriter, name: str, input_hash: str, build: Callable[[], dict[str, str]]) -> None:
+        # Outputs derived from the whole project, rebuilt only when their inputs change
+        if build is None:
+            for output in self._manifest.remove_aggregate(name):
+                writer.remove(self._output_path / output)
+            return
+
+        # Checks and archives rebuild aggregates, no digests are recorded for them and they are cheap
+        if writer.persistent and self._manifest.is_aggregate_up_to_date(name, input_hash, self._output_path):
+            return
+
+        outputs: dict[str, str] = build()
+        for output, content in outputs.items():
+            writer.write(self._output_path / output, content)
+
+        for stale in set(self._manifest.aggregate_outputs(name)) - outputs.keys():
+            writer.remove(self._output_path / stale)
+
+        self._manifest.update_aggregate(name, input_hash, list(outputs), self._output_stats(writer, outputs))
+
+    def _record(self, result: RenderResult) -> None:
+        for name, value in result.counts.items():
+            self._stats.count(name, value)
+
+        self._stats.count("models")
+        self._stats.add_file(result.key, result.timings, **result.counts)
+
+    def _collect_tasks(self, changed: set[str], checker: OutputChecker = None) -> deque[RenderTask]:
+        # Without a change set every input is hashed, otherwise only the changed ones are re-read.
+        # Source text is kept for rendering up to the buffer budget, past it blueprints are read
+        # again when their turn comes so that memory does not grow with the size of the tree.
+        # Model infos are likewise only attached when a task is handed out.
+        tasks: deque[RenderTask] = deque()
+        buffered: int = 0
+
+        for entry in self._index.entries.values():
+            if entry.document_hash:
+                # Discovery already hashed every bundle document
+                if not self._is_current(entry.key, entry.document_hash, checker):
+                    tasks.append(RenderTask(entry.key, None, None, entry.document_hash, self._index.document(entry)))
+                self._input_hashes[entry.key] = entry.document_hash
+                continue
+
+            known_hash: str = self._input_hashes.get(entry.key) if changed is not None and entry.key not in changed else None
+
+            if known_hash and self._is_current(entry.key, known_hash, checker):
+                continue
+
+            if known_hash and self._holds_parsed(known_hash):
+                tasks.append(RenderTask(entry.key, None, None, known_hash))
+                continue
+
+            yaml_bytes: bytes   = self._index.path_of(entry).read_bytes()
+            # Interned like the hashes the manifest loads, equal hashes are stored once
+            yaml_hash: str      = sys.intern(hash_bytes(yaml_bytes))
+            self._input_hashes[entry.key] = yaml_hash
+
+            if self._is_current(entry.key, yaml_hash, checker):
+                continue
+
+            if self._buffer_bytes is None or buffered + len(yaml_bytes) <= self._buffer_bytes:
+                buffered += len(yaml_bytes)
+                tasks.append(RenderTask(entry.key, None, yaml_bytes.decode("utf-8"), yaml_hash))
+            else:
+                tasks.append(RenderTask(entry.key, None, None, yaml_hash))
+
+        return tasks
+
+    def _is_current(self, key: str, input_hash: str, checker: OutputChecker) -> bool:
+        if not self._manifest.is_up_to_date(key, input_hash, self._output_path):
+            return False
+
+        if checker is None:
+            return True
+
+        # Checks trust the manifest only for outputs whose content it recorded
+        outputs: list[str] = self._manifest.outputs(key)
+        digests: dict[str, str] = self._manifest.digests(key)
+        if any(output not in digests for output in outputs):
+            return False
+
+        for output in outputs:
+            checker.verify(self._output_path / output, digests[output])
+
+        return True
+
+    def _holds_parsed(self, yaml_hash: str) -> bool:
+        return isinstance(self._cache, BlueprintMemoryCache) and yaml_hash in self._cache
+
+    def _render(self, tasks: deque[RenderTask], stream: bool, backup: BackupStore) -> Iterable[RenderResult]:
+        # Parse yamls and render, serially or across a process pool. Tasks are taken off the queue
+        # as they are handed out, so rendered blueprints release their text right away.
+        if not tasks:
+            return
+
+        pending: Iterable[RenderTask] = (tasks.popleft() for _ in range(len(tasks)))
+
+        if self._jobs > 1 and len(tasks) > 1:
+            # The pool and its workers outlive the run, watch and server sessions reuse them
+            if self._pool is None:
+                self._pool = RenderPool(self._jobs, self._generator_args, self._cache_dir)
+            self._pool.reserve(len(tasks))
+
+            # Workers cannot see the in-memory cache, give them the source text
+            yield from self._pool.render_all((self._prepare(task, parsed_in_memory=False) for task in pending),
+                                             self._parser,
+                                             self._output_path if stream else None,
+                                             backup
+                                             )
+        else:
+            renderer: Renderer = Renderer(self.generator,
+                                          self._parser,
+                                          self._cache,
+                                          self._output_path if stream else None,
+                                          backup
+                                          )
+            yield from (renderer.render(self._prepare(task, parsed_in_memory=True)) for task in pending)
+
+    def _prepare(self, task: RenderTask, parsed_in_memory: bool) -> RenderTask:
+        # Read lazily, only the tasks in flight hold their model info and source text
+        entry: DiscoveryEntry = self._index.entries[task.key]
+        yaml_text: str = task.yaml_text
+
+        if yaml_text is None and task.data is None and not (parsed_in_memory and self._holds_parsed(task.yaml_hash)):
+            yaml_text = self._index.path_of(entry).read_text()
+
+        return RenderTask(task.key, entry.model_info, yaml_text, task.yaml_hash, task.data)
+
+    def _write_result(self, writer: OutputWriter, entry: DiscoveryEntry, result: RenderResult) -> int:
+        outputs: list[str] = []
+        digests: dict[str, str] = {}
+        bytes_before: int = writer.bytes_written
+
+        if result.streamed is not None:
+            # Already written by the renderer, only account for the outcome
+            for output, (changed, size, digest) in result.streamed.items():
+                writer.account(self._output_path / output, changed, size)
+                outputs.append(output)
+                digests[output] = digest
+        else:
+            for output, content in ((entry.model_info.output_path(".h"), result.header_content),
+                                    (entry.model_info.output_path(".cpp"), result.source_content)):
+                if content:
+                    writer.write(self._output_path / output, content)
+                    outputs.append(output)
+                    digests[output] = writer.last_digest
+
+        # Outputs the model no longer produces are stale
+        for stale in set(self._manifest.outputs(result.key)) - set(outputs):
+            writer.remove(self._output_path / stale)
+
+        self._manifest.update(result.key, self._input_hashes[result.key], outputs, result.references,
+                              result.system_includes, result.project_includes, digests, self._output_stats(writer, outputs))
+
+        return writer.bytes_written - bytes_before
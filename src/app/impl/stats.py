@@ -0,0 +1,144 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    import cProfile
+
+
+@contextmanager
+def measure(timings: dict[str, list[float]], name: str) -> Iterator[None]:
+    # Accumulates [wall, cpu] seconds under name
+    wall_start: float   = time.perf_counter()
+    cpu_start: float    = time.process_time()
+
+    try:
+        yield
+    finally:
+        timing: list[float] = timings.setdefault(name, [0.0, 0.0])
+        timing[0] += time.perf_counter() - wall_start
+        timing[1] += time.process_time() - cpu_start
+
+
+def peak_rss(children: bool = False) -> int:
+    # Peak resident set size in bytes, of this process or of its finished children, 0 where unknown
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    usage: int = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+# ==============================================================================
+class Stats:
+    def __init__(self, per_file: bool = False, profile_phase: str = None):
+        self._per_file: bool                            = per_file
+        self._profile_phase: str                        = profile_phase
+        self._profiler: cProfile.Profile                = None
+        self._phases: dict[str, list[float]]            = {}
+        self._counters: dict[str, int]                  = {}
+        self._files: dict[str, dict[str, Any]]          = {}
+
+        if profile_phase:
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+    @property
+    def phases(self) -> dict[str, list[float]]:
+        return self._phases
+
+    @property
+    def counters(self) -> dict[str, int]:
+        return self._counters
+
+    @property
+    def files(self) -> dict[str, dict[str, Any]]:
+        return self._files
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        # Profiling covers the main process only, pool workers are not profiled
+        profiling: bool = name == self._profile_phase
+
+        with measure(self._phases, name):
+            if profiling:
+                self._profiler.enable()
+            try:
+                yield
+            finally:
+                if profiling:
+                    self._profiler.disable()
+
+    def count(self, name: str, value: int = 1) -> None:
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def maximum(self, name: str, value: int) -> None:
+        # Gauges keep their highest value across runs of a session
+        self._counters[name] = max(self._counters.get(name, 0), value)
+
+    def add_file(self, key: str, timings: dict[str, list[float]], **values: Any) -> None:
+        # File level timings are also summed, they include CPU time spent in workers
+        for name, (wall, cpu) in timings.items():
+            total: list[float] = self._phases.setdefault(f"files.{name}", [0.0, 0.0])
+            total[0] += wall
+            total[1] += cpu
+
+        if not self._per_file:
+            return
+
+        record: dict[str, Any] = self._files.setdefault(key, {"wall": 0.0, "cpu": 0.0})
+        for name, (wall, cpu) in timings.items():
+            record[name] = record.get(name, 0.0) + wall
+            record["wall"] += wall
+            record["cpu"] += cpu
+        record.update(values)
+
+    def to_json(self) -> str:
+        data: dict[str, Any] =  {
+                                    "phases": {name: {"wall": wall, "cpu": cpu} for name, (wall, cpu) in self._phases.items()},
+                                    "counters": dict(sorted(self._counters.items())),
+                                    "files": self._files
+                                }
+
+        return json.dumps(data, indent=2) + "\n"
+
+    def format_table(self, top: int) -> str:
+        lines: list[str] = ["Phases:"]
+
+        for name, (wall, cpu) in self._phases.items():
+            lines.append(f"  {name:<28} wall {wall * 1000:>10.1f} ms   cpu {cpu * 1000:>10.1f} ms")
+
+        lines.append("Counters:")
+        for name, value in sorted(self._counters.items()):
+            lines.append(f"  {name:<28} {value:>12}")
+
+        if self._files:
+            slowest: list[tuple[str, dict[str, Any]]] = sorted(self._files.items(), key=lambda item: item[1]["wall"], reverse=True)[:top]
+
+            lines.append(f"Slowest {len(slowest)} blueprints (ms):")
+            lines.append(f"  {'wall':>9} {'cpu':>9} {'load':>9} {'build':>9} {'render':>9} {'write':>9}  blueprint")
+            for key, record in slowest:
+                columns: list[float] = [record.get(name, 0.0) * 1000 for name in ("wall", "cpu", "yaml_load", "model_build", "template_render", "write")]
+                lines.append("  " + " ".join(f"{value:>9.2f}" for value in columns) + f"  {key}")
+
+        return "\n".join(lines) + "\n"
+
+    def dump_profile(self, output: Path = None) -> str:
+        if not self._profiler:
+            return ""
+
+        if output:
+            self._profiler.dump_stats(str(output))
+            return ""
+
+        import io
+        import pstats
+
+        stream: io.StringIO = io.StringIO()
+        pstats.Stats(self._profiler, stream=stream).sort_stats("cumulative").print_stats(30)
+        return stream.getvalue()
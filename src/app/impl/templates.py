@@ -0,0 +1,53 @@
+from app.impl.manifest import hash_bytes
+
+import importlib.util
+from pathlib import Path
+
+
+PRECOMPILED_DIRNAME: str            = "compiled"
+PRECOMPILED_FINGERPRINT_FILE: str   = "FINGERPRINT"
+TEMPLATES_DIRNAME: str              = "templates"
+
+
+def package_dir(jinja_env_package: str) -> Path:
+    # Search locations also exist for namespace packages, which have no __file__. Frozen builds
+    # see the bundled template folders as one when the package itself was not collected.
+    spec = importlib.util.find_spec(jinja_env_package)
+    if spec is None or not spec.submodule_search_locations:
+        raise ModuleNotFoundError(f"template package {jinja_env_package!r} not found", name=jinja_env_package)
+
+    return Path(next(iter(spec.submodule_search_locations)))
+
+
+def find_precompiled_templates(jinja_env_package: str) -> Path:
+    # Present only in bundled builds, see app.jinja.precompile
+    precompiled_dir: Path = package_dir(jinja_env_package) / PRECOMPILED_DIRNAME
+
+    if (precompiled_dir / PRECOMPILED_FINGERPRINT_FILE).is_file():
+        return precompiled_dir
+
+    return None
+
+
+def compute_templates_fingerprint(jinja_env_package: str) -> str:
+    # Covers every template in the package, including imported macro files.
+    # Sources are read directly so that up-to-date runs never import Jinja.
+    templates_dir: Path = package_dir(jinja_env_package) / TEMPLATES_DIRNAME
+    sources: list[bytes] = []
+
+    for name in sorted(path.relative_to(templates_dir).as_posix() for path in templates_dir.rglob("*") if path.is_file()):
+        sources.append(name.encode("utf-8"))
+        sources.append((templates_dir / name).read_bytes())
+
+    return hash_bytes(b"\0".join(sources))
+
+
+def generator_fingerprint(jinja_env_package: str, tab_indent: str) -> str:
+    precompiled_dir: Path = find_precompiled_templates(jinja_env_package)
+
+    if precompiled_dir:
+        templates_fingerprint: str = (precompiled_dir / PRECOMPILED_FINGERPRINT_FILE).read_text().strip()
+    else:
+        templates_fingerprint: str = compute_templates_fingerprint(jinja_env_package)
+
+    return hash_bytes(f"{tab_indent}\0{templates_fingerprint}".encode("utf-8"))
@@ -0,0 +1,82 @@
+from app.impl.manifest import hash_bytes
+
+from typing import Iterable
+
+
+# ==============================================================================
+class UnityBuilder:
+    # Bumped whenever batching changes, so that existing unity files are replanned
+    VERSION: int = 1
+    PREFIX: str = "unity_"
+
+    def __init__(self, batch_size: int, cmake_filename: str):
+        self._batch_size: int       = max(batch_size, 1)
+        self._cmake_filename: str   = cmake_filename
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def cmake_filename(self) -> str:
+        return self._cmake_filename
+
+    def outputs(self, sources: Iterable[str]) -> dict[str, str]:
+        plan: dict[str, list[str]] = self.plan(sources)
+
+        outputs: dict[str, str] = {unity_path: self.unity_content(members) for unity_path, members in plan.items()}
+        outputs[self._cmake_filename] = self.cmake_content(plan)
+        return outputs
+
+    def plan(self, sources: Iterable[str]) -> dict[str, list[str]]:
+        # Unity file -> member sources, all relative to the output root
+        by_dir: dict[str, list[str]] = {}
+        for source in sorted(sources):
+            by_dir.setdefault(source.rpartition("/")[0], []).append(source)
+
+        plan: dict[str, list[str]] = {}
+        for relative_dir, members in by_dir.items():
+            for batch in self._batches(members):
+                plan[self._unity_path(relative_dir, batch[0])] = batch
+
+        return plan
+
+    def unity_content(self, members: list[str]) -> str:
+        lines: list[str] = ["// Unity build of generated sources, do not edit"]
+        lines.extend(f"#include \"{member.rpartition('/')[2]}\"" for member in members)
+        return "\n".join(lines) + "\n"
+
+    def cmake_content(self, plan: dict[str, list[str]]) -> str:
+        lines: list[str] = ["# Generated sources for unity builds, do not edit", "", "set(BLUEPRINTCPP_UNITY_SOURCES"]
+        lines.extend(f"    \"${{CMAKE_CURRENT_LIST_DIR}}/{unity_path}\"" for unity_path in sorted(plan))
+        lines.append(")")
+
+        # Members are compiled through their unity file only
+        lines.extend(["", "set(BLUEPRINTCPP_UNITY_MEMBERS"])
+        lines.extend(f"    \"${{CMAKE_CURRENT_LIST_DIR}}/{member}\"" for unity_path in sorted(plan) for member in plan[unity_path])
+        lines.extend([")", "", "set_source_files_properties(${BLUEPRINTCPP_UNITY_MEMBERS} PROPERTIES HEADER_FILE_ONLY ON)"])
+
+        return "\n".join(lines) + "\n"
+
+    def _batches(self, members: list[str]) -> list[list[str]]:
+        # Boundaries depend on member names, so adding a source changes its own
+        # batch and leaves the others as they were. A minimum of half the batch
+        # size keeps tiny batches rare.
+        batches: list[list[str]] = [[]]
+
+        for member in members:
+            batch: list[str] = batches[-1]
+            batch.append(member)
+
+            if (len(batch) >= (self._batch_size + 1) // 2 and self._is_boundary(member)) or len(batch) >= 2 * self._batch_size:
+                batches.append([])
+
+        return [batch for batch in batches if batch]
+
+    def _is_boundary(self, member: str) -> bool:
+        return int(hash_bytes(member.encode("utf-8"))[:8], 16) % self._batch_size == 0
+
+    def _unity_path(self, relative_dir: str, first_member: str) -> str:
+        # Named after the first member so that a new batch does not rename the following ones
+        name: str = f"{UnityBuilder.PREFIX}{hash_bytes(first_member.encode('utf-8'))[:8]}.cpp"
+        return f"{relative_dir}/{name}" if relative_dir else name
@@ -0,0 +1,172 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+
+# ==============================================================================
+class PollingWatcher:
+    def __init__(self, root: Path, interval: float = 1.0):
+        self._root: Path                                = root
+        self._interval: float                           = interval
+        self._snapshot: dict[str, tuple[int, int]]      = self._take_snapshot()
+
+    def close(self) -> None:
+        pass
+
+    def wait(self) -> set[str]:
+        # Blocks until at least one blueprint was added, changed or removed
+        while True:
+            time.sleep(self._interval)
+
+            snapshot: dict[str, tuple[int, int]] = self._take_snapshot()
+            changed: set[str] = {key for key in snapshot.keys() | self._snapshot.keys()
+                                 if snapshot.get(key) != self._snapshot.get(key)}
+            self._snapshot = snapshot
+
+            if changed:
+                return changed
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot: dict[str, tuple[int, int]] = {}
+
+        for dirpath, dirnames, filenames in os.walk(self._root):
+            relative_dir: str = Path(dirpath).relative_to(self._root).as_posix()
+            prefix: str = "" if relative_dir == "." else f"{relative_dir}/"
+
+            for filename in filenames:
+                if filename.endswith(".yaml"):
+                    try:
+                        st = os.stat(os.path.join(dirpath, filename))
+                    except FileNotFoundError:
+                        continue
+                    snapshot[prefix + filename] = (st.st_mtime_ns, st.st_size)
+
+        return snapshot
+
+
+# ==============================================================================
+class InotifyWatcher:
+    IN_MODIFY: int      = 0x00000002
+    IN_CLOSE_WRITE: int = 0x00000008
+    IN_MOVED_FROM: int  = 0x00000040
+    IN_MOVED_TO: int    = 0x00000080
+    IN_CREATE: int      = 0x00000100
+    IN_DELETE: int      = 0x00000200
+    IN_DELETE_SELF: int = 0x00000400
+    IN_Q_OVERFLOW: int  = 0x00004000
+    IN_IGNORED: int     = 0x00008000
+    IN_ISDIR: int       = 0x40000000
+
+    WATCH_MASK: int     = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                           IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+    EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+
+    # Editors save in bursts, wait for the tree to settle before reporting
+    SETTLE_INTERVAL: float = 0.1
+
+    def __init__(self, root: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+        self._libc                      = libc
+        self._root: Path                = root
+        self._watches: dict[int, str]   = {}
+        self._fd: int                   = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._watch_tree("")
+
+    @staticmethod
+    def is_supported() -> bool:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+            return hasattr(libc, "inotify_init1")
+        except OSError:
+            return False
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def wait(self) -> set[str]:
+        # Returns the changed blueprint keys, or None when events were lost and everything must be checked
+        changed: set[str] = set()
+        overflow: bool = False
+
+        select.select([self._fd], [], [])
+        while select.select([self._fd], [], [], InotifyWatcher.SETTLE_INTERVAL)[0]:
+            overflow |= self._read_events(changed)
+
+        return None if overflow else changed
+
+    def _read_events(self, changed: set[str]) -> bool:
+        try:
+            data: bytes = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return False
+
+        overflow: bool = False
+        offset: int = 0
+
+        while offset < len(data):
+            wd, mask, _, length = InotifyWatcher.EVENT_HEADER.unpack_from(data, offset)
+            offset += InotifyWatcher.EVENT_HEADER.size
+            name: str = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+
+            if mask & InotifyWatcher.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+
+            if mask & InotifyWatcher.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            relative_dir: str = self._watches.get(wd)
+            if relative_dir is None or not name:
+                continue
+
+            key: str = f"{relative_dir}/{name}" if relative_dir else name
+
+            if mask & InotifyWatcher.IN_ISDIR:
+                # A directory appearing or vanishing changes every blueprint beneath it
+                if mask & (InotifyWatcher.IN_CREATE | InotifyWatcher.IN_MOVED_TO):
+                    self._watch_tree(key)
+                overflow = True
+            elif name.endswith(".yaml"):
+                changed.add(key)
+
+        return overflow
+
+    def _watch_tree(self, relative_dir: str) -> None:
+        absolute_dir: Path = self._root / relative_dir if relative_dir else self._root
+
+        wd: int = self._libc.inotify_add_watch(self._fd, os.fsencode(absolute_dir), InotifyWatcher.WATCH_MASK)
+        if wd < 0:
+            return
+
+        self._watches[wd] = relative_dir
+
+        try:
+            with os.scandir(absolute_dir) as it:
+                subdirs: list[str] = [e.name for e in it if e.is_dir() and not e.is_symlink()]
+        except FileNotFoundError:
+            return
+
+        for subdir in subdirs:
+            self._watch_tree(f"{relative_dir}/{subdir}" if relative_dir else subdir)
+
+
+def create_watcher(root: Path, poll_interval: float = 1.0, force_polling: bool = False):
+    if not force_polling and InotifyWatcher.is_supported():
+        try:
+            return InotifyWatcher(root)
+        except OSError:
+            pass
+
+    return PollingWatcher(root, poll_interval)
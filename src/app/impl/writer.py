@@ -0,0 +1,245 @@
+from app.impl.backup import BackupStore
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable
+
+
+# ==============================================================================
+class OutputWriter:
+    CHUNK_SIZE: int = 1 << 16
+
+    def __init__(self, backup: BackupStore = None, track_paths: bool = False):
+        self._backup_store: BackupStore = backup
+        self._written: int              = 0
+        self._unchanged: int            = 0
+        self._removed: int              = 0
+        self._bytes_written: int        = 0
+        self._last_digest: str          = None
+
+        # Path lists are only kept on request, large trees would otherwise hold every output path
+        self._paths: dict[str, list[Path]] = {"written": [], "unchanged": [], "removed": []} if track_paths else None
+
+        # mkstemp creates private files, generated files follow the umask instead
+        umask: int                      = os.umask(0)
+        os.umask(umask)
+        self._file_mode: int            = 0o666 & ~umask
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def unchanged(self) -> int:
+        return self._unchanged
+
+    @property
+    def removed(self) -> int:
+        return self._removed
+
+    @property
+    def bytes_written(self) -> int:
+        return self._bytes_written
+
+    @property
+    def paths(self) -> dict[str, list[Path]]:
+        # "written", "unchanged" and "removed" -> paths, None unless tracked
+        return self._paths
+
+    @property
+    def persistent(self) -> bool:
+        # Whether outputs end up in the output folder, only then its manifest and index are saved
+        return True
+
+    @property
+    def last_digest(self) -> str:
+        # Hex digest of the content given to the last write, whether it changed the file or not
+        return self._last_digest
+
+    def write(self, path: Path, content: str) -> bool:
+        data: bytes = content.encode("utf-8")
+        content_digest: bytes = hashlib.sha256(data).digest()
+        self._last_digest = content_digest.hex()
+
+        if self._is_identical(path, len(data), content_digest):
+            self._track("unchanged", path)
+            self._unchanged += 1
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._backup(path)
+        self._atomic_write(path, data)
+        self._track("written", path)
+        self._written += 1
+        self._bytes_written += len(data)
+        return True
+
+    def write_stream(self, path: Path, chunks: Iterable[str]) -> bool:
+        # Chunks go straight to a temporary file while an incremental digest is kept
+        import tempfile
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        digest = hashlib.sha256()
+        size: int = 0
+
+        try:
+            with os.fdopen(fd, "wb", buffering=OutputWriter.CHUNK_SIZE) as file:
+                for chunk in chunks:
+                    data: bytes = chunk.encode("utf-8")
+                    digest.update(data)
+                    file.write(data)
+                    size += len(data)
+
+            self._last_digest = digest.hexdigest()
+            if self._is_identical(path, size, digest.digest()):
+                os.unlink(tmp_name)
+                self._track("unchanged", path)
+                self._unchanged += 1
+                return False
+
+            self._backup(path)
+            os.chmod(tmp_name, self._file_mode)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        self._track("written", path)
+        self._written += 1
+        self._bytes_written += size
+        return True
+
+    def account(self, path: Path, changed: bool, size: int) -> None:
+        # Outcome of a write performed by another writer, e.g. in a worker process
+        if changed:
+            self._track("written", path)
+            self._written += 1
+            self._bytes_written += size
+        else:
+            self._track("unchanged", path)
+            self._unchanged += 1
+
+    def remove(self, path: Path) -> bool:
+        self._backup(path)
+
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+
+        self._track("removed", path)
+        self._removed += 1
+        return True
+
+    def summary(self) -> str:
+        return f"{self._written} written, {self._unchanged} unchanged, {self._removed} removed"
+
+    def _track(self, outcome: str, path: Path) -> None:
+        if self._paths is not None:
+            self._paths[outcome].append(path)
+
+    def _is_identical(self, path: Path, size: int, content_digest: bytes) -> bool:
+        # Cheap size check first, digest only when sizes match or the size is not known
+        try:
+            if path.stat().st_size != size and size is not None:
+                return False
+        except FileNotFoundError:
+            return False
+
+        digest = hashlib.sha256()
+        with path.open("rb") as file:
+            while chunk := file.read(OutputWriter.CHUNK_SIZE):
+                digest.update(chunk)
+
+        return digest.digest() == content_digest
+
+    def _backup(self, path: Path) -> None:
+        # Only reached for files about to change, identical outputs are never backed up
+        if self._backup_store:
+            self._backup_store.save(path)
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        # Imported on first write, up-to-date runs never create a file
+        import tempfile
+
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.chmod(tmp_name, self._file_mode)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+
+# ==============================================================================
+class OutputChecker(OutputWriter):
+    # Compares what would be written with the files on disk and never touches them,
+    # would-be writes are counted as written and would-be removals as removed
+    def __init__(self):
+        super().__init__()
+        self._stale: list[Path]     = []
+        self._missing: list[Path]   = []
+        self._orphaned: list[Path]  = []
+
+    @property
+    def stale(self) -> list[Path]:
+        return self._stale
+
+    @property
+    def missing(self) -> list[Path]:
+        return self._missing
+
+    @property
+    def orphaned(self) -> list[Path]:
+        return self._orphaned
+
+    @property
+    def persistent(self) -> bool:
+        return False
+
+    def write(self, path: Path, content: str) -> bool:
+        data: bytes = content.encode("utf-8")
+        return self._compare(path, len(data), hashlib.sha256(data).digest())
+
+    def write_stream(self, path: Path, chunks: Iterable[str]) -> bool:
+        digest = hashlib.sha256()
+        size: int = 0
+
+        for chunk in chunks:
+            data: bytes = chunk.encode("utf-8")
+            digest.update(data)
+            size += len(data)
+
+        return self._compare(path, size, digest.digest())
+
+    def verify(self, path: Path, hex_digest: str) -> bool:
+        # Against a digest recorded when the file was written, without rendering it again
+        return self._compare(path, None, bytes.fromhex(hex_digest))
+
+    def account(self, path: Path, changed: bool, size: int) -> None:
+        raise RuntimeError("checks compare in process, outputs cannot be streamed by workers")
+
+    def remove(self, path: Path) -> bool:
+        if not path.exists():
+            return False
+
+        self._orphaned.append(path)
+        self._removed += 1
+        return True
+
+    def _compare(self, path: Path, size: int, content_digest: bytes) -> bool:
+        self._last_digest = content_digest.hex()
+
+        if self._is_identical(path, size, content_digest):
+            self._unchanged += 1
+            return False
+
+        (self._stale if path.exists() else self._missing).append(path)
+        self._written += 1
+        return True
@@ -0,0 +1,36 @@
+import app.config as config
+from app.impl.generator import create_environment
+from app.impl.templates import compute_templates_fingerprint, PRECOMPILED_FINGERPRINT_FILE
+from jinja2 import PackageLoader
+
+import argparse
+import shutil
+from pathlib import Path
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompile the generator templates into Python modules")
+
+    parser.add_argument("output",
+                        help="Output folder for the compiled template modules"
+                        )
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    output_path: Path = Path(args.output).resolve()
+    if output_path.exists():
+        shutil.rmtree(output_path)
+
+    # Same environment options as CppGenerator, compiled code depends on them
+    env = create_environment(PackageLoader(config.JINJA_ENV_PACKAGE))
+    env.compile_templates(str(output_path), zip=None, ignore_errors=False)
+
+    (output_path / PRECOMPILED_FINGERPRINT_FILE).write_text(compute_templates_fingerprint(config.JINJA_ENV_PACKAGE) + "\n")
+
+
+if __name__ == "__main__":
+    main()
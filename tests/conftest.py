@@ -0,0 +1,82 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+# Imported from the source tree, like the benchmarks do, which also provide synthetic projects
+SRC_DIR: Path = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(SRC_DIR.parent / "benchmarks"))
+
+import app.config as config
+import app.impl as impl
+from synthetic import SyntheticProject
+
+PROJECT_DIR: Path = Path(__file__).resolve().parent / "blueprint" / "project"
+
+# Far in the past, any rewrite of an aged file moves its mtime
+AGED_NS: int = 1_000_000_000
+
+
+def generate(*args: str):
+    # Runs the command line in this process, so that tests can patch the configuration
+    import app.__main__ as cli
+
+    with mock.patch.object(sys, "argv", ["app", *map(str, args)]):
+        return cli.main()
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    # A separate interpreter, for behaviour that depends on process state
+    env: dict[str, str] = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    return subprocess.run([sys.executable, "-m", "app", *map(str, args)], capture_output=True, text=True, env=env, timeout=60)
+
+
+def generator_arguments() -> tuple:
+    # Read at call time, tests patch the configuration
+    return (config.JINJA_ENV_PACKAGE,
+            config.CLASS_HEADER_TEMPLATE_FILENAME,
+            config.CLASS_SOURCE_TEMPLATE_FILENAME,
+            config.INTERFACE_HEADER_TEMPLATE_FILENAME,
+            config.ENUM_HEADER_TEMPLATE_FILENAME,
+            config.TAB_INDENT)
+
+
+def create_session(project: Path, output: Path, **options) -> impl.Session:
+    return impl.Session(project, output, generator_arguments(), config.STANDARD_INCLUDE_MAP,
+                        config.MANIFEST_FILENAME, config.DISCOVERY_INDEX_FILENAME, **options)
+
+
+def age(output: Path) -> None:
+    for path in output.rglob("*"):
+        if path.suffix in (".h", ".cpp"):
+            os.utime(path, ns=(AGED_NS, AGED_NS))
+
+
+def rewritten(output: Path) -> set[str]:
+    # Generated files touched since they were aged
+    return {path.relative_to(output).as_posix() for path in output.rglob("*")
+            if path.suffix in (".h", ".cpp") and path.stat().st_mtime_ns != AGED_NS}
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    # A copy of the sample project that tests are free to edit
+    return Path(shutil.copytree(PROJECT_DIR, tmp_path / "project"))
+
+
+@pytest.fixture
+def output(tmp_path: Path) -> Path:
+    return tmp_path / "out"
+
+
+@pytest.fixture
+def synthetic(tmp_path: Path) -> Path:
+    # Large enough for several render chunks, with cross references between blueprints
+    root: Path = tmp_path / "synthetic"
+    SyntheticProject(blueprints=120, members=4, methods=4, params=2, evalues=4, cross_refs=3).write(root)
+    return root
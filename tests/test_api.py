@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+
+import app
+import app.api as api
+
+from conftest import PROJECT_DIR, generate
+
+
+def test_single_root_generates_into_the_output(project: Path, output: Path):
+    result: app.GenerateResult = app.generate([project], output)
+
+    assert result.passed and not result.errors
+    assert [(root.input_path, root.output_path) for root in result.roots] == [(project, output)]
+    assert sorted(result.roots[0].files["written"]) == ["enums/EMode.h", "interfaces/IModule.h", "modules/Module1.cpp", "modules/Module1.h"]
+    assert set(result.files("written")) == {output / path for path in result.roots[0].files["written"]}
+    assert "render" in result.roots[0].timings
+
+
+def test_several_roots_generate_into_folders_named_after_them(project: Path, tmp_path: Path):
+    result: app.GenerateResult = app.generate([project, PROJECT_DIR.parent], tmp_path / "out")
+
+    assert [root.output_path for root in result.roots] == [tmp_path / "out" / "project", tmp_path / "out" / "blueprint"]
+    assert (tmp_path / "out" / "project" / "modules" / "Module1.h").is_file()
+    assert (tmp_path / "out" / "blueprint" / "project" / "modules" / "Module1.h").is_file()
+
+
+def test_explicit_outputs_are_used_as_given(project: Path, tmp_path: Path):
+    roots: list = [(project, tmp_path / "a"), (PROJECT_DIR, tmp_path / "b")]
+
+    assert api.resolve_roots(roots, tmp_path / "unused") == [(project, tmp_path / "a"), (PROJECT_DIR, tmp_path / "b")]
+
+
+def test_roots_sharing_a_folder_name_are_rejected(project: Path):
+    with pytest.raises(ValueError, match="share the folder name"):
+        api.resolve_roots([project, PROJECT_DIR], "out")
+
+
+def test_failed_blueprints_fail_their_root(project: Path, output: Path):
+    app.generate([project], output)
+    (project / "enums" / "EMode.enum.yaml").write_text("evalues: [\n")
+
+    result: app.GenerateResult = app.generate([project], output)
+
+    assert not result.passed
+    assert len(result.errors) == 1 and str(project / "enums" / "EMode.enum.yaml") in result.errors[0]
+    assert result.roots[0].files["written"] == []
+
+
+def test_check_reports_stale_outputs(project: Path, output: Path):
+    app.generate([project], output)
+    blueprint: Path = project / "interfaces" / "IModule.interface.yaml"
+    blueprint.write_text(blueprint.read_text().replace("Start the module", "Start every module"))
+
+    result: app.GenerateResult = app.generate([project], output, app.GenerateOptions(check=True))
+
+    assert not result.passed
+    assert result.roots[0].files["stale"] == ["interfaces/IModule.h"]
+    assert result.files("stale") == [output / "interfaces" / "IModule.h"]
+
+
+def test_roots_share_one_generator(project: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    built: list = []
+    original = api.impl.CppGenerator
+
+    def counting(*args):
+        built.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(api.impl, "CppGenerator", counting)
+    result: app.GenerateResult = app.generate([project, PROJECT_DIR.parent], tmp_path / "out")
+
+    assert result.passed and len(built) == 1
+
+
+def test_command_line_accepts_several_roots(project: Path, tmp_path: Path, capsys: pytest.CaptureFixture):
+    assert generate(project, PROJECT_DIR.parent, "-o", tmp_path / "out") == 0
+
+    lines: list[str] = capsys.readouterr().out.splitlines()
+    assert any(f"{project}: 4 written" in line for line in lines)
+    assert (tmp_path / "out" / "blueprint" / "project" / "modules" / "Module1.h").is_file()
@@ -0,0 +1,110 @@
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import app.api as api
+import app.impl as impl
+
+from conftest import SRC_DIR
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    # Archives written to stdout are binary
+    env: dict[str, str] = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    return subprocess.run([sys.executable, "-m", "app", *map(str, args)], capture_output=True, env=env)
+
+
+def generated_files(output: Path) -> dict[str, bytes]:
+    return {path.relative_to(output).as_posix(): path.read_bytes() for path in sorted(output.rglob("*.*"))
+            if path.is_file() and not path.name.startswith(".")}
+
+
+@pytest.mark.parametrize("archive_format", ["tar", "zip"])
+def test_archives_are_byte_reproducible(project: Path, tmp_path: Path, archive_format: str):
+    first: Path = tmp_path / f"first.{archive_format}"
+    assert run_cli(project, "-o", tmp_path / "out", "--archive", first).returncode == 0
+
+    # Another location, other file times and another run must not show in the archive
+    moved: Path = Path(shutil.copytree(project, tmp_path / "elsewhere" / "project"))
+    for path in moved.rglob("*.yaml"):
+        os.utime(path, ns=(1_600_000_000_000_000_000, 1_600_000_000_000_000_000))
+    second: Path = tmp_path / f"second.{archive_format}"
+    assert run_cli(moved, "-o", tmp_path / "elsewhere" / "out", "--archive", second).returncode == 0
+
+    assert first.read_bytes() == second.read_bytes()
+    assert not (tmp_path / "out").exists()
+
+
+@pytest.mark.parametrize("archive_format", ["tar", "zip"])
+def test_stdout_archive_matches_file_archive(project: Path, tmp_path: Path, archive_format: str):
+    archive: Path = tmp_path / "outputs.bin"
+    assert run_cli(project, "-o", tmp_path / "out", "--archive", archive, "--archive-format", archive_format).returncode == 0
+
+    result: subprocess.CompletedProcess = run_cli(project, "-o", tmp_path / "out", "--archive", "-", "--archive-format", archive_format)
+
+    assert result.returncode == 0
+    assert result.stdout == archive.read_bytes()
+
+
+def test_archive_contents_match_generated_files(project: Path, tmp_path: Path):
+    assert run_cli(project, "-o", tmp_path / "out").returncode == 0
+    assert run_cli(project, "-o", tmp_path / "out", "--archive", tmp_path / "a.tar").returncode == 0
+    assert run_cli(project, "-o", tmp_path / "out", "--archive", tmp_path / "a.zip").returncode == 0
+    expected: dict[str, bytes] = generated_files(tmp_path / "out")
+
+    with tarfile.open(tmp_path / "a.tar") as archive:
+        tar_files: dict[str, bytes] = {member.name: archive.extractfile(member).read() for member in archive.getmembers()}
+
+    with zipfile.ZipFile(tmp_path / "a.zip") as archive:
+        zip_files: dict[str, bytes] = {name: archive.read(name) for name in archive.namelist()}
+
+    assert tar_files == expected
+    assert zip_files == expected
+
+
+def test_entries_have_fixed_metadata(tmp_path: Path):
+    tar_stream: io.BytesIO = io.BytesIO()
+    zip_stream: io.BytesIO = io.BytesIO()
+
+    for writer_class, stream in ((impl.TarWriter, tar_stream), (impl.ZipWriter, zip_stream)):
+        writer: impl.ArchiveWriter = writer_class(tmp_path, stream)
+        writer.write(tmp_path / "b" / "B.h", "b\n")
+        writer.write(tmp_path / "a" / "A.h", "a\n")
+        writer.close()
+
+    with tarfile.open(fileobj=io.BytesIO(tar_stream.getvalue())) as archive:
+        members: list[tarfile.TarInfo] = archive.getmembers()
+
+    assert [member.name for member in members] == ["b/B.h", "a/A.h"]
+    for member in members:
+        assert (member.mtime, member.mode, member.uid, member.gid, member.uname, member.gname) == \
+               (impl.ArchiveWriter.FIXED_TIMESTAMP, impl.ArchiveWriter.FILE_MODE, 0, 0, "", "")
+
+    with zipfile.ZipFile(io.BytesIO(zip_stream.getvalue())) as archive:
+        infos: list[zipfile.ZipInfo] = archive.infolist()
+
+    assert [info.filename for info in infos] == ["b/B.h", "a/A.h"]
+    for info in infos:
+        assert info.date_time == (1980, 1, 1, 0, 0, 0)
+        assert info.external_attr >> 16 == 0o100000 | impl.ArchiveWriter.FILE_MODE
+
+
+def test_archive_writer_is_abstract(tmp_path: Path):
+    with pytest.raises(TypeError):
+        impl.ArchiveWriter(tmp_path)
+
+
+def test_in_memory_outputs_match_generated_files(project: Path, tmp_path: Path):
+    result: api.GenerateResult = api.generate([project], tmp_path / "memory", api.GenerateOptions(in_memory=True))
+    api.generate([project], tmp_path / "disk")
+
+    assert result.passed
+    assert result.roots[0].contents == generated_files(tmp_path / "disk")
+    assert not (tmp_path / "memory").exists()
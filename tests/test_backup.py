@@ -0,0 +1,180 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import app.config as config
+import app.impl as impl
+
+from conftest import create_session, generate, run_cli
+
+
+def run(project: Path, output: Path, full_rebuild: bool = False) -> impl.RunReport:
+    return create_session(project, output, create_backup=True, backup_dirname=config.BACKUP_DIRNAME).run(full_rebuild=full_rebuild)
+
+
+def store(output: Path) -> impl.BackupStore:
+    return impl.BackupStore(output, output / config.BACKUP_DIRNAME)
+
+
+def objects(output: Path) -> list[Path]:
+    return [path for path in (output / config.BACKUP_DIRNAME / "objects").rglob("*") if path.is_file()]
+
+
+@pytest.fixture
+def roots(tmp_path: Path, project: Path, output: Path) -> list[Path]:
+    # Two input roots generating into output/first and output/second, each with its own store
+    first: Path = project.rename(tmp_path / "first")
+    second: Path = Path(shutil.copytree(first, tmp_path / "second"))
+
+    assert run_cli(first, second, "-o", output, "--backup").returncode == 0
+    return [first, second]
+
+
+def test_snapshot_records_changed_and_created_files(project: Path, output: Path):
+    run(project, output)
+    blueprint: Path = project / "enums" / "EMode.enum.yaml"
+    blueprint.write_text(blueprint.read_text() + "\ndescription: Changed\n")
+    run(project, output)
+
+    first, second = store(output).snapshots()
+
+    # Created files have no content to keep
+    assert first["files"] == dict.fromkeys(["enums/EMode.h", "interfaces/IModule.h", "modules/Module1.cpp", "modules/Module1.h"])
+    assert list(second["files"]) == ["enums/EMode.h"] and second["bytes"] > 0
+
+
+def test_restore_puts_back_overwritten_files(project: Path, output: Path):
+    run(project, output)
+    before: str = (output / "enums" / "EMode.h").read_text()
+    blueprint: Path = project / "enums" / "EMode.enum.yaml"
+    blueprint.write_text(blueprint.read_text() + "\ndescription: Changed\n")
+    run(project, output)
+
+    restored, removed = store(output).restore(store(output).snapshots()[-1]["id"])
+
+    assert restored == ["enums/EMode.h"] and removed == []
+    assert (output / "enums" / "EMode.h").read_text() == before
+
+
+def test_restore_removes_files_the_run_created(project: Path, output: Path):
+    run(project, output)
+
+    restored, removed = store(output).restore(store(output).snapshots()[0]["id"])
+
+    # Emptied folders go too, the output root and its bookkeeping stay
+    assert restored == [] and len(removed) == 4
+    assert sorted(path.name for path in output.iterdir()) == sorted([config.BACKUP_DIRNAME, config.DISCOVERY_INDEX_FILENAME, config.MANIFEST_FILENAME])
+
+
+def test_restored_files_do_not_share_the_stored_inode(project: Path, output: Path):
+    run(project, output)
+    header: Path = output / "enums" / "EMode.h"
+    header.write_text("// hand edit\n")
+    run(project, output)
+    backups: impl.BackupStore = store(output)
+
+    backups.restore(backups.snapshots()[-1]["id"])
+    with header.open("a") as file:
+        file.write("// edited after restoring\n")
+
+    backups.restore(backups.snapshots()[-1]["id"])
+    assert header.read_text() == "// hand edit\n"
+
+
+def test_unchanged_content_is_stored_once(project: Path, output: Path):
+    run(project, output)
+    header: Path = output / "enums" / "EMode.h"
+    original: str = header.read_text()
+
+    # Two full rebuilds replace the same hand edited content, the store links it once
+    for _ in range(2):
+        header.write_text("// hand edit\n")
+        run(project, output, full_rebuild=True)
+
+    assert len(store(output).snapshots()) == 3 and len(objects(output)) == 1
+    assert objects(output)[0].read_text() == "// hand edit\n" and header.read_text() == original
+
+
+def test_backups_link_instead_of_copying(project: Path, output: Path):
+    run(project, output)
+    header: Path = output / "enums" / "EMode.h"
+    header.write_text("// hand edit\n")
+    inode: int = header.stat().st_ino
+
+    run(project, output, full_rebuild=True)
+
+    assert [path.stat().st_ino for path in objects(output)] == [inode]
+
+
+def test_prune_keeps_the_newest_snapshots_and_their_objects(project: Path, output: Path):
+    run(project, output)
+    header: Path = output / "enums" / "EMode.h"
+    for edit in ("// first\n", "// second\n"):
+        header.write_text(edit)
+        run(project, output, full_rebuild=True)
+    backups: impl.BackupStore = store(output)
+    newest: str = backups.snapshots()[-1]["id"]
+
+    assert backups.prune(1) == (2, 1)
+    assert [snapshot["id"] for snapshot in backups.snapshots()] == [newest]
+
+    backups.restore(newest)
+    assert header.read_text() == "// second\n"
+
+
+@pytest.mark.parametrize("snapshot_id", ["../../x", "../snapshots/20260101-000000-000000000", "/tmp/x", ""])
+def test_restore_rejects_ids_outside_the_store(output: Path, snapshot_id: str):
+    output.mkdir()
+    (output / "x.jsonl").write_text('{"path": "victim", "digest": null}\n')
+
+    with pytest.raises(ValueError, match="invalid backup snapshot id"):
+        store(output).restore(snapshot_id)
+
+
+def test_restore_reports_unknown_snapshots(output: Path):
+    with pytest.raises(ValueError, match="no backup snapshot"):
+        store(output).restore("20260101-000000-000000000")
+
+
+def test_restored_files_are_regenerated_by_the_next_run(project: Path, output: Path, capsys: pytest.CaptureFixture):
+    run(project, output)
+    header: Path = output / "enums" / "EMode.h"
+    original: str = header.read_text()
+    header.write_text("// hand edit\n")
+    run(project, output, full_rebuild=True)
+
+    assert generate("-o", output, "--backup-list") == 0
+    snapshot_id: str = store(output).snapshots()[-1]["id"]
+    assert snapshot_id in capsys.readouterr().out
+
+    assert generate("-o", output, "--backup-restore", snapshot_id) == 0
+    assert header.read_text() == "// hand edit\n"
+
+    run(project, output)
+    assert header.read_text() == original
+
+
+def test_backups_of_every_root_are_listed(roots: list[Path], output: Path):
+    result: subprocess.CompletedProcess = run_cli(*roots, "-o", output, "--backup-list")
+    listed: list[str] = [line.split()[:2] for line in result.stdout.splitlines()]
+
+    assert result.returncode == 0
+    assert listed == [[f"{output / root.name}:", store(output / root.name).snapshots()[0]["id"]] for root in roots]
+
+
+def test_restore_finds_the_root_holding_the_snapshot(roots: list[Path], output: Path):
+    snapshot_id: str = store(output / "second").snapshots()[0]["id"]
+
+    result: subprocess.CompletedProcess = run_cli(*roots, "-o", output, "--backup-restore", snapshot_id)
+
+    assert result.returncode == 0 and f"{output / 'second'}: 0 restored and 4 removed" in result.stdout
+    assert not (output / "second" / "enums").exists() and (output / "first" / "enums" / "EMode.h").exists()
+
+
+def test_prune_applies_to_every_root(roots: list[Path], output: Path):
+    result: subprocess.CompletedProcess = run_cli(*roots, "-o", output, "--backup-prune", "0")
+
+    assert result.returncode == 0
+    assert store(output / "first").snapshots() == [] and store(output / "second").snapshots() == []
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+
+import app.config as config
+import app.impl as impl
+
+from conftest import PROJECT_DIR, create_session
+
+
+def outputs(output: Path) -> dict[str, bytes]:
+    # Generated files only, the manifest and index record where each model came from
+    state: set[str] = {config.MANIFEST_FILENAME, config.DISCOVERY_INDEX_FILENAME}
+    return {path.relative_to(output).as_posix(): path.read_bytes() for path in sorted(output.rglob("*"))
+            if path.is_file() and path.name not in state}
+
+
+def bundle_document(path: Path, explicit_namespace: bool) -> str:
+    name, kind = path.name[:-len(".yaml")].rsplit(".", 1)
+    header: str = f"name: {name}\nkind: {kind}\n"
+    if explicit_namespace:
+        header += f"namespace: {path.parent.name}\n"
+
+    return header + path.read_text()
+
+
+def write_bundle(root: Path) -> Path:
+    # One bundle for the whole project, every document names its namespace
+    root.mkdir()
+    documents: list[str] = [bundle_document(path, True) for path in sorted(PROJECT_DIR.rglob("*.yaml"))]
+    (root / "all.bundle.yaml").write_text("---\n".join(documents))
+    return root / "all.bundle.yaml"
+
+
+@pytest.mark.parametrize("layout", ["root", "folders"])
+def test_bundles_generate_the_same_outputs_as_single_files(tmp_path: Path, layout: str):
+    bundled: Path = tmp_path / "bundled"
+
+    if layout == "root":
+        write_bundle(bundled)
+    else:
+        # One bundle per folder, documents without a namespace take the folder's
+        for path in sorted(PROJECT_DIR.rglob("*.yaml")):
+            folder: Path = bundled / path.parent.name
+            folder.mkdir(parents=True)
+            (folder / "models.bundle.yaml").write_text(bundle_document(path, False))
+
+    assert not create_session(PROJECT_DIR, tmp_path / "single_out").run().errors
+    report: impl.RunReport = create_session(bundled, tmp_path / "bundled_out").run()
+
+    assert not report.errors
+    assert outputs(tmp_path / "bundled_out") == outputs(tmp_path / "single_out")
+
+
+def test_bundle_entries_match_single_file_entries(tmp_path: Path):
+    bundled: Path = write_bundle(tmp_path / "bundled").parent
+
+    single: impl.DiscoveryIndex = impl.DiscoveryIndex(PROJECT_DIR, tmp_path / "single.json")
+    bundle: impl.DiscoveryIndex = impl.DiscoveryIndex(bundled, tmp_path / "bundle.json")
+    single.refresh()
+    bundle.refresh()
+
+    def describe(index: impl.DiscoveryIndex) -> dict[str, tuple]:
+        return {entry.typename: (entry.header_path, entry.model_info.classification, entry.model_info.name,
+                                 entry.model_info.namespaces, entry.model_info.include_guard) for entry in index.entries.values()}
+
+    assert describe(bundle) == describe(single)
+    assert not bundle.errors
+
+
+def test_only_changed_documents_are_rendered(tmp_path: Path, output: Path):
+    bundle: Path = write_bundle(tmp_path / "bundled")
+    create_session(bundle.parent, output).run()
+
+    bundle.write_text(bundle.read_text().replace("Start the module", "Start every module"))
+    report: impl.RunReport = create_session(bundle.parent, output).run()
+
+    assert report.rendered == 1 and report.written == 1
+    assert "Start every module" in (output / "interfaces" / "IModule.h").read_text()
+
+
+def test_invalid_documents_are_reported(tmp_path: Path, output: Path):
+    (tmp_path / "bundled").mkdir()
+    (tmp_path / "bundled" / "models.bundle.yaml").write_text("name: EMode\nkind: enum\n---\nname: 1st\nkind: enum\n---\nname: EOther\nkind: struct\n")
+
+    report: impl.RunReport = create_session(tmp_path / "bundled", output).run()
+
+    assert [error.split(": ", 1)[1] for error in report.errors] == ["document 2: invalid or missing name '1st'",
+                                                                    "document 3: EOther: invalid or missing kind 'struct'"]
+    assert (output / "EMode.h").is_file()
+
+
+def test_typename_defined_twice_reports_an_error(project: Path, output: Path):
+    (project / "enums" / "more.bundle.yaml").write_text("name: EMode\nkind: enum\n---\nname: EOther\nkind: enum\n")
+
+    report: impl.RunReport = create_session(project, output).run()
+
+    assert len(report.errors) == 1 and "enums::EMode is already defined" in report.errors[0]
+    assert (output / "enums" / "EOther.h").is_file()
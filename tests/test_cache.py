@@ -0,0 +1,78 @@
+import datetime
+from pathlib import Path
+
+import yaml
+
+import app.config as config
+import app.impl as impl
+
+from conftest import PROJECT_DIR, generate
+
+
+def render_task(key: str) -> impl.RenderTask:
+    yaml_bytes: bytes = (PROJECT_DIR / key).read_bytes()
+    model_info: impl.ModelInfo = impl.DiscoveryEntry.from_key(key).model_info
+    return impl.RenderTask(key, model_info, yaml_bytes.decode("utf-8"), impl.hash_bytes(yaml_bytes))
+
+
+def test_loaded_data_matches_the_safe_loader():
+    for path in sorted(PROJECT_DIR.rglob("*.yaml")):
+        assert impl.Parser.load_yaml(path.read_text()) == (yaml.safe_load(path.read_text()) or {})
+
+
+def test_cache_round_trip(tmp_path: Path):
+    cache: impl.BlueprintCache = impl.BlueprintCache(tmp_path)
+    assert cache.get("ab12") is None
+
+    cache.put("ab12", {"members": [{"name": "id", "type": "int"}]})
+
+    assert impl.BlueprintCache(tmp_path).get("ab12") == {"members": [{"name": "id", "type": "int"}]}
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_values_marshal_cannot_store_are_not_cached(tmp_path: Path):
+    cache: impl.BlueprintCache = impl.BlueprintCache(tmp_path)
+    cache.put("ab12", {"created": datetime.date(2024, 1, 1)})
+
+    assert cache.get("ab12") is None
+
+
+def test_corrupt_entry_is_a_miss(tmp_path: Path):
+    cache: impl.BlueprintCache = impl.BlueprintCache(tmp_path)
+    cache.put("ab12", {"description": "text"})
+    (cache.directory / "ab" / "12").write_bytes(b"\xff")
+
+    assert cache.get("ab12") is None and cache.misses == 1
+
+
+def test_cached_blueprints_skip_yaml_loading(tmp_path: Path, monkeypatch):
+    loads: list[str] = []
+    load_yaml = impl.Parser.load_yaml
+    monkeypatch.setattr(impl.Parser, "load_yaml", staticmethod(lambda text: loads.append(text) or load_yaml(text)))
+
+    generator: impl.CppGenerator = impl.CppGenerator(config.JINJA_ENV_PACKAGE,
+                                                     config.CLASS_HEADER_TEMPLATE_FILENAME,
+                                                     config.CLASS_SOURCE_TEMPLATE_FILENAME,
+                                                     config.INTERFACE_HEADER_TEMPLATE_FILENAME,
+                                                     config.ENUM_HEADER_TEMPLATE_FILENAME,
+                                                     config.TAB_INDENT)
+    parser: impl.Parser = impl.Parser(config.STANDARD_INCLUDE_MAP)
+    task: impl.RenderTask = render_task("modules/Module1.class.yaml")
+
+    first: impl.RenderResult = impl.Renderer(generator, parser, impl.BlueprintCache(tmp_path)).render(task)
+    second: impl.RenderResult = impl.Renderer(generator, parser, impl.BlueprintCache(tmp_path)).render(task)
+
+    assert len(loads) == 1
+    assert (second.header_content, second.source_content) == (first.header_content, first.source_content)
+
+
+def test_cached_output_matches_uncached(project: Path, tmp_path: Path, monkeypatch):
+    generate(project, "-o", tmp_path / "cached", "--cache-dir", tmp_path / "cache")
+
+    # A generator change renders every blueprint again, now from the cache
+    monkeypatch.setattr(config, "TAB_INDENT", "\t")
+    generate(project, "-o", tmp_path / "cached", "--cache-dir", tmp_path / "cache")
+    generate(project, "-o", tmp_path / "uncached")
+
+    for path in sorted((tmp_path / "uncached").rglob("*.h")):
+        assert (tmp_path / "cached" / path.relative_to(tmp_path / "uncached")).read_text() == path.read_text()
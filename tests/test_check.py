@@ -0,0 +1,111 @@
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from conftest import run_cli
+
+
+def snapshot(output: Path) -> dict[str, tuple[int, bytes]]:
+    return {path.relative_to(output).as_posix(): (path.stat().st_mtime_ns, path.read_bytes())
+            for path in sorted(output.rglob("*")) if path.is_file()}
+
+
+@pytest.fixture
+def generated(project: Path, output: Path) -> Path:
+    assert run_cli(project, "-o", output).returncode == 0
+    return output
+
+
+def test_up_to_date_outputs_pass(project: Path, generated: Path):
+    result: subprocess.CompletedProcess = run_cli(project, "-o", generated, "--check")
+
+    assert result.returncode == 0, result.stderr
+    assert "0 stale, 0 missing, 0 orphaned, 4 up to date" in result.stdout
+
+
+def test_missing_output_fails(project: Path, generated: Path):
+    (generated / "enums" / "EMode.h").unlink()
+    result: subprocess.CompletedProcess = run_cli(project, "-o", generated, "--check")
+
+    assert result.returncode == 1
+    assert "missing: enums/EMode.h" in result.stderr
+
+
+def test_edited_output_fails(project: Path, generated: Path):
+    header: Path = generated / "modules" / "Module1.h"
+    header.write_text(header.read_text() + "// edited\n")
+    result: subprocess.CompletedProcess = run_cli(project, "-o", generated, "--check")
+
+    assert result.returncode == 1
+    assert "stale: modules/Module1.h" in result.stderr
+
+
+def test_edit_keeping_size_and_mtime_fails(project: Path, generated: Path):
+    # Same size and mtime, the check still compares the recorded digest with the file
+    header: Path = generated / "enums" / "EMode.h"
+    stat: os.stat_result = header.stat()
+    header.write_text(header.read_text().replace("EMode", "EMade"))
+    os.utime(header, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    result: subprocess.CompletedProcess = run_cli(project, "-o", generated, "--check")
+
+    assert result.returncode == 1
+    assert "stale: enums/EMode.h" in result.stderr
+
+
+def test_changed_blueprint_fails(project: Path, generated: Path):
+    blueprint: Path = project / "enums" / "EMode.enum.yaml"
+    blueprint.write_text(blueprint.read_text() + "\ndescription: Changed\n")
+    result: subprocess.CompletedProcess = run_cli(project, "-o", generated, "--check")
+
+    assert result.returncode == 1
+    assert "stale: enums/EMode.h" in result.stderr
+
+
+def test_removed_blueprint_fails(project: Path, generated: Path):
+    (project / "modules" / "Module1.class.yaml").unlink()
+    result: subprocess.CompletedProcess = run_cli(project, "-o", generated, "--check")
+
+    assert result.returncode == 1
+    assert "orphaned: modules/Module1.cpp" in result.stderr and "orphaned: modules/Module1.h" in result.stderr
+
+
+def test_never_generated_fails(project: Path, output: Path):
+    result: subprocess.CompletedProcess = run_cli(project, "-o", output, "--check")
+
+    assert result.returncode == 1
+    assert "0 stale, 4 missing" in result.stdout
+    assert not output.exists()
+
+
+def test_check_writes_nothing(project: Path, generated: Path):
+    (generated / "enums" / "EMode.h").unlink()
+    (project / "interfaces" / "IModule.interface.yaml").write_text("description: Changed\n")
+    before: dict[str, tuple[int, bytes]] = snapshot(generated)
+
+    assert run_cli(project, "-o", generated, "--check").returncode == 1
+    assert snapshot(generated) == before
+
+
+def test_check_after_regeneration_passes(project: Path, generated: Path):
+    (generated / "enums" / "EMode.h").unlink()
+    assert run_cli(project, "-o", generated, "--check").returncode == 1
+
+    assert run_cli(project, "-o", generated).returncode == 0
+    assert run_cli(project, "-o", generated, "--check").returncode == 0
+
+
+def test_check_rejects_watch(project: Path, generated: Path):
+    result: subprocess.CompletedProcess = run_cli(project, "-o", generated, "--check", "--watch")
+
+    assert result.returncode == 2
+    assert "--check cannot be combined" in result.stderr
+
+
+def test_check_rejects_changed(project: Path, generated: Path):
+    result: subprocess.CompletedProcess = run_cli(project, "-o", generated, "--check", "--changed", project / "enums" / "EMode.enum.yaml")
+
+    assert result.returncode == 2
+    assert "--check cannot be combined" in result.stderr
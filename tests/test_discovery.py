@@ -0,0 +1,81 @@
+import os
+import time
+from pathlib import Path
+
+import app.impl as impl
+
+from conftest import AGED_NS
+
+
+def age_dirs(root: Path) -> None:
+    # Old directory mtimes are trusted, recent ones are racy
+    for path in [root, *root.rglob("*")]:
+        if path.is_dir():
+            os.utime(path, ns=(AGED_NS, AGED_NS))
+
+
+def refreshed(project: Path, index_path: Path) -> impl.DiscoveryIndex:
+    # A fresh index per refresh, like separate invocations of the command line
+    index: impl.DiscoveryIndex = impl.DiscoveryIndex(project, index_path)
+    index.load()
+    index.refresh()
+    index.save()
+    return index
+
+
+def test_entries_describe_each_blueprint(project: Path, tmp_path: Path):
+    index: impl.DiscoveryIndex = refreshed(project, tmp_path / "index.json")
+
+    assert list(index.entries) == ["enums/EMode.enum.yaml", "interfaces/IModule.interface.yaml", "modules/Module1.class.yaml"]
+
+    entry: impl.DiscoveryEntry = index.entries["modules/Module1.class.yaml"]
+    assert (entry.typename, entry.header_path, entry.relative_dir) == ("modules::Module1", "modules/Module1.h", "modules")
+    assert entry.model_info.include_guard == "MODULES_MODULE1_H"
+    assert index.path_of(entry) == project / "modules" / "Module1.class.yaml"
+
+
+def test_unchanged_directories_are_not_listed_again(project: Path, tmp_path: Path):
+    age_dirs(project)
+    first: impl.DiscoveryIndex = refreshed(project, tmp_path / "index.json")
+    second: impl.DiscoveryIndex = refreshed(project, tmp_path / "index.json")
+
+    assert first.rescanned == 4
+    assert second.rescanned == 0
+    assert list(second.entries) == list(first.entries)
+
+
+def test_changed_directory_is_listed_again(project: Path, tmp_path: Path):
+    age_dirs(project)
+    refreshed(project, tmp_path / "index.json")
+    (project / "enums" / "EOther.enum.yaml").write_text("values: []\n")
+
+    index: impl.DiscoveryIndex = refreshed(project, tmp_path / "index.json")
+
+    assert index.rescanned == 1
+    assert "enums/EOther.enum.yaml" in index.entries
+
+
+def test_racy_directory_is_not_trusted(project: Path, tmp_path: Path):
+    age_dirs(project)
+    recent: int = time.time_ns()
+    os.utime(project / "enums", ns=(recent, recent))
+
+    refreshed(project, tmp_path / "index.json")
+    # Modified too recently, a later change could keep the same mtime
+    (project / "enums" / "EOther.enum.yaml").write_text("values: []\n")
+    os.utime(project / "enums", ns=(recent, recent))
+
+    index: impl.DiscoveryIndex = refreshed(project, tmp_path / "index.json")
+
+    assert index.rescanned == 1
+    assert "enums/EOther.enum.yaml" in index.entries
+
+
+def test_index_of_another_root_is_ignored(project: Path, tmp_path: Path):
+    age_dirs(project)
+    refreshed(project, tmp_path / "index.json")
+
+    moved: Path = project.rename(tmp_path / "moved")
+    index: impl.DiscoveryIndex = refreshed(moved, tmp_path / "index.json")
+
+    assert index.rescanned == 4
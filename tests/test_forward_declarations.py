@@ -0,0 +1,139 @@
+from pathlib import Path
+
+import pytest
+
+import app.config as config
+import app.impl as impl
+
+from conftest import create_session
+
+
+PROJECT_TYPES: dict[str, tuple[str, str]] = {
+    "base::BaseModule":     ("base/BaseModule.h", "class"),
+    "interfaces::IModule":  ("interfaces/IModule.h", "interface"),
+    "enums::EMode":         ("enums/EMode.h", "enum"),
+    "modules::Module1":     ("modules/Module1.h", "class")
+}
+
+
+@pytest.fixture
+def parser() -> impl.Parser:
+    parser: impl.Parser = impl.Parser(config.STANDARD_INCLUDE_MAP, forward_declarations=True)
+    parser.set_project_includes(PROJECT_TYPES)
+    return parser
+
+
+def parse_members(parser: impl.Parser, model: impl.Model, members: list[tuple[str, str]]) -> impl.Model:
+    parser.parse_data(model, {"members": [{"name": f"value{i}", "type": typedef, "indirection": indirection}
+                                          for i, (typedef, indirection) in enumerate(members)]})
+    return model
+
+
+def class_model() -> impl.Model:
+    return impl.Model("Module1", ["modules"], "MODULES_MODULE1_H")
+
+
+def test_pointers_and_references_are_forward_declared(parser: impl.Parser):
+    model: impl.Model = parse_members(parser, class_model(), [("base::BaseModule", "*"), ("interfaces::IModule", "&"), ("enums::EMode", "*")])
+
+    assert {typename: declaration.keyword for typename, declaration in model.forward_declarations.items()} == \
+           {"base::BaseModule": "class", "interfaces::IModule": "class", "enums::EMode": "enum class"}
+    assert model.includes_h.project == set()
+    assert model.includes_cpp == {"base/BaseModule.h", "interfaces/IModule.h", "enums/EMode.h"}
+
+
+def test_types_also_used_by_value_are_pruned(parser: impl.Parser):
+    model: impl.Model = parse_members(parser, class_model(), [("base::BaseModule", "*"), ("base::BaseModule", "")])
+
+    assert model.forward_declarations == {}
+    assert model.includes_h.project == {"base/BaseModule.h"} and model.includes_cpp == set()
+
+
+@pytest.mark.parametrize("typedef", ["std::vector<base::BaseModule>", "base::BaseModule::Nested", "other::Type"])
+def test_only_plain_project_types_are_forward_declared(parser: impl.Parser, typedef: str):
+    model: impl.Model = parse_members(parser, class_model(), [(typedef, "*")])
+
+    assert model.forward_declarations == {} and model.includes_cpp == set()
+
+
+def test_header_only_kinds_keep_their_includes(parser: impl.Parser):
+    model: impl.Model = impl.Model("IModule", ["interfaces"], "INTERFACES_IMODULE_H")
+    parse_members(parser, model, [("base::BaseModule", "*")])
+
+    assert model.forward_declarations == {} and model.includes_cpp == set()
+    assert model.includes_h.project == {"base/BaseModule.h"}
+
+
+def test_own_type_is_neither_declared_nor_included(parser: impl.Parser):
+    model: impl.Model = parse_members(parser, class_model(), [("modules::Module1", "*")])
+
+    assert model.forward_declarations == {} and model.includes_cpp == set() and model.includes_h.project == set()
+
+
+def test_mode_off_keeps_every_include(project: Path, tmp_path: Path):
+    (project / "modules" / "Module1.class.yaml").write_text(
+        "members:\n  - name: owner\n    type: interfaces::IModule\n    indirection: \"*\"\n")
+
+    create_session(project, tmp_path / "included").run()
+    create_session(project, tmp_path / "declared", forward_declarations=True).run()
+
+    included: str = (tmp_path / "included" / "modules" / "Module1.h").read_text()
+    declared: str = (tmp_path / "declared" / "modules" / "Module1.h").read_text()
+    assert '#include "interfaces/IModule.h"' in included and '#include "interfaces/IModule.h"' not in declared
+    assert "namespace interfaces { class IModule; }" in declared
+    assert '#include "interfaces/IModule.h"' in (tmp_path / "declared" / "modules" / "Module1.cpp").read_text()
+
+
+def test_interfaces_keep_their_includes_in_the_header(project: Path, tmp_path: Path):
+    (project / "interfaces" / "IHolder.interface.yaml").write_text(
+        "methods:\n  - name: Attach\n    type: void\n    params:\n      - name: owner\n        type: interfaces::IModule\n        indirection: \"&\"\n")
+
+    create_session(project, tmp_path / "included").run()
+    create_session(project, tmp_path / "declared", forward_declarations=True).run()
+
+    holder: str = (tmp_path / "declared" / "interfaces" / "IHolder.h").read_text()
+    assert '#include "interfaces/IModule.h"' in holder
+    assert holder == (tmp_path / "included" / "interfaces" / "IHolder.h").read_text()
+
+
+@pytest.fixture
+def linked_project(project: Path) -> Path:
+    # A class and an interface, both naming another class through a pointer
+    (project / "base").mkdir()
+    (project / "base" / "BaseModule.class.yaml").write_text("description: Base\n")
+    (project / "modules" / "Holder.class.yaml").write_text(
+        "members:\n  - name: owner\n    type: base::BaseModule\n    indirection: \"*\"\n")
+    (project / "interfaces" / "IHolder.interface.yaml").write_text(
+        "methods:\n  - name: Attach\n    type: void\n    params:\n      - name: owner\n        type: base::BaseModule\n        indirection: \"&\"\n")
+    return project
+
+
+def generate(project: Path, output: Path, forward_declarations: bool) -> dict[str, str]:
+    create_session(project, output, forward_declarations=forward_declarations).run()
+    return {path.relative_to(output).as_posix(): path.read_text() for path in output.rglob("*.*") if path.suffix in (".h", ".cpp")}
+
+
+def test_rendered_class_declares_and_includes_in_source(linked_project: Path, tmp_path: Path):
+    included: dict[str, str] = generate(linked_project, tmp_path / "included", False)
+    declared: dict[str, str] = generate(linked_project, tmp_path / "declared", True)
+
+    assert '#include "base/BaseModule.h"' in included["modules/Holder.h"]
+    assert declared["modules/Holder.h"] == included["modules/Holder.h"].replace(
+        '#include "base/BaseModule.h"\n',
+        '\n\n'
+        '// ----------------------------------------------------------------------------------------------------\n'
+        '// --------------------------------------- Forward declarations ---------------------------------------\n'
+        '// ----------------------------------------------------------------------------------------------------\n'
+        'namespace base { class BaseModule; }\n')
+    assert '#include "base/BaseModule.h"' in declared["modules/Holder.cpp"]
+
+
+def test_rendered_header_only_models_are_unchanged(linked_project: Path, tmp_path: Path):
+    included: dict[str, str] = generate(linked_project, tmp_path / "included", False)
+    declared: dict[str, str] = generate(linked_project, tmp_path / "declared", True)
+
+    holder: set[str] = {"modules/Holder.h", "modules/Holder.cpp"}
+
+    assert '#include "base/BaseModule.h"' in declared["interfaces/IHolder.h"]
+    assert {name: text for name, text in declared.items() if name not in holder} == \
+           {name: text for name, text in included.items() if name not in holder}
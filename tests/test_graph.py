@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import app.impl as impl
+
+from conftest import create_session, generate
+
+
+def test_dependents_follow_reference_updates():
+    graph: impl.DependencyGraph = impl.DependencyGraph()
+    graph.set_references("a.class.yaml", ["b::B", "c::C"])
+    graph.set_references("d.class.yaml", ["b::B"])
+
+    assert graph.dependents_of({"b::B"}) == {"a.class.yaml", "d.class.yaml"}
+
+    graph.set_references("a.class.yaml", ["c::C"])
+    graph.remove("d.class.yaml")
+
+    assert graph.dependents_of({"b::B"}) == set()
+    assert graph.dependents("c::C") == {"a.class.yaml"}
+    assert graph.keys() == {"a.class.yaml"}
+
+
+def test_references_are_recorded_per_blueprint(project: Path, output: Path):
+    session: impl.Session = create_session(project, output)
+    session.run()
+
+    # Unresolved names are kept, standard and fundamental ones are not
+    assert session.manifest.references("modules/Module1.class.yaml") == ["base", "base::BaseModule", "interfaces", "interfaces::IModule"]
+    assert session.graph.dependents("interfaces::IModule") == {"modules/Module1.class.yaml"}
+
+
+def test_new_blueprint_renders_only_its_dependents(project: Path, output: Path):
+    create_session(project, output).run()
+    (project / "base").mkdir()
+    (project / "base" / "BaseModule.class.yaml").write_text("description: Base\n")
+
+    report: impl.RunReport = create_session(project, output).run()
+
+    # The new blueprint and Module1, which inherits base::BaseModule
+    assert report.rendered == 2
+    assert '#include "base/BaseModule.h"' in (output / "modules" / "Module1.h").read_text()
+
+
+def test_graph_export(project: Path, output: Path, tmp_path: Path):
+    generate(project, "-o", output, "--graph", tmp_path / "graph.json")
+    generate(project, "-o", output, "--graph", tmp_path / "graph.dot", "--graph-format", "dot")
+
+    assert json.loads((tmp_path / "graph.json").read_text()) == {
+        "blueprints": {
+            "enums::EMode": "enums/EMode.enum.yaml",
+            "interfaces::IModule": "interfaces/IModule.interface.yaml",
+            "modules::Module1": "modules/Module1.class.yaml"
+        },
+        "dependents": {
+            "enums::EMode": [],
+            "interfaces::IModule": ["modules::Module1"],
+            "modules::Module1": []
+        }
+    }
+    assert '    "interfaces::IModule" -> "modules::Module1";' in (tmp_path / "graph.dot").read_text().splitlines()
@@ -0,0 +1,114 @@
+import random
+from pathlib import Path
+from typing import Any
+
+import app.impl as impl
+
+from conftest import create_session
+
+
+SYSTEM_HEADER_BYTES: int = 1000
+
+
+def small_graph() -> impl.IncludeGraph:
+    # d -> a -> b <-> c, e stands alone. External and self includes are not part of the graph.
+    graph: impl.IncludeGraph = impl.IncludeGraph(SYSTEM_HEADER_BYTES)
+    graph.add_header("a.h", 100, ["b.h", "c.h", "external.h"], ["vector"])
+    graph.add_header("b.h", 200, ["c.h"], ["string"])
+    graph.add_header("c.h", 300, ["b.h", "c.h"], [])
+    graph.add_header("d.h", 400, ["a.h"], ["vector"])
+    graph.add_header("e.h", 500, [], [])
+    return graph
+
+
+def rows(report: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    return {row["header"]: row for row in report["headers"]}
+
+
+def test_cycles_are_found():
+    report: dict[str, Any] = small_graph().analyze()
+
+    assert report["cycles"] == [["b.h", "c.h"]]
+    assert {header: row["cycle"] for header, row in rows(report).items()} == {"a.h": None, "b.h": 0, "c.h": 0, "d.h": None, "e.h": None}
+
+
+def test_fan_in_and_fan_out():
+    by_header: dict[str, dict[str, Any]] = rows(small_graph().analyze())
+
+    assert {header: row["fan_out"] for header, row in by_header.items()} == {"a.h": 2, "b.h": 1, "c.h": 1, "d.h": 3, "e.h": 0}
+    assert {header: row["fan_in"] for header, row in by_header.items()} == {"a.h": 1, "b.h": 3, "c.h": 3, "d.h": 0, "e.h": 0}
+
+
+def test_sizes_and_ranking():
+    report: dict[str, Any] = small_graph().analyze()
+    by_header: dict[str, dict[str, Any]] = rows(report)
+
+    # Own and reached project headers, plus every distinct system header reached
+    assert {header: row["estimated_bytes"] for header, row in by_header.items()} == {"a.h": 2600, "b.h": 1500, "c.h": 1500, "d.h": 3000, "e.h": 500}
+    assert {header: row["system_includes"] for header, row in by_header.items()} == {"a.h": 2, "b.h": 1, "c.h": 1, "d.h": 2, "e.h": 0}
+    assert [row["header"] for row in report["headers"]] == ["b.h", "c.h", "a.h", "d.h", "e.h"]
+    assert by_header["b.h"]["impact_bytes"] == 1500 * 4
+
+
+def test_long_chains_and_rings():
+    # Deeper than the recursion limit, the component search is iterative
+    size: int = 5000
+    chain: impl.IncludeGraph = impl.IncludeGraph(SYSTEM_HEADER_BYTES)
+    ring: impl.IncludeGraph = impl.IncludeGraph(SYSTEM_HEADER_BYTES)
+    for i in range(size):
+        chain.add_header(f"h{i:05}.h", 1, [f"h{i + 1:05}.h"] if i + 1 < size else [], [])
+        ring.add_header(f"h{i:05}.h", 1, [f"h{(i + 1) % size:05}.h"], [])
+
+    chain_rows: dict[str, dict[str, Any]] = rows(chain.analyze())
+    assert chain_rows["h00000.h"]["fan_out"] == size - 1
+    assert chain_rows[f"h{size - 1:05}.h"]["fan_in"] == size - 1
+
+    ring_report: dict[str, Any] = ring.analyze()
+    assert len(ring_report["cycles"]) == 1 and len(ring_report["cycles"][0]) == size
+    assert all(row["fan_in"] == size - 1 and row["fan_out"] == size - 1 for row in ring_report["headers"])
+
+
+def test_random_graphs_match_a_plain_reachability_search():
+    generator: random.Random = random.Random(7)
+    headers: list[str] = [f"h{i:03}.h" for i in range(300)]
+    includes: dict[str, list[str]] = {header: generator.sample(headers, generator.randint(0, 3)) for header in headers}
+    systems: dict[str, list[str]] = {header: generator.sample(["vector", "string", "map", "memory"], generator.randint(0, 2)) for header in headers}
+    sizes: dict[str, int] = {header: generator.randint(1, 1000) for header in headers}
+
+    graph: impl.IncludeGraph = impl.IncludeGraph(SYSTEM_HEADER_BYTES)
+    for header in headers:
+        graph.add_header(header, sizes[header], includes[header], systems[header])
+    by_header: dict[str, dict[str, Any]] = rows(graph.analyze())
+
+    reach: dict[str, set[str]] = {}
+    for header in headers:
+        seen: set[str] = {header}
+        pending: list[str] = [header]
+        while pending:
+            for included in includes[pending.pop()]:
+                if included not in seen:
+                    seen.add(included)
+                    pending.append(included)
+        reach[header] = seen
+
+    for header in headers:
+        system_count: int = len({system for reached in reach[header] for system in systems[reached]})
+        assert by_header[header]["fan_out"] == len(reach[header]) - 1
+        assert by_header[header]["fan_in"] == sum(header in reach[other] for other in headers if other != header)
+        assert by_header[header]["system_includes"] == system_count
+        assert by_header[header]["estimated_bytes"] == sum(sizes[reached] for reached in reach[header]) + system_count * SYSTEM_HEADER_BYTES
+
+
+def test_report_is_cached_in_the_manifest(project: Path, output: Path, monkeypatch):
+    # A later invocation reads the report back while no header changed
+    session: impl.Session = create_session(project, output)
+    session.run()
+    report: dict[str, Any] = session.include_report(SYSTEM_HEADER_BYTES)
+
+    def fail(self):
+        raise AssertionError("analyzed again")
+
+    monkeypatch.setattr(impl.IncludeGraph, "analyze", fail)
+    session = create_session(project, output)
+    session.run()
+    assert session.include_report(SYSTEM_HEADER_BYTES) == report
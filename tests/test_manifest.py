@@ -0,0 +1,215 @@
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import app.config as config
+import app.impl as impl
+
+from conftest import AGED_NS, SRC_DIR, age, generate, rewritten
+
+
+def summary(capsys) -> tuple[int, int, int]:
+    # Written, unchanged and removed files of the last run
+    line: str = capsys.readouterr().out.strip().splitlines()[-1]
+    return tuple(int(part.split()[0]) for part in line.split(": ", 1)[1].split(", "))
+
+def test_up_to_date_run_rewrites_nothing(project: Path, output: Path):
+    generate(project, "-o", output)
+    age(output)
+
+    generate(project, "-o", output)
+
+    assert rewritten(output) == set()
+
+
+def test_changed_input_rewrites_only_its_outputs(project: Path, output: Path):
+    generate(project, "-o", output)
+    age(output)
+    blueprint: Path = project / "enums" / "EMode.enum.yaml"
+    blueprint.write_text(blueprint.read_text() + "\ndescription: Changed\n")
+
+    generate(project, "-o", output)
+
+    assert rewritten(output) == {"enums/EMode.h"}
+    assert "Changed" in (output / "enums" / "EMode.h").read_text()
+
+
+def test_full_rebuild_renders_everything(project: Path, output: Path, capsys):
+    generate(project, "-o", output)
+    age(output)
+
+    generate(project, "-o", output, "--full")
+
+    # Everything is rendered again, but identical files are left alone
+    assert summary(capsys) == (0, 4, 0)
+    assert rewritten(output) == set()
+
+
+def test_missing_output_is_regenerated(project: Path, output: Path):
+    generate(project, "-o", output)
+    (output / "modules" / "Module1.cpp").unlink()
+    age(output)
+
+    generate(project, "-o", output)
+
+    assert rewritten(output) == {"modules/Module1.cpp"}
+
+
+def test_removed_blueprint_removes_its_outputs(project: Path, output: Path, capsys):
+    generate(project, "-o", output)
+    (project / "modules" / "Module1.class.yaml").unlink()
+
+    generate(project, "-o", output)
+
+    assert summary(capsys)[2] == 2
+    assert not (output / "modules" / "Module1.h").exists()
+    assert not (output / "modules" / "Module1.cpp").exists()
+
+
+def test_template_change_renders_everything(project: Path, output: Path, tmp_path: Path, monkeypatch, capsys):
+    # A copy of the template package that can be edited
+    package: Path = Path(shutil.copytree(SRC_DIR / "app" / "jinja", tmp_path / "packages" / "edited_jinja",
+                                         ignore=shutil.ignore_patterns("__pycache__")))
+    monkeypatch.syspath_prepend(str(package.parent))
+    monkeypatch.setattr(config, "JINJA_ENV_PACKAGE", "edited_jinja")
+    monkeypatch.delitem(sys.modules, "edited_jinja", raising=False)
+
+    generate(project, "-o", output)
+    template: Path = package / "templates" / "utils.j2"
+    template.write_text(template.read_text() + "\n{# edited #}\n")
+    capsys.readouterr()
+
+    generate(project, "-o", output)
+
+    assert summary(capsys) == (0, 4, 0)
+
+
+def test_tab_indent_change_renders_everything(project: Path, output: Path, monkeypatch, capsys):
+    generate(project, "-o", output)
+    monkeypatch.setattr(config, "TAB_INDENT", "\t")
+
+    generate(project, "-o", output)
+
+    written, unchanged, removed = summary(capsys)
+    assert written + unchanged == 4 and written > 0
+
+
+def test_moved_tree_stays_up_to_date(project: Path, output: Path, tmp_path: Path, capsys):
+    generate(project, "-o", output)
+
+    # Input and output moved together, copies keep their file times
+    moved: Path = tmp_path / "moved"
+    shutil.copytree(project, moved / "project")
+    shutil.copytree(output, moved / "out")
+
+    generate(moved / "project", "-o", moved / "out")
+
+    # Nothing rendered, not even to compare
+    assert summary(capsys) == (0, 0, 0)
+
+
+def test_hand_edited_output_is_regenerated(project: Path, output: Path, capsys):
+    generate(project, "-o", output)
+    header: Path = output / "modules" / "Module1.h"
+    expected: str = header.read_text()
+    header.write_text(expected + "// edited\n")
+
+    generate(project, "-o", output)
+
+    assert summary(capsys) == (1, 1, 0)
+    assert header.read_text() == expected
+
+
+def test_touched_output_is_rendered_but_not_rewritten(project: Path, output: Path, capsys):
+    generate(project, "-o", output)
+    age(output)
+
+    generate(project, "-o", output)
+
+    # Aged outputs no longer match their recorded mtime, identical content is left alone
+    assert summary(capsys) == (0, 4, 0)
+    assert rewritten(output) == set()
+
+
+def test_manifest_round_trip(tmp_path: Path):
+    path: Path = tmp_path / "manifest.json"
+    (tmp_path / "a.h").write_text("")
+    manifest: impl.Manifest = impl.Manifest(path)
+    manifest.update_fingerprints({"templates": "t"})
+    manifest.update("a.class.yaml", "hash-a", ["a.h"], stats={"a.h": impl.Manifest.output_stat(tmp_path / "a.h")})
+    manifest.update("b.enum.yaml", "hash-b", ["b.h"])
+    manifest.save()
+
+    loaded: impl.Manifest = impl.Manifest(path)
+    loaded.load()
+
+    assert loaded.is_up_to_date("a.class.yaml", "hash-a", tmp_path)
+    assert not loaded.is_up_to_date("a.class.yaml", "other", tmp_path)
+    assert not loaded.is_up_to_date("b.enum.yaml", "hash-b", tmp_path)
+
+    # Outputs count only while they keep the size and mtime recorded when written
+    (tmp_path / "a.h").write_text("edited")
+    assert not loaded.is_up_to_date("a.class.yaml", "hash-a", tmp_path)
+    assert loaded.retain({"a.class.yaml"}) == ["b.h"]
+
+    # Other fingerprints invalidate every entry, its outputs are kept for cleanup
+    assert loaded.update_fingerprints({"templates": "u"})
+    assert loaded.outputs("a.class.yaml") == ["a.h"]
+
+
+def test_entries_are_read_back_from_file_and_journal(tmp_path: Path):
+    path: Path = tmp_path / "manifest.json"
+    manifest: impl.Manifest = impl.Manifest(path)
+    manifest.update("a.class.yaml", "hash-a", ["a.h", "a.cpp"], references=["b"], digests={"a.h": "d"})
+    manifest.update("b.enum.yaml", "hash-b", ["b.h"])
+    manifest.cache_report("report", "hash-r", {"value": 1})
+    manifest.save()
+
+    loaded: impl.Manifest = impl.Manifest(path)
+    loaded.load()
+
+    # Only hashes and line offsets are held, everything else is read from the file when asked
+    assert sorted(loaded.keys()) == ["a.class.yaml", "b.enum.yaml"]
+    assert all(isinstance(record, tuple) and isinstance(record[1], int) for record in loaded._entries.values())
+    assert loaded.outputs("a.class.yaml") == ["a.cpp", "a.h"]
+    assert loaded.references("a.class.yaml") == ["b"]
+    assert loaded.digests("a.class.yaml") == {"a.h": "d"}
+    assert loaded.cached_report("report", "hash-r") == {"value": 1}
+    assert loaded.cached_report("report", "other") is None
+
+    # Updates go to the journal until saved
+    loaded.update("c.enum.yaml", "hash-c", ["c.h"])
+    assert loaded.outputs("c.enum.yaml") == ["c.h"] and loaded._entries["c.enum.yaml"][1] < 0
+
+    # Entries naming a changed typename lose their hash
+    loaded.invalidate_dependents({"b"})
+    assert not loaded.is_up_to_date("a.class.yaml", "hash-a", tmp_path)
+    assert loaded.retain({"a.class.yaml", "c.enum.yaml"}) == ["b.h"]
+    loaded.save()
+
+    reloaded: impl.Manifest = impl.Manifest(path)
+    reloaded.load()
+    assert sorted(reloaded.keys()) == ["a.class.yaml", "c.enum.yaml"]
+    assert reloaded.outputs("a.class.yaml") == ["a.cpp", "a.h"] and reloaded.outputs("c.enum.yaml") == ["c.h"]
+
+
+def test_manifest_has_one_line_per_entry(project: Path, output: Path):
+    generate(project, "-o", output)
+
+    header, *lines = (output / config.MANIFEST_FILENAME).read_text().splitlines()
+
+    assert json.loads(header)["version"] == impl.Manifest.VERSION
+    assert sorted(json.loads(line)[1] for line in lines if json.loads(line)[0] == "entry") == \
+           ["enums/EMode.enum.yaml", "interfaces/IModule.interface.yaml", "modules/Module1.class.yaml"]
+
+
+def test_up_to_date_run_leaves_the_manifest_alone(project: Path, output: Path):
+    generate(project, "-o", output)
+    manifest: Path = output / config.MANIFEST_FILENAME
+    os.utime(manifest, ns=(AGED_NS, AGED_NS))
+
+    generate(project, "-o", output)
+
+    assert manifest.stat().st_mtime_ns == AGED_NS
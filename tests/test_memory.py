@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import app.config as config
+import app.impl as impl
+
+from conftest import PROJECT_DIR, create_session, generate, generator_arguments
+
+
+def contents(output: Path) -> dict[str, bytes]:
+    return {path.relative_to(output).as_posix(): path.read_bytes() for path in sorted(output.rglob("*")) if path.suffix in (".h", ".cpp")}
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_blueprints_past_the_buffer_are_read_again(synthetic: Path, tmp_path: Path, monkeypatch, jobs: int):
+    reads: list[Path] = []
+    read_text = Path.read_text
+    monkeypatch.setattr(Path, "read_text", lambda path, *args, **kwargs: reads.append(path) or read_text(path, *args, **kwargs))
+
+    create_session(synthetic, tmp_path / "unbounded", jobs=jobs).run()
+    assert not [path for path in reads if path.suffix == ".yaml"]
+
+    create_session(synthetic, tmp_path / "bounded", jobs=jobs, buffer_bytes=4096).run()
+    assert len([path for path in reads if path.suffix == ".yaml"]) > 100
+
+    assert contents(tmp_path / "bounded") == contents(tmp_path / "unbounded")
+
+
+def test_pool_pulls_tasks_only_as_results_are_consumed():
+    pulled: list[int] = []
+    text: str = (PROJECT_DIR / "enums" / "EMode.enum.yaml").read_text()
+    entry: impl.DiscoveryEntry = impl.DiscoveryEntry.from_key("enums/EMode.enum.yaml")
+
+    def tasks():
+        for i in range(1000):
+            pulled.append(i)
+            yield impl.RenderTask(entry.key, entry.model_info, text, str(i))
+
+    pool: impl.RenderPool = impl.RenderPool(2, generator_arguments())
+    pool.reserve(1000)
+    try:
+        results = pool.render_all(tasks(), impl.Parser(config.STANDARD_INCLUDE_MAP))
+        next(results)
+
+        # The window plus the chunk being cut when the first result was awaited
+        assert len(pulled) <= (2 * impl.RenderPool.CHUNKS_IN_FLIGHT + 1) * impl.RenderPool.CHUNK_SIZE
+        assert sum(1 for _ in results) == 999
+    finally:
+        pool.close()
+
+
+def test_entries_are_slotted_and_share_namespace_strings():
+    first: impl.DiscoveryEntry = impl.DiscoveryEntry.from_key("modules/First.class.yaml")
+    second: impl.DiscoveryEntry = impl.DiscoveryEntry.from_key("modules/Second.class.yaml")
+
+    assert not hasattr(first, "__dict__") and not hasattr(first.model_info, "__dict__")
+    assert first.model_info.namespaces[0] is second.model_info.namespaces[0]
+
+
+def test_peak_memory_is_reported(project: Path, output: Path, tmp_path: Path):
+    generate(project, "-o", output, "--stats-json", tmp_path / "stats.json")
+    counters: dict = json.loads((tmp_path / "stats.json").read_text())["counters"]
+
+    assert counters["peak_rss_bytes"] > 1 << 20 and "peak_rss_children_bytes" in counters
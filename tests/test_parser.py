@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pytest
+
+import app.config as config
+import app.impl as impl
+
+from conftest import create_session
+
+
+PROJECT_TYPES: dict[str, tuple[str, str]] = {
+    "base::BaseModule":     ("base/BaseModule.h", "class"),
+    "interfaces::IModule":  ("interfaces/IModule.h", "interface"),
+    "enums::EMode":         ("enums/EMode.h", "enum")
+}
+
+
+@pytest.fixture
+def parser() -> impl.Parser:
+    parser: impl.Parser = impl.Parser(config.STANDARD_INCLUDE_MAP)
+    parser.set_project_includes(PROJECT_TYPES)
+    return parser
+
+
+def parse_member(parser: impl.Parser, typedef: str, indirection: str = "") -> impl.Model:
+    model: impl.Model = impl.Model("Module1", ["modules"], "MODULES_MODULE1_H")
+    parser.parse_data(model, {"members": [{"name": "value", "type": typedef, "indirection": indirection}]})
+    return model
+
+
+@pytest.mark.parametrize("typedef, system, project", [
+    ("base::BaseModule",                                            set(),                  {"base/BaseModule.h"}),
+    ("std::vector<base::BaseModule>",                               {"vector"},             {"base/BaseModule.h"}),
+    ("std::unique_ptr<interfaces::IModule>",                        {"memory"},             {"interfaces/IModule.h"}),
+    ("std::map<std::string, std::vector<enums::EMode>>",            {"map", "string", "vector"}, {"enums/EMode.h"}),
+    ("const std :: vector < :: base :: BaseModule > &",             {"vector"},             {"base/BaseModule.h"}),
+    ("base::BaseModule::Nested",                                    set(),                  {"base/BaseModule.h"}),
+    ("std::optional<unknown::Type>",                                {"optional"},           set()),
+    ("unsigned long long",                                          set(),                  set())
+])
+def test_qualified_names_inside_template_arguments(parser: impl.Parser, typedef: str, system: set[str], project: set[str]):
+    model: impl.Model = parse_member(parser, typedef)
+
+    assert model.includes_h.system == system
+    assert model.includes_h.project == project
+
+
+def test_references_include_every_enclosing_name(parser: impl.Parser):
+    model: impl.Model = parse_member(parser, "std::vector<base::BaseModule>")
+
+    # A blueprint added later under any prefix must re-render this model, standard names never are blueprints
+    assert model.references == {"base", "base::BaseModule"}
+
+
+def test_resolution_is_memoized_per_type_string(parser: impl.Parser, monkeypatch):
+    calls: list[str] = []
+    extract = parser._extract_qualified_names
+    monkeypatch.setattr(parser, "_extract_qualified_names", lambda typedef: calls.append(typedef) or extract(typedef))
+
+    for _ in range(3):
+        parse_member(parser, "std::vector<base::BaseModule>")
+    parse_member(parser, "std::unique_ptr<interfaces::IModule>")
+
+    assert calls == ["std::vector<base::BaseModule>", "std::unique_ptr<interfaces::IModule>"]
+
+
+def test_memo_is_kept_for_unchanged_project_types(parser: impl.Parser):
+    parse_member(parser, "std::vector<other::Type>")
+
+    assert not parser.set_project_includes(dict(PROJECT_TYPES))
+    assert parse_member(parser, "std::vector<other::Type>").includes_h.project == set()
+
+
+def test_memo_is_cleared_when_project_types_change(parser: impl.Parser):
+    assert parse_member(parser, "std::vector<other::Type>").includes_h.project == set()
+
+    assert parser.set_project_includes({**PROJECT_TYPES, "other::Type": ("other/Type.h", "class")})
+    assert parse_member(parser, "std::vector<other::Type>").includes_h.project == {"other/Type.h"}
+
+
+def test_parsed_model_is_slotted(parser: impl.Parser):
+    model: impl.Model = impl.Model("Module1", ["modules"], "MODULES_MODULE1_H")
+    parser.parse_data(model, {"inherits": [{"type": "base::BaseModule", "visibility": "public"}],
+                              "methods": [{"name": "Start", "type": "void", "params": [{"name": "flag", "type": "int"}]}]})
+
+    method = model.methods.public[0]
+    for value in (model, model.includes_h, model.methods, model.inherits[0], method, method.params[0]):
+        assert not hasattr(value, "__dict__")
+    assert (method.name, method.params[0].type) == ("Start", "int")
+
+
+def test_session_keeps_its_parser_between_runs(project: Path, output: Path):
+    session: impl.Session = create_session(project, output)
+    session.run()
+    parser: impl.Parser = session._parser
+
+    blueprint: Path = project / "modules" / "Module1.class.yaml"
+    blueprint.write_text(blueprint.read_text() + "\n")
+    assert session.run().rendered == 1
+
+    # Same project types, the memoized resolutions survive
+    assert session._parser is parser and parser._resolved_types
@@ -0,0 +1,71 @@
+import json
+import random
+from pathlib import Path
+
+import app.config as config
+import app.impl as impl
+
+from conftest import create_session
+
+
+def builder(threshold: float) -> impl.PchBuilder:
+    return impl.PchBuilder(threshold, config.PCH_HEADER_FILENAME, config.PCH_REPORT_FILENAME)
+
+
+def models(counts: dict[str, int], total: int = 10) -> list[tuple[str, list[str]]]:
+    # total models, the first counts[header] of them include header
+    return [(f"ns{i % 3}", [header for header, count in counts.items() if i < count]) for i in range(total)]
+
+
+def test_headers_at_the_threshold_are_selected():
+    outputs: dict[str, str] = builder(0.5).outputs(models({"vector": 5, "string": 6, "map": 4}))
+
+    # 5 of 10 models is exactly the threshold, 4 is below it
+    assert outputs[config.PCH_HEADER_FILENAME].splitlines()[3:] == ["#include <string>", "#include <vector>"]
+    assert json.loads(outputs[config.PCH_REPORT_FILENAME])["selected"] == ["string", "vector"]
+
+
+def test_every_header_of_the_report_is_counted():
+    report: dict = json.loads(builder(0.5).outputs(models({"vector": 5, "map": 4}))[config.PCH_REPORT_FILENAME])
+
+    assert report["models"] == 10 and report["threshold"] == 0.5
+    assert report["headers"]["map"] == {"models": 4, "share": 0.4, "namespaces": {"ns0": 2, "ns1": 1, "ns2": 1}}
+
+
+def test_zero_threshold_needs_one_including_model():
+    assert builder(0.0).select(*builder(0.0).usage(models({"vector": 1, "map": 0}))) == ["vector"]
+
+
+def test_output_does_not_depend_on_model_order():
+    listed: list[tuple[str, list[str]]] = models({"vector": 6, "string": 6, "map": 6, "memory": 8, "array": 3}, total=12)
+    expected: dict[str, str] = builder(0.25).outputs(listed)
+
+    for seed in range(5):
+        shuffled: list[tuple[str, list[str]]] = [(namespace, list(reversed(includes))) for namespace, includes in listed]
+        random.Random(seed).shuffle(shuffled)
+        assert builder(0.25).outputs(shuffled) == expected
+
+    # Most used first, ties by name
+    assert json.loads(expected[config.PCH_REPORT_FILENAME])["selected"] == ["memory", "map", "string", "vector", "array"]
+
+
+def test_generated_pch_is_deterministic(synthetic: Path, tmp_path: Path):
+    for name, jobs in (("serial", 1), ("parallel", 3)):
+        create_session(synthetic, tmp_path / name, jobs=jobs, pch=builder(0.3)).run()
+
+    for filename in (config.PCH_HEADER_FILENAME, config.PCH_REPORT_FILENAME):
+        assert (tmp_path / "serial" / filename).read_bytes() == (tmp_path / "parallel" / filename).read_bytes()
+
+    selected: list[str] = json.loads((tmp_path / "serial" / config.PCH_REPORT_FILENAME).read_text())["selected"]
+    assert selected and (tmp_path / "serial" / config.PCH_HEADER_FILENAME).read_text().count("#include") == len(selected)
+
+
+def test_unchanged_models_keep_their_includes_in_the_manifest(project: Path, output: Path):
+    create_session(project, output, pch=builder(0.0)).run()
+    (project / "enums" / "EMode.enum.yaml").write_text("description: Changed\n")
+
+    # Only the enum is rendered again, Module1 still counts through its manifest entry
+    report: impl.RunReport = create_session(project, output, pch=builder(0.0)).run()
+
+    assert report.rendered == 1
+    assert "#include <string>" in (output / config.PCH_HEADER_FILENAME).read_text()
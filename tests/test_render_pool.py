@@ -0,0 +1,93 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+import app.api as api
+import app.impl as impl
+from synthetic import SyntheticProject
+
+from conftest import PROJECT_DIR, create_session, generate
+
+
+@pytest.fixture
+def packages(tmp_path: Path) -> Path:
+    # Copies of the sample project in separate namespaces, enough for several render chunks
+    root: Path = tmp_path / "packages"
+    for index in range(12):
+        shutil.copytree(PROJECT_DIR, root / f"package{index}")
+    return root
+
+
+def contents(output: Path) -> dict[str, bytes]:
+    return {path.relative_to(output).as_posix(): path.read_bytes() for path in sorted(output.rglob("*")) if path.suffix in (".h", ".cpp")}
+
+
+def test_parallel_output_matches_serial(packages: Path, tmp_path: Path):
+    assert generate(packages, "-o", tmp_path / "serial", "-j", "1") == 0
+    assert generate(packages, "-o", tmp_path / "parallel", "-j", "4") == 0
+
+    assert len(contents(tmp_path / "parallel")) == 48
+    assert contents(tmp_path / "parallel") == contents(tmp_path / "serial")
+
+
+def test_errors_are_reported_in_submission_order(packages: Path, tmp_path: Path, capsys):
+    # Blueprints are submitted in sorted path order
+    broken: list[Path] = sorted(packages.rglob("*.yaml"))[::4]
+    for path in broken:
+        path.write_text("members: [\n")
+
+    assert generate(packages, "-o", tmp_path / "serial", "-j", "1") == 1
+    serial: list[str] = capsys.readouterr().err.splitlines()
+    assert generate(packages, "-o", tmp_path / "parallel", "-j", "4") == 1
+    parallel: list[str] = capsys.readouterr().err.splitlines()
+
+    # YAML errors span several lines, each starts on one naming its blueprint
+    assert [line.split(":")[1].strip() for line in parallel if line.startswith("error: ")] == [str(path) for path in broken]
+    assert parallel == serial
+    assert contents(tmp_path / "parallel") == contents(tmp_path / "serial")
+
+
+def test_failed_blueprint_stays_stale(project: Path, output: Path):
+    blueprint: Path = project / "enums" / "EMode.enum.yaml"
+    blueprint.write_text("members: [\n")
+
+    assert generate(project, "-o", output) == 1
+    assert not (output / "enums" / "EMode.h").exists()
+
+    # Unchanged since, but retried rather than skipped
+    assert generate(project, "-o", output) == 1
+
+
+def test_long_lived_session_keeps_its_workers(synthetic: Path, output: Path):
+    session: impl.Session = create_session(synthetic, output, jobs=2, keep_parsed=True)
+    try:
+        session.run()
+        workers: set[int] = set(session._pool._executor._processes)
+
+        for path in sorted(synthetic.rglob("*.yaml"))[:10]:
+            path.write_text(path.read_text() + "\n# touched\n")
+        report: impl.RunReport = session.run()
+
+        assert report.rendered >= 10 and not report.errors
+        assert set(session._pool._executor._processes) == workers and len(workers) == 2
+    finally:
+        session.close()
+
+
+def test_roots_of_one_call_share_a_pool(tmp_path: Path, monkeypatch):
+    pools: list[impl.RenderPool] = []
+    create_render_pool = api.create_render_pool
+    monkeypatch.setattr(api, "create_render_pool", lambda options: pools.append(create_render_pool(options)) or pools[-1])
+
+    roots: list[Path] = [tmp_path / "first", tmp_path / "second"]
+    for seed, root in enumerate(roots):
+        SyntheticProject(blueprints=40, seed=seed).write(root)
+
+    result: api.GenerateResult = api.generate(roots, tmp_path / "parallel", api.GenerateOptions(jobs=2))
+
+    # One pool for both roots, closed when the call returns
+    assert result.passed and len(pools) == 1 and pools[0].workers == 0
+
+    api.generate(roots, tmp_path / "serial", api.GenerateOptions(jobs=1))
+    assert contents(tmp_path / "parallel") == contents(tmp_path / "serial")
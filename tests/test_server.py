@@ -0,0 +1,162 @@
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import app.config as config
+import app.impl as impl
+
+from conftest import SRC_DIR, run_cli
+
+
+def start_server(socket_path: Path) -> subprocess.Popen:
+    env: dict[str, str] = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    process: subprocess.Popen = subprocess.Popen([sys.executable, "-m", "app", "--serve", str(socket_path)],
+                                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env)
+
+    # Ready once it answers a ping
+    for _ in range(200):
+        try:
+            impl.send_request(socket_path, {"command": "ping"})
+            return process
+        except OSError:
+            time.sleep(0.05)
+
+    process.kill()
+    raise RuntimeError(f"server did not start: {process.stderr.read()}")
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> Iterator[Path]:
+    socket_path: Path = tmp_path / "codegen.sock"
+    process: subprocess.Popen = start_server(socket_path)
+
+    yield socket_path
+
+    if process.poll() is None:
+        run_cli("--connect", socket_path, "--shutdown-server")
+        process.wait(timeout=10)
+
+
+def tree(output: Path) -> dict[str, bytes]:
+    return {path.relative_to(output).as_posix(): path.read_bytes() for path in sorted(output.rglob("*"))
+            if path.is_file() and not path.name.startswith(".")}
+
+
+def test_generates_like_a_local_run(server: Path, project: Path, tmp_path: Path):
+    remote: subprocess.CompletedProcess = run_cli(project, "-o", tmp_path / "remote", "--connect", server)
+    run_cli(project, "-o", tmp_path / "local")
+
+    assert remote.returncode == 0, remote.stderr
+    assert "4 written" in remote.stdout
+    assert tree(tmp_path / "remote") == tree(tmp_path / "local")
+
+
+@pytest.mark.parametrize("options", [["--unity", "--unity-batch-size", "2"], ["--pch", "--pch-threshold", "0.1"], ["--forward-declarations"], ["--stream", "-j", "2"]])
+def test_client_options_are_forwarded(server: Path, project: Path, tmp_path: Path, options: list[str]):
+    remote: subprocess.CompletedProcess = run_cli(project, "-o", tmp_path / "remote", "--connect", server, *options)
+    run_cli(project, "-o", tmp_path / "local", *options)
+
+    assert remote.returncode == 0, remote.stderr
+    assert tree(tmp_path / "remote") == tree(tmp_path / "local")
+
+
+def test_changed_options_start_a_new_session(server: Path, project: Path, output: Path):
+    assert run_cli(project, "-o", output, "--connect", server).returncode == 0
+    assert not (output / config.UNITY_CMAKE_FILENAME).exists()
+
+    assert run_cli(project, "-o", output, "--connect", server, "--unity").returncode == 0
+    assert (output / config.UNITY_CMAKE_FILENAME).exists()
+
+
+def test_render_errors_fail_the_request(server: Path, project: Path, output: Path):
+    (project / "enums" / "EMode.enum.yaml").write_text("evalues: [\n")
+
+    result: subprocess.CompletedProcess = run_cli(project, "-o", output, "--connect", server)
+
+    assert result.returncode == 1
+    assert f"error: {project / 'enums' / 'EMode.enum.yaml'}:" in result.stderr
+    assert (output / "modules" / "Module1.h").exists()
+
+
+def test_changed_files_regenerate_only_those(server: Path, project: Path, output: Path):
+    assert run_cli(project, "-o", output, "--connect", server).returncode == 0
+    blueprint: Path = project / "enums" / "EMode.enum.yaml"
+    blueprint.write_text(blueprint.read_text() + "\ndescription: Changed\n")
+
+    result: subprocess.CompletedProcess = run_cli(project, "-o", output, "--connect", server, "--changed", blueprint)
+
+    assert result.returncode == 0 and "1 written" in result.stdout
+    assert "Changed" in (output / "enums" / "EMode.h").read_text()
+
+
+def test_check_exit_codes(server: Path, project: Path, output: Path):
+    assert run_cli(project, "-o", output, "--connect", server).returncode == 0
+    assert run_cli(project, "-o", output, "--connect", server, "--check").returncode == 0
+
+    (output / "enums" / "EMode.h").unlink()
+    result: subprocess.CompletedProcess = run_cli(project, "-o", output, "--connect", server, "--check")
+
+    assert result.returncode == 1 and "missing: enums/EMode.h" in result.stderr
+    assert not (output / "enums" / "EMode.h").exists()
+
+
+def test_malformed_requests_are_rejected(server: Path, tmp_path: Path):
+    assert impl.send_request(server, {"command": "unknown"})["exit_code"] == 2
+
+    outside: dict = {"command": "regenerate", "input": str(tmp_path / "in"), "output": str(tmp_path / "out"), "files": [str(tmp_path)]}
+    assert impl.send_request(server, outside)["exit_code"] == 2
+
+    # The server keeps serving
+    assert impl.send_request(server, {"command": "ping"})["exit_code"] == 0
+
+
+def test_missing_server_fails(tmp_path: Path, project: Path, output: Path):
+    result: subprocess.CompletedProcess = run_cli(project, "-o", output, "--connect", tmp_path / "none.sock")
+
+    assert result.returncode == 1 and "cannot reach server" in result.stderr
+    assert not output.exists()
+
+
+def test_stale_socket_fails_clients_and_is_replaced_by_a_server(tmp_path: Path, project: Path, output: Path):
+    # Left behind by a server that was killed, nothing listens on it
+    socket_path: Path = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(str(socket_path))
+
+    result: subprocess.CompletedProcess = run_cli(project, "-o", output, "--connect", socket_path)
+    assert result.returncode == 1 and "cannot reach server" in result.stderr
+
+    process: subprocess.Popen = start_server(socket_path)
+    try:
+        assert run_cli(project, "-o", output, "--connect", socket_path).returncode == 0
+    finally:
+        run_cli("--connect", socket_path, "--shutdown-server")
+        process.wait(timeout=10)
+
+    assert not socket_path.exists()
+
+
+def test_second_server_refuses_a_live_socket(server: Path):
+    env: dict[str, str] = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result: subprocess.CompletedProcess = subprocess.run([sys.executable, "-m", "app", "--serve", str(server)],
+                                                         capture_output=True, text=True, env=env, timeout=30)
+
+    assert result.returncode == 1 and "already listening" in result.stderr
+    assert impl.send_request(server, {"command": "ping"})["exit_code"] == 0
+
+
+def test_several_roots_are_forwarded_in_one_request(server: Path, project: Path, tmp_path: Path):
+    other: Path = Path(shutil.copytree(project, tmp_path / "other"))
+
+    result: subprocess.CompletedProcess = run_cli(project, other, "-o", tmp_path / "out", "--connect", server)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.count("4 written") == 2
+    assert tree(tmp_path / "out" / "project") == tree(tmp_path / "out" / "other")
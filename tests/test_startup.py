@@ -0,0 +1,45 @@
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+import app.impl as impl
+
+from bench_startup import HEAVY_MODULES, imported_modules, python_command, python_env
+
+
+def test_up_to_date_run_skips_heavy_imports(project: Path, output: Path):
+    command: list[str] = python_command() + [str(project), "-o", str(output)]
+    subprocess.run(command, env=python_env(), check=True, stdout=subprocess.DEVNULL)
+
+    assert not imported_modules(command, python_env()) & set(HEAVY_MODULES)
+
+
+def test_rendering_run_imports_jinja_and_yaml(project: Path, output: Path):
+    modules: set[str] = imported_modules(python_command() + [str(project), "-o", str(output)], python_env())
+
+    assert {"jinja2", "yaml"} <= modules
+
+
+def test_package_exports_resolve_on_first_access():
+    code: str = ("import sys, app.impl as impl; before = 'app.impl.render' in sys.modules; impl.Renderer; "
+                 "print(before, 'app.impl.render' in sys.modules, 'jinja2' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], env=python_env(), check=True, capture_output=True, text=True)
+
+    assert result.stdout.split() == ["False", "True", "False"]
+
+
+def test_every_lazy_export_is_a_static_import():
+    # PyInstaller only follows import statements, the TYPE_CHECKING block must list every export
+    tree: ast.Module = ast.parse(Path(impl.__file__).read_text())
+    block: ast.If = next(node for node in tree.body if isinstance(node, ast.If) and ast.unparse(node.test) == "TYPE_CHECKING")
+    imported: dict[str, str] = {alias.name: node.module for node in block.body for alias in node.names}
+
+    assert imported == {name: f"app.impl.{module}" for name, module in impl._EXPORTS.items()}
+
+
+def test_importing_the_api_stays_cheap():
+    code: str = "import sys, app; app.generate; print(*(module in sys.modules for module in ('jinja2', 'yaml', 'app.impl.session')))"
+    result = subprocess.run([sys.executable, "-c", code], env=python_env(), check=True, capture_output=True, text=True)
+
+    assert result.stdout.split() == ["False", "False", "False"]
@@ -0,0 +1,63 @@
+import ast
+import builtins
+import json
+import pstats
+from pathlib import Path
+
+import pytest
+
+import app.impl.stats as stats
+
+from conftest import generate
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_json_report_covers_phases_and_files(project: Path, output: Path, tmp_path: Path, jobs: str):
+    generate(project, "-o", output, "-j", jobs, "--stats-json", tmp_path / "stats.json")
+    report: dict = json.loads((tmp_path / "stats.json").read_text())
+
+    assert {"startup", "discovery", "hash", "render", "write", "finalize"} <= set(report["phases"])
+    assert report["counters"]["rendered"] == 3 and report["counters"]["files_written"] == 4
+    assert report["counters"]["methods"] == 5 and report["counters"]["params"] == 4
+
+    # Timed inside the workers too
+    record: dict = report["files"]["modules/Module1.class.yaml"]
+    assert record["template_render"] > 0 and record["yaml_load"] > 0
+    assert (record["members"], record["methods"]) == (2, 3)
+
+
+def test_table_lists_the_slowest_blueprints(project: Path, output: Path, capsys):
+    generate(project, "-o", output, "--stats", "--stats-top", "2")
+    lines: list[str] = capsys.readouterr().out.splitlines()
+
+    assert "Slowest 2 blueprints (ms):" in lines
+    assert len([line for line in lines if line.endswith(".yaml")]) == 2
+
+
+def test_profile_of_one_phase(project: Path, output: Path, tmp_path: Path):
+    generate(project, "-o", output, "--profile", "render", "--profile-output", tmp_path / "render.prof")
+
+    assert pstats.Stats(str(tmp_path / "render.prof")).total_calls > 0
+
+
+def test_annotations_name_only_bound_modules():
+    # Attribute annotations are never evaluated, a missing import only shows up in type checkers
+    tree: ast.Module = ast.parse(Path(stats.__file__).read_text())
+
+    def imported(nodes: list[ast.AST]) -> set[str]:
+        return {(alias.asname or alias.name).split(".")[0] for node in nodes if isinstance(node, (ast.Import, ast.ImportFrom))
+                for alias in node.names}
+
+    # Module level names, including imports under TYPE_CHECKING
+    module_level: list[ast.stmt] = tree.body + [child for node in tree.body if isinstance(node, ast.If) for child in node.body]
+    bound: set[str] = set(dir(builtins)) | imported(module_level) | {node.name for node in ast.walk(tree) if isinstance(node, ast.ClassDef)}
+
+    # A function may also name what it imported before the annotation
+    for function in (node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)):
+        annotations: list[ast.expr] = [node.annotation for node in ast.walk(function) if isinstance(node, (ast.AnnAssign, ast.arg)) and node.annotation]
+
+        for annotation in annotations + ([function.returns] if function.returns else []):
+            local: set[str] = imported([node for node in ast.walk(function) if isinstance(node, ast.stmt) and node.lineno < annotation.lineno])
+            names: set[str] = {name.id for name in ast.walk(annotation) if isinstance(name, ast.Name)}
+
+            assert names <= bound | local, f"{function.name}: {ast.unparse(annotation)}"
@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import app.config as config
+import app.impl as impl
+
+from conftest import AGED_NS, PROJECT_DIR, age, create_session, generator_arguments
+
+
+def outputs(output: Path) -> dict[str, os.stat_result]:
+    return {path.relative_to(output).as_posix(): path.stat() for path in sorted(output.rglob("*")) if path.suffix in (".h", ".cpp")}
+
+
+@pytest.mark.parametrize("kind, blueprint, methods", [
+    ("class", "modules/Module1.class.yaml", ["class_header", "class_source"]),
+    ("interface", "interfaces/IModule.interface.yaml", ["interface_header"]),
+    ("enum", "enums/EMode.enum.yaml", ["enum_header"])
+])
+def test_streamed_templates_match_rendered_text(kind: str, blueprint: str, methods: list[str]):
+    generator: impl.CppGenerator = impl.CppGenerator(*generator_arguments())
+    parser: impl.Parser = impl.Parser(config.STANDARD_INCLUDE_MAP)
+    model: impl.Model = impl.Model(Path(blueprint).name.split(".")[0], [blueprint.split("/")[0]], "GUARD_H")
+    parser.parse_yaml(model, (PROJECT_DIR / blueprint).read_text())
+
+    for method in methods:
+        streamed: list[str] = list(getattr(generator, f"stream_{method}_content")(model))
+        assert len(streamed) > 1 and "".join(streamed) == getattr(generator, f"generate_{method}_content")(model)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_streamed_output_matches_buffered(synthetic: Path, tmp_path: Path, jobs: int):
+    create_session(synthetic, tmp_path / "buffered").run()
+    create_session(synthetic, tmp_path / "streamed", stream=True, jobs=jobs).run()
+
+    buffered: dict[str, bytes] = {name: (tmp_path / "buffered" / name).read_bytes() for name in outputs(tmp_path / "buffered")}
+    streamed: dict[str, bytes] = {name: (tmp_path / "streamed" / name).read_bytes() for name in outputs(tmp_path / "streamed")}
+    assert len(streamed) > 120 and streamed == buffered
+
+
+def test_streamed_outputs_are_recorded_like_buffered_ones(synthetic: Path, output: Path):
+    create_session(synthetic, output, stream=True).run()
+
+    report: impl.RunReport = create_session(synthetic, output).run()
+    assert report.rendered == 0 and report.written == 0
+
+
+def test_unchanged_streamed_files_are_not_written(synthetic: Path, output: Path):
+    create_session(synthetic, output).run()
+    age(output)
+    before: dict[str, os.stat_result] = outputs(output)
+
+    report: impl.RunReport = create_session(synthetic, output, stream=True).run(full_rebuild=True)
+    after: dict[str, os.stat_result] = outputs(output)
+
+    assert report.rendered == 120 and report.written == 0 and report.unchanged == len(before)
+    assert {name: (st.st_ino, st.st_mtime_ns) for name, st in after.items()} == \
+           {name: (st.st_ino, AGED_NS) for name, st in before.items()}
+    assert not [path for path in output.rglob("*.tmp")]
@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+import app.impl as impl
+from bench_codegen import compare
+from synthetic import SyntheticProject
+
+from conftest import create_session
+
+
+def contents(root: Path) -> dict[str, bytes]:
+    return {path.relative_to(root).as_posix(): path.read_bytes() for path in sorted(root.rglob("*.yaml"))}
+
+
+def test_same_seed_writes_the_same_project(tmp_path: Path):
+    SyntheticProject(blueprints=30, seed=1).write(tmp_path / "first")
+    SyntheticProject(blueprints=30, seed=1).write(tmp_path / "second")
+    SyntheticProject(blueprints=30, seed=2).write(tmp_path / "other")
+
+    assert len(contents(tmp_path / "first")) == 30
+    assert contents(tmp_path / "first") == contents(tmp_path / "second")
+    assert contents(tmp_path / "first") != contents(tmp_path / "other")
+
+
+def test_synthetic_project_renders_with_cross_references(synthetic: Path, output: Path):
+    session: impl.Session = create_session(synthetic, output)
+    report: impl.RunReport = session.run()
+
+    assert report.rendered == 120 and not report.errors
+    assert any(session.graph.project_edges(session.blueprints()).values())
+
+
+def test_baseline_comparison_flags_slower_phases(tmp_path: Path):
+    settings: dict = {"blueprints": 10, "members": 8}
+    baseline: Path = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"runs": [{"settings": settings, "phases": {"parse": 1.0, "render": 1.0}}]}))
+
+    runs: list[dict] = [
+        {"settings": settings, "phases": {"parse": 1.05, "render": 1.5}},
+        {"settings": {"blueprints": 10, "members": 4}, "phases": {"parse": 9.0}}
+    ]
+
+    # Within tolerance, and runs with other settings, are not compared
+    assert compare(runs, baseline, 0.10) == ["10 blueprints, render: 1.0000s -> 1.5000s"]
@@ -0,0 +1,87 @@
+import shutil
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import app.config as config
+import app.impl as impl
+import app.impl.templates as templates
+import app.jinja.precompile as precompile
+
+from conftest import SRC_DIR, generate
+
+
+def create_generator(package: str, bytecode_cache_dir: str = None) -> impl.CppGenerator:
+    return impl.CppGenerator(package,
+                             config.CLASS_HEADER_TEMPLATE_FILENAME,
+                             config.CLASS_SOURCE_TEMPLATE_FILENAME,
+                             config.INTERFACE_HEADER_TEMPLATE_FILENAME,
+                             config.ENUM_HEADER_TEMPLATE_FILENAME,
+                             config.TAB_INDENT,
+                             bytecode_cache_dir)
+
+
+def render(generator: impl.CppGenerator) -> str:
+    model: impl.Model = impl.Model("Module1", ["modules"], "MODULES_MODULE1_H")
+    parser: impl.Parser = impl.Parser(config.STANDARD_INCLUDE_MAP)
+    parser.parse_yaml(model, (SRC_DIR.parent / "tests" / "blueprint" / "project" / "modules" / "Module1.class.yaml").read_text())
+    return generator.generate_class_header_content(model)
+
+
+@pytest.fixture
+def package(tmp_path: Path, monkeypatch) -> Path:
+    # A copy of the template package that can be edited and precompiled
+    package: Path = Path(shutil.copytree(SRC_DIR / "app" / "jinja", tmp_path / "packages" / "edited_jinja",
+                                         ignore=shutil.ignore_patterns("__pycache__")))
+    monkeypatch.syspath_prepend(str(package.parent))
+    monkeypatch.setattr(config, "JINJA_ENV_PACKAGE", "edited_jinja")
+    monkeypatch.delitem(sys.modules, "edited_jinja", raising=False)
+    return package
+
+
+def test_precompiled_templates_replace_the_sources(package: Path):
+    expected: impl.CppGenerator = create_generator("edited_jinja")
+
+    with mock.patch.object(sys, "argv", ["precompile", str(package / "compiled")]):
+        precompile.main()
+
+    # Edited sources are ignored once compiled modules are bundled
+    template: Path = package / "templates" / config.CLASS_HEADER_TEMPLATE_FILENAME
+    template.write_text(template.read_text() + "// edited\n")
+    precompiled: impl.CppGenerator = create_generator("edited_jinja")
+
+    assert precompiled.fingerprint == expected.fingerprint
+    assert render(precompiled) == render(expected)
+    assert "// edited" not in render(precompiled)
+
+
+def test_development_tree_renders_template_sources(package: Path):
+    template: Path = package / "templates" / config.CLASS_HEADER_TEMPLATE_FILENAME
+    template.write_text(template.read_text() + "// edited\n")
+
+    assert "// edited" in render(create_generator("edited_jinja"))
+
+
+def test_bytecode_cache_keeps_output_identical(project: Path, tmp_path: Path):
+    generate(project, "-o", tmp_path / "plain")
+    generate(project, "-o", tmp_path / "cold", "--template-cache-dir", tmp_path / "cache")
+    generate(project, "-o", tmp_path / "warm", "--template-cache-dir", tmp_path / "cache")
+
+    assert any((tmp_path / "cache").iterdir())
+    for path in sorted((tmp_path / "plain").rglob("*.h")):
+        relative: Path = path.relative_to(tmp_path / "plain")
+        assert (tmp_path / "cold" / relative).read_text() == (tmp_path / "warm" / relative).read_text() == path.read_text()
+
+
+def test_namespace_template_package_renders(package: Path):
+    # Frozen builds may see the bundled template folders as a namespace package, without __file__
+    (package / "__init__.py").unlink()
+
+    assert render(create_generator("edited_jinja")) == render(create_generator("app.jinja"))
+
+
+def test_missing_template_package_is_reported():
+    with pytest.raises(ModuleNotFoundError, match="template package 'no_such_jinja' not found"):
+        templates.package_dir("no_such_jinja")
@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+import app.config as config
+import app.impl as impl
+from synthetic import SyntheticProject
+
+from conftest import AGED_NS, create_session
+
+
+SOURCES: list[str] = [f"ns/Class{i}.cpp" for i in range(300)] + [f"other/Class{i}.cpp" for i in range(40)]
+
+
+def batches(sources: list[str]) -> set[tuple[str, tuple[str, ...]]]:
+    return {(unity_path, tuple(members)) for unity_path, members in impl.UnityBuilder(8, config.UNITY_CMAKE_FILENAME).plan(sources).items()}
+
+
+def test_batches_cover_every_source_once():
+    plan: dict[str, list[str]] = impl.UnityBuilder(8, config.UNITY_CMAKE_FILENAME).plan(SOURCES)
+
+    assert sorted(member for members in plan.values() for member in members) == sorted(SOURCES)
+    assert all(len({member.rpartition("/")[0] for member in members}) == 1 for members in plan.values())
+    assert max(len(members) for members in plan.values()) <= 16
+
+
+def test_adding_a_source_changes_only_its_own_batch():
+    before: set[tuple[str, tuple[str, ...]]] = batches(SOURCES)
+
+    for i in range(100):
+        added: str = f"ns/Added{i}.cpp"
+        after: set[tuple[str, tuple[str, ...]]] = batches(SOURCES + [added])
+
+        # The batch taking the new source changes, a boundary at it or the size cap may move
+        # the next boundary, never more than that
+        changed: set[tuple[str, tuple[str, ...]]] = after - before
+        assert len(before - after) <= 2 and len(changed) <= 2
+        assert added in {member for _, members in changed for member in members}
+
+
+def test_removing_a_source_keeps_most_batches():
+    before: set[tuple[str, tuple[str, ...]]] = batches(SOURCES)
+    replaced: list[int] = []
+
+    for removed in SOURCES[:300]:
+        after: set[tuple[str, tuple[str, ...]]] = batches([source for source in SOURCES if source != removed])
+
+        # Batches sorting before the removed source and those of other folders never change
+        assert {batch for batch in before if batch[0].startswith("other/") or batch[1][-1] < removed} <= after
+        replaced.append(len(before - after))
+
+    # Fixed size batches would rename every batch after the removed source, about half of them
+    assert sum(replaced) / len(replaced) < 2
+
+
+def test_new_class_rewrites_only_its_unity_file(tmp_path: Path):
+    project: Path = tmp_path / "project"
+    output: Path = tmp_path / "out"
+    SyntheticProject(blueprints=200, members=1, methods=1, params=0, namespace_depth=1, namespace_width=2).write(project)
+    create_session(project, output, unity=impl.UnityBuilder(8, config.UNITY_CMAKE_FILENAME)).run()
+    for path in output.rglob("*"):
+        os.utime(path, ns=(AGED_NS, AGED_NS))
+
+    (project / "ns0" / "Added.class.yaml").write_text("description: Added\n")
+    create_session(project, output, unity=impl.UnityBuilder(8, config.UNITY_CMAKE_FILENAME)).run()
+
+    written: set[str] = {path.relative_to(output).as_posix() for path in output.rglob("*")
+                         if path.is_file() and not path.name.startswith(".") and path.stat().st_mtime_ns != AGED_NS}
+    unity_files: list[str] = [path for path in written if Path(path).name.startswith(impl.UnityBuilder.PREFIX) and path.endswith(".cpp")]
+    assert {"ns0/Added.h", "ns0/Added.cpp", config.UNITY_CMAKE_FILENAME} <= written
+    assert 1 <= len(unity_files) <= 2 and len(written) == len(unity_files) + 3
+
+
+def test_turning_unity_off_removes_its_outputs(project: Path, output: Path):
+    create_session(project, output, unity=impl.UnityBuilder(8, config.UNITY_CMAKE_FILENAME)).run()
+    assert (output / config.UNITY_CMAKE_FILENAME).is_file()
+
+    report: impl.RunReport = create_session(project, output).run()
+
+    assert report.removed == 2
+    assert not [path for path in output.rglob(f"{impl.UnityBuilder.PREFIX}*")]
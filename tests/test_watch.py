@@ -0,0 +1,103 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+import app.impl as impl
+
+from conftest import create_session
+
+
+def wait_in_thread(watcher) -> list:
+    # The watcher blocks until something changes, the caller edits the tree meanwhile
+    changes: list = []
+    thread: threading.Thread = threading.Thread(target=lambda: changes.append(watcher.wait()), daemon=True)
+    thread.start()
+    return [thread, changes]
+
+
+@pytest.mark.parametrize("force_polling", [True, False])
+def test_watcher_reports_changed_blueprints(project: Path, force_polling: bool):
+    watcher = impl.create_watcher(project, poll_interval=0.01, force_polling=force_polling)
+    try:
+        thread, changes = wait_in_thread(watcher)
+        blueprint: Path = project / "enums" / "EMode.enum.yaml"
+        blueprint.write_text(blueprint.read_text() + "\ndescription: Changed\n")
+        thread.join(timeout=10)
+
+        assert changes == [{"enums/EMode.enum.yaml"}]
+    finally:
+        watcher.close()
+
+
+def test_polling_watcher_reports_removed_blueprints(project: Path):
+    watcher: impl.PollingWatcher = impl.PollingWatcher(project, interval=0.01)
+    (project / "modules" / "Module1.class.yaml").unlink()
+
+    assert watcher.wait() == {"modules/Module1.class.yaml"}
+
+
+def test_only_reported_blueprints_are_read_again(project: Path, output: Path):
+    session: impl.Session = create_session(project, output, keep_parsed=True)
+    session.run()
+
+    changed: Path = project / "enums" / "EMode.enum.yaml"
+    changed.write_text(changed.read_text() + "\ndescription: Changed\n")
+    unreported: Path = project / "interfaces" / "IModule.interface.yaml"
+    unreported.write_text(unreported.read_text().replace("Start the module", "Unreported"))
+
+    report: impl.RunReport = session.run(changed={"enums/EMode.enum.yaml"})
+
+    assert report.rendered == 1 and report.written == 1
+    assert "Changed" in (output / "enums" / "EMode.h").read_text()
+    assert "Unreported" not in (output / "interfaces" / "IModule.h").read_text()
+
+
+def test_removed_blueprint_renders_dependents_from_memory(project: Path, output: Path, monkeypatch):
+    session: impl.Session = create_session(project, output, keep_parsed=True)
+    session.run()
+
+    loads: list[str] = []
+    load_yaml = impl.Parser.load_yaml
+    monkeypatch.setattr(impl.Parser, "load_yaml", staticmethod(lambda text: loads.append(text) or load_yaml(text)))
+    (project / "interfaces" / "IModule.interface.yaml").unlink()
+
+    report: impl.RunReport = session.run(changed={"interfaces/IModule.interface.yaml"})
+
+    # Module1 names the removed interface and is rendered again without parsing YAML
+    assert report.rendered == 1 and report.removed == 1 and loads == []
+    assert '#include "interfaces/IModule.h"' not in (output / "modules" / "Module1.h").read_text()
+
+
+def test_stray_yaml_files_are_reported_while_watching(project: Path, output: Path):
+    session: impl.Session = create_session(project, output, keep_parsed=True)
+    watcher = impl.PollingWatcher(project, interval=0.01)
+    session.run()
+
+    (project / "notes.yaml").write_text("todo: everything\n")
+    (project / "modules" / "Foo.widget.yaml").write_text("description: Foo\n")
+    report: impl.RunReport = session.run(changed=watcher.wait())
+
+    assert sorted(report.errors) == [f"{project / 'modules' / 'Foo.widget.yaml'}: invalid kind 'widget', expected <name>.<kind>.yaml",
+                                     f"{project / 'notes.yaml'}: missing kind, expected <name>.<kind>.yaml"]
+    assert report.rendered == 0 and (output / "modules" / "Module1.h").exists()
+
+
+def test_blueprints_render_next_to_stray_yaml_files(project: Path, output: Path):
+    session: impl.Session = create_session(project, output, keep_parsed=True)
+    watcher = impl.PollingWatcher(project, interval=0.01)
+    (project / "notes.yaml").write_text("todo: everything\n")
+    session.run()
+
+    (project / "modules" / "Module2.class.yaml").write_text("description: Second module\n")
+    report: impl.RunReport = session.run(changed=watcher.wait())
+
+    assert report.rendered == 1 and len(report.errors) == 1
+    assert "Second module" in (output / "modules" / "Module2.h").read_text()
+
+
+def test_one_shot_run_reports_stray_yaml_files(project: Path, output: Path):
+    (project / "enums" / ".yaml").write_text("")
+    report: impl.RunReport = create_session(project, output).run()
+
+    assert report.rendered == 3 and report.errors == [f"{project / 'enums' / '.yaml'}: missing kind, expected <name>.<kind>.yaml"]
@@ -0,0 +1,81 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import app.impl as impl
+
+
+def test_identical_content_leaves_file_untouched(tmp_path: Path):
+    path: Path = tmp_path / "a" / "File.h"
+    writer: impl.OutputWriter = impl.OutputWriter()
+    assert writer.write(path, "content\n")
+
+    # An old timestamp makes any rewrite visible
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    before: os.stat_result = path.stat()
+
+    assert not writer.write(path, "content\n")
+    assert not writer.write_stream(path, iter(["con", "tent\n"]))
+
+    after: os.stat_result = path.stat()
+    assert (after.st_mtime_ns, after.st_ino) == (before.st_mtime_ns, before.st_ino)
+    assert (writer.written, writer.unchanged) == (1, 2)
+
+
+@pytest.mark.parametrize("method", ["write", "write_stream"])
+def test_changed_content_is_replaced_atomically(tmp_path: Path, method: str):
+    path: Path = tmp_path / "File.h"
+    path.write_text("old\n")
+    inode: int = path.stat().st_ino
+    writer: impl.OutputWriter = impl.OutputWriter()
+
+    content: str = "new\n"
+    assert getattr(writer, method)(path, content if method == "write" else iter([content]))
+
+    # Written to a temporary file next to the output and renamed over it
+    assert path.read_text() == "new\n"
+    assert path.stat().st_ino != inode
+    assert [entry.name for entry in tmp_path.iterdir()] == ["File.h"]
+
+
+@pytest.mark.parametrize("method", ["write", "write_stream"])
+def test_failed_replace_keeps_the_old_file(tmp_path: Path, method: str, monkeypatch):
+    path: Path = tmp_path / "File.h"
+    path.write_text("old\n")
+    writer: impl.OutputWriter = impl.OutputWriter()
+
+    def fail(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        getattr(writer, method)(path, "new\n" if method == "write" else iter(["new\n"]))
+
+    assert path.read_text() == "old\n"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["File.h"]
+
+
+def test_backup_is_taken_only_for_changed_files(tmp_path: Path):
+    path: Path = tmp_path / "File.h"
+    path.write_text("old\n")
+    store: impl.BackupStore = impl.BackupStore(tmp_path, tmp_path / "backups")
+    writer: impl.OutputWriter = impl.OutputWriter(store)
+
+    assert not writer.write(path, "old\n")
+    assert not writer.write_stream(path, iter(["old\n"]))
+    assert store.snapshots() == []
+
+    assert writer.write_stream(path, iter(["new\n"]))
+    assert list(store.snapshots()[0]["files"]) == ["File.h"]
+
+
+def test_written_files_follow_the_umask(tmp_path: Path):
+    umask: int = os.umask(0o022)
+    try:
+        path: Path = tmp_path / "File.h"
+        impl.OutputWriter().write(path, "content\n")
+    finally:
+        os.umask(umask)
+
+    assert path.stat().st_mode & 0o777 == 0o644